@@ -95,20 +95,74 @@ TEMPLATES = [
 # Database
 # https://docs.djangoproject.com/en/dev/ref/settings/#databases
 
+# Connection pool shared by all threads of a process (FastAPI, Socket.IO and Celery workers).
+# Connections go back to the pool after every call, so they are not kept by threads (CONN_MAX_AGE = 0).
+DATABASE_POOL_ENABLED = env.bool("POSTGRES_POOL_ENABLED", default=True)
+
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql_psycopg2",
+        "ENGINE": "utils.db.backends.postgresql_pool",
         "NAME": env("POSTGRES_DB"),
         "USER": env("POSTGRES_USER"),
         "PASSWORD": env("POSTGRES_PASSWORD"),
         "HOST": env("POSTGRES_HOST"),
         "PORT": env("POSTGRES_PORT"),
+        # without the pool keep connections of the database threads open between calls
+        "CONN_MAX_AGE": 0 if DATABASE_POOL_ENABLED else env.int("POSTGRES_CONN_MAX_AGE", default=60),
+        "OPTIONS": {
+            "pool": {
+                "min_size": env.int("POSTGRES_POOL_MIN_SIZE", default=2),
+                "max_size": env.int("POSTGRES_POOL_MAX_SIZE", default=20),
+                "max_lifetime": env.float("POSTGRES_POOL_MAX_LIFETIME", default=1800.0),
+                "max_idle": env.float("POSTGRES_POOL_MAX_IDLE", default=600.0),
+                "acquire_timeout": env.float("POSTGRES_POOL_ACQUIRE_TIMEOUT", default=10.0),
+                "check_interval": env.float("POSTGRES_POOL_CHECK_INTERVAL", default=30.0),
+            },
+        },
     }
 }
 
+# Hot repository lookups run as server side prepared statements.
+# Disable behind a transaction pooler (PgBouncer pool_mode=transaction), statements do not survive there.
+DATABASE_PREPARED_STATEMENTS = env.bool("POSTGRES_PREPARED_STATEMENTS", default=True)
+
+# Number of threads that run sync ORM writes concurrently. 0 - use thread sensitive sync_to_async.
+DATABASE_EXECUTOR_WORKERS = env.int("DATABASE_EXECUTOR_WORKERS", default=10)
+
+# Read replicas. Comma separated "host[:port]" list, every replica is added as "replica_<n>" alias.
+# Leave it empty to send all queries to "default".
+DATABASE_REPLICA_HOSTS = env.list("POSTGRES_REPLICA_HOSTS", default=[])
+# seconds during which a context that has just written reads from the primary
+DATABASE_REPLICA_PIN_SECONDS = env.float("POSTGRES_REPLICA_PIN_SECONDS", default=5.0)
+
+for index, replica_host in enumerate(DATABASE_REPLICA_HOSTS):
+    host, _, port = replica_host.partition(":")
+    DATABASES[f"replica_{index}"] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "PORT": port or DATABASES["default"]["PORT"],
+        "TEST": {"MIRROR": "default"},
+    }
+
+if DATABASE_REPLICA_HOSTS:
+    DATABASE_ROUTERS = ["utils.db.routers.PrimaryReplicaRouter"]
+
+# Slow query log. Queries slower than the threshold are logged, 0 - disabled.
+SLOW_QUERY_THRESHOLD_MS = env.int("SLOW_QUERY_THRESHOLD_MS", default=500)
+# share of slow SELECT queries re-run with EXPLAIN (ANALYZE, BUFFERS) on a separate connection, 0 - never
+SLOW_QUERY_EXPLAIN_SAMPLE_RATE = env.float("SLOW_QUERY_EXPLAIN_SAMPLE_RATE", default=0.0)
+SLOW_QUERY_LOG_FILE = env.str("SLOW_QUERY_LOG_FILE", default=str(ROOT_DIR / "logs" / "slow_queries.log"))
+SLOW_QUERY_LOG_ROTATION = env.str("SLOW_QUERY_LOG_ROTATION", default="50 MB")
+SLOW_QUERY_LOG_RETENTION = env.int("SLOW_QUERY_LOG_RETENTION", default=10)
+
 DEFAULT_AUTO_FIELD = "django.db.models.AutoField"
 
 
+# Paginated lists with CountStrategy.ESTIMATED use the planner estimate above this many rows
+PAGINATION_ESTIMATED_COUNT_THRESHOLD = env.int("PAGINATION_ESTIMATED_COUNT_THRESHOLD", default=100_000)
+# seconds the exact counts below the threshold are cached
+PAGINATION_COUNT_CACHE_TIMEOUT = env.int("PAGINATION_COUNT_CACHE_TIMEOUT", default=30)
+
 # Password validation
 # https://docs.djangoproject.com/en/dev/ref/settings/#auth-password-validators
 
@@ -119,6 +173,11 @@ AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.NumericPasswordValidator"},
 ]
 
+# Passwords are hashed in worker processes off the event loop. Unset - one per core, 0 - on a thread instead.
+PASSWORD_HASHER_WORKERS = env.int("PASSWORD_HASHER_WORKERS", default=None)
+# hashes waiting or running at a time, more are rejected with 503. 0 - four per worker
+PASSWORD_HASHER_MAX_PENDING = env.int("PASSWORD_HASHER_MAX_PENDING", default=0)
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/dev/topics/i18n/
@@ -147,7 +206,20 @@ MOUNT_DJANGO_APP = True
 # ------------------------------------------------------------------------------
 ACCESS_TOKEN_EXPIRE_SECONDS = env.str("ACCESS_TOKEN_EXPIRE_SECONDS", default=30 * 60)  # 30 minutes default
 REFRESH_TOKEN_EXPIRE_SECONDS = env.str("REFRESH_TOKEN_EXPIRE_SECONDS", default=90 * 24 * 60 * 60)  # 90 days default
-JWT_ALGORITHM = env.str("JWT_ALGORITHM", default="HS256")
+JWT_ALGORITHM = env.str("JWT_ALGORITHM", default="HS256")  # HS256 (SECRET_KEY), ES256 or EdDSA
+# ES256/EdDSA: PEM private key that signs tokens, empty on processes that only verify tokens
+JWT_PRIVATE_KEY_FILE = env.str("JWT_PRIVATE_KEY_FILE", default="")
+# kid of the signing key, derived from its public key if empty
+JWT_KEY_ID = env.str("JWT_KEY_ID", default="")
+# ES256/EdDSA: PEM public keys still accepted after a rotation, "kid1=/path/key1.pem,kid2=/path/key2.pem"
+JWT_PUBLIC_KEY_FILES = env.dict("JWT_PUBLIC_KEY_FILES", default={})
+# revoked tokens per worker Bloom filter, a false positive costs one Redis round trip
+JWT_REVOKED_BLOOM_CAPACITY = env.int("JWT_REVOKED_BLOOM_CAPACITY", default=100_000)
+JWT_REVOKED_BLOOM_ERROR_RATE = env.float("JWT_REVOKED_BLOOM_ERROR_RATE", default=0.001)
+# seconds verifiers may cache the JWKS document, publish a new public key at least this long before signing with it
+JWT_JWKS_MAX_AGE = env.int("JWT_JWKS_MAX_AGE", default=5 * 60)
+# verified tokens cached per process until they expire, 0 - verify every request
+JWT_TOKEN_CACHE_SIZE = env.int("JWT_TOKEN_CACHE_SIZE", default=10_000)
 
 # Rate Limits
 # ------------------------------------------------------------------------------
@@ -186,6 +258,10 @@ CACHES = {
     },
 }
 
+# switch for the repository read-through caches, per call use ``use_cache=False``
+REPOSITORY_CACHE_ENABLED = env.bool("REPOSITORY_CACHE_ENABLED", default=True)
+USER_CACHE_TIMEOUT = env.int("USER_CACHE_TIMEOUT", default=300)
+
 # CELERY
 # ------------------------------------------------------------------------------
 REDIS_URL = env("REDIS_URL")
@@ -16,7 +16,10 @@ from django.core.asgi import get_asgi_application
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 
+from utils.db.slow_queries import close_explain_connection
 from utils.logger.logger import CustomizeLogger
+from utils.middleware import (AuthenticationMiddleware, QueryStatsMiddleware,
+                              RepositoryLoaderMiddleware, RequestIdMiddleware)
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
@@ -32,6 +35,14 @@ def init_logging() -> None:
     CustomizeLogger.make_logger(config_path)
 
 
+async def close_token_revocation() -> None:
+    """Stop the revoked tokens listener of the worker."""
+    # the registry is built once django is set up
+    from src.core.registry import registry
+
+    await registry.authentication.token_revocation_service().close()
+
+
 def register_routers(app):
     """Register routers."""
     pass
@@ -40,6 +51,12 @@ def register_routers(app):
 def init(app: FastAPI):
     """App initialization function."""
     register_routers(app)
+    app.add_middleware(AuthenticationMiddleware)
+    app.add_middleware(RepositoryLoaderMiddleware)
+    app.add_middleware(QueryStatsMiddleware)
+    app.add_middleware(RequestIdMiddleware)
+    app.add_event_handler("shutdown", close_explain_connection)
+    app.add_event_handler("shutdown", close_token_revocation)
 
     if settings.MOUNT_DJANGO_APP:
         app.mount("/django", application)  # type:ignore
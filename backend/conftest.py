@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 """Configuration file for pytest."""
 import logging
+from contextlib import contextmanager
 
 import nest_asyncio
 import pytest
@@ -10,12 +11,54 @@ from fastapi import FastAPI
 from httpx import AsyncClient
 
 from config_fastapi.app import app_fastapi
+from utils.db.queries import capture_queries
 
 nest_asyncio.apply()
 
 logger = logging.getLogger(__name__)
 
 
+@pytest.fixture
+def anyio_backend() -> str:
+    """Run async tests on asyncio only, the ORM does not support trio."""
+    return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def thread_sensitive_database(settings) -> None:
+    """
+    Run ORM calls on the thread sensitive executor.
+
+    Test database transactions are bound to one connection, so writes must not go to other threads.
+    """
+    settings.DATABASE_EXECUTOR_WORKERS = 0
+
+
+@pytest.fixture(autouse=True)
+def thread_password_hasher(settings) -> None:
+    """Hash passwords on a thread, worker processes would not see settings overridden by tests."""
+    settings.PASSWORD_HASHER_WORKERS = 0
+
+
+@pytest.fixture
+def assert_max_queries():
+    """
+    Fail the test if the block runs more SQL queries than allowed.
+
+    Usage: ``with assert_max_queries(2): await httpx.get(...)``
+    """
+
+    @contextmanager
+    def _assert_max_queries(limit: int):
+        with capture_queries() as stats:
+            yield stats
+        assert stats.count <= limit, (
+            f"Expected at most {limit} queries, got {stats.count}. Duplicates: {stats.describe_duplicates()}"
+        )
+
+    return _assert_max_queries
+
+
 @pytest.fixture
 async def fastapi_app() -> FastAPI:
     """
@@ -51,3 +51,11 @@ class NoFreeNicknameNumberException(DefaultHTTPException):
     error = "NO_FREE_NICKNAME"
     message = "No free number available for this nickname"
     status_code = status.HTTP_400_BAD_REQUEST
+
+
+class TokenRevocationUnavailableException(DefaultHTTPException):
+    """Exception raised when tokens can not be used once or revoked, because Redis is unreachable."""
+
+    error = "AUTH_SESSIONS_UNAVAILABLE"
+    message = "Sessions can not be changed right now, try again later."
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
@@ -5,11 +5,10 @@ from dependency_injector import containers, providers
 from django.conf import settings
 
 from src.authentication.repositories import CaptchaRepository
-from src.authentication.repositories.password_token_repository import \
-    PasswordTokenRepository
 from src.authentication.services import (AuthService, CaptchaService,
-                                         JWTService, PasswordService)
+                                         JWTService, TokenRevocationService)
 from src.users.containers import UserContainer
+from utils.security.jwt_keys import load_key_set
 
 
 class AuthContainer(containers.DeclarativeContainer):
@@ -23,24 +22,37 @@ class AuthContainer(containers.DeclarativeContainer):
         CaptchaService,
         captcha_repository=captcha_repository,
     )
+    # keys are read and parsed once, when the container is built
+    jwt_key_set = providers.Singleton(
+        load_key_set,
+        algorithm=settings.JWT_ALGORITHM,
+        secret_key=settings.SECRET_KEY,
+        private_key_file=settings.JWT_PRIVATE_KEY_FILE or None,
+        key_id=settings.JWT_KEY_ID or None,
+        public_key_files=settings.JWT_PUBLIC_KEY_FILES,
+    )
+    token_revocation_service = providers.Singleton(
+        TokenRevocationService,
+        redis_url=settings.REDIS_URL,
+        user_revocation_timeout=settings.REFRESH_TOKEN_EXPIRE_SECONDS,
+        bloom_capacity=settings.JWT_REVOKED_BLOOM_CAPACITY,
+        bloom_error_rate=settings.JWT_REVOKED_BLOOM_ERROR_RATE,
+    )
     jwt_service = providers.Singleton(
         JWTService,
         access_expiration=settings.ACCESS_TOKEN_EXPIRE_SECONDS,
         refresh_expiration=settings.REFRESH_TOKEN_EXPIRE_SECONDS,
-        jwt_secret_key=settings.SECRET_KEY,
-        jwt_algorithm=settings.JWT_ALGORITHM,
-    )
-    password_token_repository = providers.Singleton(
-        PasswordTokenRepository,
-    )
-    password_service = providers.Singleton(
-        PasswordService,
-        password_token_repository=password_token_repository,
+        key_set=jwt_key_set,
+        token_cache_size=settings.JWT_TOKEN_CACHE_SIZE,
+        token_revocation_service=token_revocation_service,
     )
+    password_token_repository = UserContainer.password_token_repository
+    password_service = UserContainer.password_service
     auth_service = providers.Singleton(
         AuthService,
         user_service=UserContainer.user_service,
         captcha_service=captcha_service,
         jwt_service=jwt_service,
         password_service=password_service,
+        token_revocation_service=token_revocation_service,
     )
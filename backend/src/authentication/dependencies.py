@@ -4,25 +4,30 @@ from typing import Optional
 
 from dependency_injector.wiring import Provide, inject
 from fastapi import Depends
+from fastapi.security import HTTPAuthorizationCredentials
+from starlette.requests import Request
 
 from src.authentication.schemas.auth import UserPayload
 from src.core.registry import Registry
 from utils.responses.http.auth import (InvalidCredentialsException,
                                        UnauthorizedException)
+from utils.security.authentication import get_request_authentication
 from utils.security.dependencies import (jwt_http_bearer,
                                          jwt_http_bearer_no_error)
 
 
 @inject
 async def get_user_payload(
+    request: Request,
     jwt_service=Depends(Provide[Registry.authentication.jwt_service]),
-    bearer: Optional[str] = Depends(jwt_http_bearer_no_error),
+    bearer: Optional[HTTPAuthorizationCredentials] = Depends(jwt_http_bearer_no_error),
 ) -> Optional[UserPayload]:
-    """Get user payload from JWT token."""
+    """Get user payload from JWT token, verified once per request."""
     if bearer:
-        if token := bearer.credentials:  # noqa
-            if data := await jwt_service.decode_token(token):
-                return UserPayload(**data)
+        if bearer.credentials:
+            authentication = get_request_authentication(request)
+            if user_payload := await authentication.get_payload(jwt_service.decode_user_payload):
+                return user_payload
             raise InvalidCredentialsException()
 
     return None
@@ -30,12 +35,14 @@ async def get_user_payload(
 
 @inject
 async def get_authenticated_user_payload(
+    request: Request,
     jwt_service=Depends(Provide[Registry.authentication.jwt_service]),
-    bearer: str = Depends(jwt_http_bearer),
+    bearer: HTTPAuthorizationCredentials = Depends(jwt_http_bearer),
 ) -> UserPayload:
-    """Get authenticated user payload."""
-    if token := bearer.credentials:  # noqa
-        if data := await jwt_service.decode_token(token):
-            return UserPayload(**data)
+    """Get authenticated user payload, verified once per request."""
+    if bearer.credentials:
+        authentication = get_request_authentication(request)
+        if user_payload := await authentication.get_payload(jwt_service.decode_user_payload):
+            return user_payload
         raise InvalidCredentialsException()
     raise UnauthorizedException()
@@ -2,15 +2,17 @@
 """Authentication endpoints module."""
 from dependency_injector.wiring import Provide, inject
 from django.conf import settings
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Response, status
 from pydantic import EmailStr
 from starlette.background import BackgroundTasks
+from starlette.requests import Request
 
 from src.authentication.api_errors import (InvalidCaptchaException,
                                            NewPasswordInvalidTokenException,
                                            NoFreeNicknameNumberException,
                                            RegisterInvalidEmailException,
-                                           RegisterUserAlreadyExistsException)
+                                           RegisterUserAlreadyExistsException,
+                                           TokenRevocationUnavailableException)
 from src.authentication.dependencies import get_authenticated_user_payload
 from src.authentication.schemas.auth import UserLoginSchema, UserPayload
 from src.authentication.schemas.captchas import CaptchaChallengeSchema
@@ -19,12 +21,14 @@ from src.authentication.schemas.registration import UserRegisterSchema
 from src.authentication.schemas.tokens import (AccessRefreshTokensSchema,
                                                RefreshTokenSchema,
                                                UserLoginRegisterResponseSchema)
-from src.authentication.services import AuthService, CaptchaService
+from src.authentication.services import (AuthService, CaptchaService,
+                                         JWTService)
 from src.core.registry import Registry
 from utils.rate_limiter import RateLimiter, RateLimitException
 from utils.responses.examples_generator import generate_examples
 from utils.responses.http.auth import InvalidCredentialsException
 from utils.responses.http.success import SuccessResponse
+from utils.security.authentication import get_request_authentication
 
 auth_router = APIRouter(prefix="/auth", tags=["Auth"])
 
@@ -103,6 +107,7 @@ async def login(
     response_model=AccessRefreshTokensSchema,
     responses=generate_examples(
         InvalidCredentialsException,
+        TokenRevocationUnavailableException,
     ),
 )
 @inject
@@ -121,6 +126,79 @@ async def refresh_access_token(
     return tokens
 
 
+@auth_router.post(
+    "/logout/",
+    name="auth:logout",
+    summary="Log out. Authentication required.",
+    description="Revoke the access token of the request and the given refresh token.",
+    status_code=status.HTTP_200_OK,
+    responses=generate_examples(
+        InvalidCredentialsException,
+        TokenRevocationUnavailableException,
+        success_responses=[
+            SuccessResponse(message="Logged out successfully."),
+        ],
+    ),
+)
+@inject
+async def logout(
+    request: Request,
+    refresh_token: RefreshTokenSchema,
+    user_payload: UserPayload = Depends(get_authenticated_user_payload),
+    auth_service: AuthService = Depends(Provide[Registry.authentication.auth_service]),
+):
+    """
+    Revoke the tokens of this session.
+    """
+    await auth_service.logout(refresh=refresh_token.refresh, access=get_request_authentication(request).token)
+    return SuccessResponse(message="Logged out successfully.")
+
+
+@auth_router.post(
+    "/logout-all/",
+    name="auth:logout-all",
+    summary="Log out all sessions. Authentication required.",
+    description="Revoke every access and refresh token of the user issued until now, on all devices.",
+    status_code=status.HTTP_200_OK,
+    responses=generate_examples(
+        TokenRevocationUnavailableException,
+        success_responses=[
+            SuccessResponse(message="Logged out of all sessions successfully."),
+        ],
+    ),
+)
+@inject
+async def logout_all(
+    user_payload: UserPayload = Depends(get_authenticated_user_payload),
+    auth_service: AuthService = Depends(Provide[Registry.authentication.auth_service]),
+):
+    """
+    Revoke all tokens of the user.
+    """
+    await auth_service.logout_all(user_payload.id)
+    return SuccessResponse(message="Logged out of all sessions successfully.")
+
+
+@auth_router.get(
+    "/jwks.json",
+    name="auth:jwks",
+    summary="Public keys that verify tokens.",
+    description="JWKS document with the public keys of all accepted key ids, for services that verify tokens "
+    "without the signing key. Empty with a shared secret (HS256).",
+    status_code=status.HTTP_200_OK,
+)
+@inject
+async def get_jwks(
+    response: Response,
+    jwt_service: JWTService = Depends(Provide[Registry.authentication.jwt_service]),
+) -> dict:
+    """
+    Get the JWKS document.
+    """
+    response.headers["Cache-Control"] = f"public, max-age={settings.JWT_JWKS_MAX_AGE}"
+    return jwt_service.jwks
+
+
 @auth_router.post(
     "/request-new-password/{email}/",
     name="auth:request-password",
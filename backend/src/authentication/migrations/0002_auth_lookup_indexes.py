@@ -0,0 +1,25 @@
+# Generated by Django 4.2 on 2026-10-18 09:01
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # indexes are built concurrently, so the tables stay writable during the migration
+    atomic = False
+
+    dependencies = [
+        ('authentication', '0001_initial'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='captchachallenge',
+            index=models.Index(fields=['challenge', 'response'], name='captcha_challenge_response_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='passwordtoken',
+            index=models.Index(fields=['token_hash'], name='password_token_hash_idx'),
+        ),
+    ]
@@ -17,6 +17,10 @@ class CaptchaChallenge(models.Model):
     class Meta:
         """Meta class."""
 
+        indexes = [
+            # captcha verification filters by both, the unique challenge index alone needs a heap recheck
+            models.Index(fields=["challenge", "response"], name="captcha_challenge_response_idx"),
+        ]
         verbose_name = "Задание капчи"
         verbose_name_plural = "Задания капчи"
 
@@ -33,5 +37,9 @@ class PasswordToken(models.Model):
     class Meta:
         """Meta class."""
 
+        indexes = [
+            # filtered on every password confirmation
+            models.Index(fields=["token_hash"], name="password_token_hash_idx"),
+        ]
         verbose_name = "Токен пароля"
         verbose_name_plural = "Токены паролей"
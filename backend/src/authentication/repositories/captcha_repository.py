@@ -3,16 +3,27 @@
 from typing import Optional
 
 from src.authentication.models import CaptchaChallenge
-from utils.repositories import BaseRepository
+from utils.repositories import BaseRepository, PreparedQuery
 
 
 class CaptchaRepository(BaseRepository):
     """Captcha repository."""
 
+    # a challenge is verified right after it is created, replica lag would reject valid captchas
+    read_from_replicas = False
+    prepared_queries = {
+        "by_challenge_and_response": PreparedQuery(fields=("challenge", "response"), first=True),
+    }
+
     def __init__(self):
         """Initiate captcha repository."""
         self.model = CaptchaChallenge
 
     async def get_one_by_challenge_and_response(self, challenge: str, response: str) -> Optional[CaptchaChallenge]:
         """Get captcha challenge by challenge and response."""
-        return await self.model.objects.filter(challenge=challenge, response=response).afirst()
+        return await self.get_one_prepared(
+            "by_challenge_and_response",
+            raise_not_found=False,
+            challenge=challenge,
+            response=response,
+        )
@@ -3,12 +3,18 @@
 from typing import Optional
 
 from src.authentication.models import PasswordToken
-from utils.repositories import BaseRepository
+from utils.repositories import BaseRepository, PreparedQuery
 
 
 class PasswordTokenRepository(BaseRepository):
     """Password token repository."""
 
+    # a token is confirmed right after it is issued, replica lag would reject valid tokens
+    read_from_replicas = False
+    prepared_queries = {
+        "by_token_hash": PreparedQuery(fields=("token_hash",), first=True),
+    }
+
     def __init__(self):
         """Initiate password token repository."""
         self.model = PasswordToken
@@ -27,8 +33,8 @@ class PasswordTokenRepository(BaseRepository):
 
     async def get_one_by_email(self, email: str) -> Optional[PasswordToken]:
         """Get password token by email."""
-        return await self.model.objects.filter(email=email).afirst()
+        return await self._get_queryset(email=email).afirst()
 
     async def get_one_by_token_hash(self, token_hash: str) -> Optional[PasswordToken]:
         """Get password token by token hash."""
-        return await self.model.objects.filter(token_hash=token_hash).afirst()
+        return await self.get_one_prepared("by_token_hash", raise_not_found=False, token_hash=token_hash)
@@ -4,10 +4,12 @@ from .auth_service import AuthService
 from .captcha_service import CaptchaService
 from .jwt_service import JWTService
 from .password_service import PasswordService
+from .token_revocation_service import TokenRevocationService
 
 __all__ = [
     "AuthService",
     "CaptchaService",
     "JWTService",
     "PasswordService",
+    "TokenRevocationService",
 ]
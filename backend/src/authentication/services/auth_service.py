@@ -2,6 +2,7 @@
 """Auth service module."""
 import asyncio
 import functools
+import hashlib
 from typing import Optional, Tuple
 
 from email_validator import validate_email
@@ -21,6 +22,10 @@ from src.authentication.schemas.tokens import AccessRefreshTokensSchema
 from src.authentication.services.captcha_service import CaptchaService
 from src.authentication.services.jwt_service import JWTService
 from src.authentication.services.password_service import PasswordService
+from src.authentication.services.token_revocation_service import \
+    TokenRevocationService
+from src.users.entities import (USER_PASSWORD_FIELDS,
+                                USER_PAYLOAD_DEFERRED_FIELDS)
 from src.users.models import User
 from src.users.services import UserService
 from utils.responses.http.auth import InvalidCredentialsException
@@ -36,12 +41,14 @@ class AuthService(BaseService):
         captcha_service: CaptchaService,
         jwt_service: JWTService,
         password_service: PasswordService,
+        token_revocation_service: TokenRevocationService,
     ):
         """Initiate auth service."""
         self.user_service: UserService = user_service
         self.captcha_service: CaptchaService = captcha_service
         self.jwt_service: JWTService = jwt_service
         self.password_service: PasswordService = password_service
+        self.token_revocation_service: TokenRevocationService = token_revocation_service
 
     async def register_user(self, user_register_schema: UserRegisterSchema):
         """Register user."""
@@ -67,16 +74,17 @@ class AuthService(BaseService):
         if not captcha_is_valid:
             raise InvalidCaptchaException()
 
-        # create user
-        user: User = await self.user_service.create_user(
-            email=user_register_schema.email,
-            password=user_register_schema.password,
-            nickname=user_register_schema.nickname,
-        )
+        # create user and delete captcha in one transaction
+        async with self.unit_of_work():
+            user: User = await self.user_service.create_user(
+                email=user_register_schema.email,
+                password=user_register_schema.password,
+                nickname=user_register_schema.nickname,
+            )
 
-        # delete captcha if exists
-        if captcha_challenge:
-            await self.captcha_service.delete_one(id=captcha_challenge.id)
+            # delete captcha if exists
+            if captcha_challenge:
+                await self.captcha_service.delete_one(id=captcha_challenge.id)
 
         # create tokens
         payload, user_data, tokens = self.get_payload_and_tokens(user)
@@ -93,9 +101,14 @@ class AuthService(BaseService):
             raise InvalidCredentialsException()
 
         # check password
-        if not user.check_password(user_login.password):
+        valid, must_update = await self.password_service.verify_password(user, user_login.password)
+        if not valid:
             raise InvalidCredentialsException()
 
+        # rehash with the current hasher settings, like user.check_password does
+        if must_update:
+            await self.user_service.update_user_password(user=user, new_password=user_login.password)
+
         # create tokens
         payload, user_data, tokens = self.get_payload_and_tokens(user)
 
@@ -110,8 +123,18 @@ class AuthService(BaseService):
         if not refresh_token_payload or refresh_token_payload.get("type") != "refresh":
             raise InvalidCredentialsException()
 
+        # refresh tokens are single use, tokens issued before jti get one from their digest
+        jti = refresh_token_payload.get("jti") or hashlib.sha256(refresh.encode()).hexdigest()
+        if not await self.token_revocation_service.use_once(jti, refresh_token_payload["exp"]):
+            # a used token came back, it leaked: end every session of the user
+            await self.logout_all(refresh_token_payload["id"])
+            raise InvalidCredentialsException()
+
         # get user
-        user = await self.user_service.get_one_by_id(refresh_token_payload["id"])
+        user = await self.user_service.get_one_by_id(
+            refresh_token_payload["id"],
+            defer=USER_PAYLOAD_DEFERRED_FIELDS,
+        )
 
         # check if user exists and is active
         if user is None or not user.is_active:
@@ -125,6 +148,30 @@ class AuthService(BaseService):
 
         return tokens
 
+    async def logout(self, refresh: str, access: str) -> None:
+        """Revoke the access token and the refresh token of a session."""
+        access_token_payload: Optional[dict] = await self.jwt_service.decode_token(access)
+        refresh_token_payload: Optional[dict] = await self.jwt_service.decode_token(refresh)
+
+        # only a refresh token of the same user
+        if (
+            not access_token_payload
+            or not refresh_token_payload
+            or refresh_token_payload.get("type") != "refresh"
+            or refresh_token_payload.get("id") != access_token_payload.get("id")
+        ):
+            raise InvalidCredentialsException()
+
+        for token, payload in ((access, access_token_payload), (refresh, refresh_token_payload)):
+            if payload.get("jti"):
+                await self.token_revocation_service.revoke_token(payload["jti"], payload["exp"])
+            self.jwt_service.revoke_token(token)
+
+    async def logout_all(self, user_id: int) -> None:
+        """Revoke every token of a user issued until now, in all workers."""
+        await self.token_revocation_service.revoke_user(user_id)
+        self.jwt_service.revoke_user_tokens(user_id)
+
     async def update_last_login(self, user: User):
         """Update last login."""
         await self.user_service.update_last_login(user=user)
@@ -149,10 +196,10 @@ class AuthService(BaseService):
 
         # get user
         user: User = await self.user_service.get_one_by_email(password_token.email)
-        # set new password
-        await self.user_service.update_user_password(user=user, new_password=password_token.new_password)
-        # delete password token
-        await self.password_service.delete_one(id=password_token.id)
+        # set new password and delete password token in one transaction
+        async with self.unit_of_work():
+            await self.user_service.update_user_password(user=user, new_password=password_token.new_password)
+            await self.password_service.delete_one(id=password_token.id)
 
         # delete password token
         payload, user_data, tokens = self.get_payload_and_tokens(user)
@@ -187,10 +234,10 @@ class AuthService(BaseService):
     async def change_password(self, change_password_schema: ChangePasswordSchema, user_payload: UserPayload) -> None:
         """Change password."""
         # get user
-        user: User = await self.user_service.get_one_by_id(user_payload.id)
+        user: User = await self.user_service.get_one_by_id(user_payload.id, only=USER_PASSWORD_FIELDS)
 
         # check if old password is correct
-        if not user.check_password(change_password_schema.old_password):
+        if not await self.password_service.check_password(user, change_password_schema.old_password):
             raise ChangePasswordInvalidOldPasswordException()
 
         # set new password
@@ -201,7 +248,7 @@ class AuthService(BaseService):
     async def refresh_payload(self, user_id: int) -> UserPayload:
         """Get new payload."""
         # get user
-        user: User = await self.user_service.get_one(id=user_id)
+        user: User = await self.user_service.get_one(id=user_id, defer=USER_PAYLOAD_DEFERRED_FIELDS)
 
         # create tokens
         payload, user_data, tokens = self.get_payload_and_tokens(user)
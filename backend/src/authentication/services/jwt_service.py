@@ -1,48 +1,124 @@
 # -*- coding: utf-8 -*-
 """JWT Service module."""
 import logging
+import time
+import uuid
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, List, Optional
 
 import jwt
 
+from src.authentication.schemas.auth import UserPayload
 from src.authentication.schemas.tokens import AccessRefreshTokensSchema
+from src.authentication.services.token_revocation_service import \
+    TokenRevocationService
+from utils.security.jwt_keys import JWTKeySet
+from utils.security.token_cache import VerifiedTokenCache
 from utils.services import BaseService
 
 logger = logging.getLogger(__name__)
 
 
+class VerifiedToken:
+    """Payload of a verified token and the user payload built from it."""
+
+    __slots__ = ("payload", "user_payload")
+
+    def __init__(self, payload: dict):
+        """Initialize verified token."""
+        self.payload = payload
+        self.user_payload: Optional[UserPayload] = None
+
+
 class JWTService(BaseService):
-    """Set up the JWT Backend with the given cache backend and private key."""
+    """Set up the JWT Backend with the given cache backend and keys."""
 
     def __init__(
         self,
         access_expiration: int,
         refresh_expiration: int,
-        jwt_secret_key: str,
-        jwt_algorithm: str,
+        key_set: JWTKeySet,
+        token_cache_size: int = 0,
+        token_revocation_service: Optional[TokenRevocationService] = None,
     ):
-        """Initialize the JWT Backend."""
+        """
+        Initialize the JWT Backend. Verified tokens are cached if ``token_cache_size`` is set.
+
+        Tokens are signed with the signing key of ``key_set`` and verified with the key of their ``kid``.
+        With ``token_revocation_service`` revoked tokens are rejected.
+        """
         self.access_expiration = access_expiration
         self.refresh_expiration = refresh_expiration
-        self._jwt_secret_key = jwt_secret_key
-        self._jwt_algorithm = jwt_algorithm
+        self.key_set = key_set
+        self.token_cache = VerifiedTokenCache(max_size=token_cache_size)
+        self.token_revocation_service = token_revocation_service
 
     async def decode_token(self, token: str, leeway: int = 0) -> Optional[dict]:
         """Decode a token."""
-        if token:
-            try:
-                payload = jwt.decode(
-                    token,
-                    self._jwt_secret_key,
-                    leeway=leeway,
-                    algorithms=self._jwt_algorithm,
-                )
-                return payload
-            except Exception as e:
-                logger.warning(e)
-                return None
-        return None
+        verified = await self._get_verified_token(token, leeway)
+        # a copy, so callers can not change the cached payload
+        return dict(verified.payload) if verified else None
+
+    async def decode_user_payload(self, token: str) -> Optional[UserPayload]:
+        """Decode a token into the user payload, built once per token and cached with it."""
+        verified = await self._get_verified_token(token)
+        if verified is None:
+            return None
+        if verified.user_payload is None:
+            verified.user_payload = UserPayload(**verified.payload)
+        return verified.user_payload
+
+    @property
+    def jwks(self) -> Dict[str, List[Dict[str, str]]]:
+        """Public verification keys as a JWKS document."""
+        return self.key_set.jwks
+
+    def revoke_token(self, token: str) -> None:
+        """Drop a token from the verified token cache, call it when the token is revoked."""
+        self.token_cache.evict(token)
+
+    def revoke_user_tokens(self, user_id: int) -> int:
+        """Drop all cached tokens of a user, call it when the user is deactivated or logged out everywhere."""
+        return self.token_cache.evict_where(lambda verified: verified.payload.get("id") == user_id)
+
+    async def _get_verified_token(self, token: str, leeway: int = 0) -> Optional[VerifiedToken]:
+        """Verify a token and check it was not revoked, the cache only saves the verification."""
+        verified = self._verify_token(token, leeway)
+        if verified is None or self.token_revocation_service is None:
+            return verified
+        if await self.token_revocation_service.is_revoked(verified.payload):
+            self.revoke_token(token)
+            return None
+        return verified
+
+    def _verify_token(self, token: str, leeway: int = 0) -> Optional[VerifiedToken]:
+        """Verify a token, a token that was already verified comes from the cache until it expires."""
+        if not token:
+            return None
+
+        verified = self.token_cache.get(token)
+        if verified is not None:
+            return verified
+
+        try:
+            kid = jwt.get_unverified_header(token).get("kid")
+            key = self.key_set.get(kid)
+            if key is None:
+                raise jwt.InvalidKeyError(f"Unknown JWT key id {kid}")
+            payload = jwt.decode(
+                token,
+                key.verifying_key,
+                leeway=leeway,
+                algorithms=[key.algorithm],
+            )
+        except Exception as e:
+            logger.warning(e)
+            return None
+
+        verified = VerifiedToken(payload)
+        if isinstance(payload.get("exp"), (int, float)):
+            self.token_cache.set(token, verified, payload["exp"])
+        return verified
 
     def _create_token(
         self,
@@ -57,8 +133,19 @@ class JWTService(BaseService):
         else:
             exp = datetime.utcnow() + timedelta(seconds=60)
 
-        payload |= {"iat": iat, "exp": exp, "type": token_type}
-        token = jwt.encode(payload=payload, key=self._jwt_secret_key, algorithm=self._jwt_algorithm)
+        key = self.key_set.signing_key
+        if key is None:
+            raise RuntimeError("JWT keys have no signing key, this service can only verify tokens")
+
+        # ``iat`` has whole seconds, ``iat_ms`` orders the token against a revocation of the same second
+        payload |= {
+            "iat": iat,
+            "iat_ms": int(time.time() * 1000),
+            "exp": exp,
+            "type": token_type,
+            "jti": uuid.uuid4().hex,
+        }
+        token = jwt.encode(payload=payload, key=key.signing_key, algorithm=key.algorithm, headers={"kid": key.kid})
         if isinstance(token, bytes):
             # For PyJWT <= 1.7.1
             return token.decode("utf-8")
@@ -3,7 +3,6 @@
 import hashlib
 from typing import Optional, Tuple
 
-from django.contrib.auth.hashers import make_password
 from passlib import pwd
 from passlib.pwd import genword
 
@@ -11,6 +10,7 @@ from src.authentication.models import PasswordToken
 from src.authentication.repositories.password_token_repository import \
     PasswordTokenRepository
 from src.users.models import User
+from utils.security.hashers import PasswordHasher
 from utils.services import BaseService
 
 
@@ -19,29 +19,38 @@ class PasswordService(BaseService):
 
     repository: PasswordTokenRepository
 
-    def __init__(self, password_token_repository: PasswordTokenRepository):
+    def __init__(self, password_token_repository: PasswordTokenRepository, password_hasher: PasswordHasher):
         """Init password service."""
         self.repository = password_token_repository
+        self.password_hasher = password_hasher
 
-    @staticmethod
-    def check_password(
+    async def check_password(
+        self,
         user: User,
         raw_password: str,
     ) -> bool:
         """Check password."""
-        return user.check_password(raw_password)
+        valid, must_update = await self.verify_password(user, raw_password)
+        return valid
 
-    @staticmethod
-    def set_password(user: User, raw_password: str) -> User:
-        """Set password."""
-        user.set_password(raw_password)
+    async def verify_password(self, user: User, raw_password: str) -> Tuple[bool, bool]:
+        """
+        Check password off the event loop.
+
+        Returns if the password is valid and if its hash uses outdated hasher settings and should be set again.
+        """
+        return await self.password_hasher.check_password(raw_password, user.password)
+
+    async def set_password(self, user: User, raw_password: str) -> User:
+        """Set password like ``user.set_password``, the hash is computed off the event loop."""
+        user.password = await self.hash_password(raw_password)
+        # lets the password validators know about the change on save
+        user._password = raw_password
         return user
 
-    @staticmethod
-    def hash_password(raw_password: str) -> str:
+    async def hash_password(self, raw_password: str) -> str:
         """Hash password."""
-        password = make_password(raw_password)
-        return password
+        return await self.password_hasher.make_password(raw_password)
 
     @staticmethod
     def hash_token(string: str) -> str:
@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+"""Token revocation service module."""
+import asyncio
+import contextlib
+import logging
+import math
+import time
+from typing import List, Optional
+
+from redis.asyncio import Redis
+from redis.asyncio.utils import from_url
+from redis.exceptions import RedisError
+
+from src.authentication.api_errors import TokenRevocationUnavailableException
+from utils.security.bloom_filter import BloomFilter
+from utils.services import BaseService
+
+logger = logging.getLogger(__name__)
+
+# every worker adds the revocations published here to its Bloom filter, messages are "jti:<jti>" or "user:<id>"
+REVOKED_CHANNEL = "jwt:revoked"
+# single use marks of refresh tokens
+USED_KEY = "jwt:used:{jti}"
+# revoked tokens, kept until the token expires
+REVOKED_KEY = "jwt:revoked:{jti}"
+# unix time of the last "log out all sessions" of a user, tokens issued until then are revoked
+USER_REVOKED_KEY = "jwt:user-revoked:{user_id}"
+
+
+class TokenRevocationService(BaseService):
+    """
+    Revoked tokens and users in Redis, mirrored by a Bloom filter in every worker.
+
+    The filter has no false negatives, so a token that is not in it was not revoked and needs no Redis round trip.
+    A hit, true or false positive, is confirmed in Redis. The filter is filled from Redis and then kept in sync
+    over pub/sub. Until it is in sync, e.g. right after start or while reconnecting, every check asks Redis.
+
+    If Redis can not be asked, the filter decides on its own: tokens it flags are rejected (fail closed), the others
+    are accepted (fail open). Revocations are stored in Redis, so none can be made while it is unreachable, but
+    the filter misses those published while this worker was disconnected, and it is empty if Redis was never
+    reachable since start. Using a refresh token and revoking tokens need Redis, without it they raise
+    ``TokenRevocationUnavailableException``.
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        user_revocation_timeout: int,
+        bloom_capacity: int = 100_000,
+        bloom_error_rate: float = 0.001,
+        reconnect_delay: float = 1.0,
+    ):
+        """Initialize service. ``user_revocation_timeout`` is the lifetime of the longest living token."""
+        self.redis_url = redis_url
+        self.user_revocation_timeout = int(user_revocation_timeout)
+        self.bloom_capacity = bloom_capacity
+        self.bloom_error_rate = bloom_error_rate
+        self.reconnect_delay = reconnect_delay
+        self.bloom = BloomFilter(bloom_capacity, bloom_error_rate)
+        self.is_synced = False
+        self._redis: Optional[Redis] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listener: Optional[asyncio.Task] = None
+
+    @property
+    def redis(self) -> Redis:
+        """Get the client of the running event loop, the pub/sub listener is started with it."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self.is_synced = False
+            self._redis = from_url(self.redis_url, decode_responses=True)
+            self._listener = loop.create_task(self._listen())
+        return self._redis
+
+    async def is_revoked(self, payload: dict) -> bool:
+        """Check if the token of a verified payload was revoked, by its ``jti`` or by its user."""
+        jti, user_id = payload.get("jti"), payload.get("id")
+        redis = self.redis
+        flagged = (jti is not None and f"jti:{jti}" in self.bloom) or (
+            user_id is not None and f"user:{user_id}" in self.bloom
+        )
+        if self.is_synced and not flagged:
+            return False
+
+        try:
+            revoked, revoked_at = await redis.mget(
+                REVOKED_KEY.format(jti=jti),
+                USER_REVOKED_KEY.format(user_id=user_id),
+            )
+        except RedisError as e:
+            logger.warning(f"Revoked tokens are checked with the Bloom filter only, Redis is unreachable: {e}")
+            return flagged
+
+        if jti is not None and revoked is not None:
+            return True
+        if user_id is None or revoked_at is None:
+            return False
+        # tokens issued before ``iat_ms`` was added have whole seconds, one of the revocation second is revoked too
+        issued_at = payload["iat_ms"] / 1000 if "iat_ms" in payload else payload.get("iat", 0)
+        return issued_at <= float(revoked_at)
+
+    async def use_once(self, jti: str, expires_at: int) -> bool:
+        """Mark a token as used, returns ``False`` if it was used before."""
+        timeout = max(1, math.ceil(expires_at - time.time()))
+        try:
+            return bool(await self.redis.set(USED_KEY.format(jti=jti), 1, nx=True, ex=timeout))
+        except RedisError as e:
+            # a refresh token that can not be marked as used could be replayed
+            logger.warning(f"Refresh token can not be used, Redis is unreachable: {e}")
+            raise TokenRevocationUnavailableException()
+
+    async def revoke_token(self, jti: str, expires_at: int) -> None:
+        """Revoke a token until it expires."""
+        timeout = math.ceil(expires_at - time.time())
+        if timeout <= 0:
+            return
+        try:
+            await self.redis.set(REVOKED_KEY.format(jti=jti), 1, ex=timeout)
+            await self._publish(f"jti:{jti}")
+        except RedisError as e:
+            logger.warning(f"Token can not be revoked, Redis is unreachable: {e}")
+            raise TokenRevocationUnavailableException()
+
+    async def revoke_user(self, user_id: int) -> None:
+        """Revoke all tokens of a user issued until now."""
+        try:
+            await self.redis.set(
+                USER_REVOKED_KEY.format(user_id=user_id), time.time(), ex=self.user_revocation_timeout
+            )
+            await self._publish(f"user:{user_id}")
+        except RedisError as e:
+            logger.warning(f"User tokens can not be revoked, Redis is unreachable: {e}")
+            raise TokenRevocationUnavailableException()
+
+    async def _publish(self, item: str) -> None:
+        """Add a revocation to the filter of this worker and publish it to the others."""
+        self.bloom.add(item)
+        await self.redis.publish(REVOKED_CHANNEL, item)
+
+    async def close(self) -> None:
+        """Stop the pub/sub listener and close the client, e.g. on shutdown."""
+        # the listener and the client of an event loop that is gone can only be dropped
+        running = self._loop is asyncio.get_running_loop()
+        if self._listener is not None:
+            self._listener.cancel()
+            if running:
+                with contextlib.suppress(asyncio.CancelledError):
+                    await self._listener
+        if self._redis is not None and running:
+            await self._redis.close()
+        self._redis, self._loop, self._listener = None, None, None
+        self.is_synced = False
+
+    async def _load(self) -> None:
+        """Rebuild the filter from Redis, revocations that expired meanwhile are dropped."""
+        items: List[str] = []
+        async for key in self._redis.scan_iter(match=REVOKED_KEY.format(jti="*"), count=1000):
+            items.append(f"jti:{key.rsplit(':', 1)[1]}")
+        async for key in self._redis.scan_iter(match=USER_REVOKED_KEY.format(user_id="*"), count=1000):
+            items.append(f"user:{key.rsplit(':', 1)[1]}")
+
+        # room for as many new revocations again before the next rebuild
+        bloom = BloomFilter(max(self.bloom_capacity, 2 * len(items)), self.bloom_error_rate)
+        for item in items:
+            bloom.add(item)
+        self.bloom = bloom
+
+    async def _listen(self) -> None:
+        """Keep the filter in sync, reconnects until the event loop stops."""
+        while True:
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                # subscribed before loading, revocations published meanwhile wait in the subscription
+                await pubsub.subscribe(REVOKED_CHANNEL)
+                await self._load()
+                self.is_synced = True
+                async for message in pubsub.listen():
+                    self.bloom.add(message["data"])
+                    if self.bloom.is_full:
+                        await self._load()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Revoked tokens are checked in Redis until it is reachable again: {e}")
+            finally:
+                self.is_synced = False
+                await pubsub.reset()
+            await asyncio.sleep(self.reconnect_delay)
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""Request authentication test."""
+import time
+from typing import AsyncIterator, Optional
+
+import jwt
+import pytest
+from fastapi import Depends, FastAPI
+from httpx import ASGITransport, AsyncClient
+from starlette.requests import Request
+
+from src.authentication.dependencies import (get_authenticated_user_payload,
+                                             get_user_payload)
+from src.authentication.schemas.auth import UserPayload
+from src.authentication.services import JWTService
+from src.authentication.tests.test_token_cache import (SECRET, RevokedTokens,
+                                                       create_service,
+                                                       get_payload)
+from utils.middleware import AuthenticationMiddleware
+from utils.security.authentication import get_request_authentication
+from utils.security.jwt_keys import HS256
+
+
+@pytest.fixture
+def revoked() -> RevokedTokens:
+    """Revoked tokens of the JWT service."""
+    return RevokedTokens()
+
+
+@pytest.fixture
+def jwt_service(revoked: RevokedTokens) -> JWTService:
+    """JWT service whose tokens are checked against ``revoked``."""
+    return create_service(token_revocation_service=revoked)
+
+
+@pytest.fixture
+async def auth_client(jwt_service: JWTService) -> AsyncIterator[AsyncClient]:
+    """Client of an app with one route that needs authentication, the JWT service is overridden."""
+    # the registry wires the dependencies, it can only be imported once it is built
+    from src.core.registry import registry
+
+    app = FastAPI()
+    app.add_middleware(AuthenticationMiddleware)
+
+    @app.get("/me")
+    async def me(
+        optional: Optional[UserPayload] = Depends(get_user_payload),
+        user_payload: UserPayload = Depends(get_authenticated_user_payload),
+    ):
+        assert optional is user_payload
+        return {"id": user_payload.id}
+
+    with registry.authentication.jwt_service.override(jwt_service):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            yield client
+
+
+def bearer(token: str) -> dict:
+    """Get the ``Authorization`` header of a token."""
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.mark.anyio
+async def test_valid_token_is_verified_once(auth_client: AsyncClient, jwt_service: JWTService, monkeypatch) -> None:
+    """
+    Test a valid token is accepted and verified once, though two dependencies need it.
+    """
+    token = jwt_service.create_access_token(get_payload(1))
+    decoded = []
+    decode = jwt_service.decode_user_payload
+
+    async def counting_decode(token: str):
+        decoded.append(token)
+        return await decode(token)
+
+    monkeypatch.setattr(jwt_service, "decode_user_payload", counting_decode)
+    response = await auth_client.get("/me", headers=bearer(token))
+
+    assert response.status_code == 200
+    assert response.json() == {"id": 1}
+    assert decoded == [token]
+
+
+@pytest.mark.anyio
+async def test_invalid_tokens_are_rejected(
+    auth_client: AsyncClient,
+    jwt_service: JWTService,
+    revoked: RevokedTokens,
+) -> None:
+    """
+    Test expired, revoked and malformed tokens are rejected with 401.
+    """
+    expired = jwt.encode(
+        get_payload(1) | {"exp": int(time.time()) - 10, "type": "access"},
+        SECRET,
+        algorithm=HS256,
+        headers={"kid": HS256},
+    )
+    revoked_token = jwt_service.create_access_token(get_payload(1))
+    revoked.revoked.add(jwt.decode(revoked_token, options={"verify_signature": False})["jti"])
+
+    for token in (expired, revoked_token, "not-a-token", jwt_service.create_access_token(get_payload(1))[:-2]):
+        response = await auth_client.get("/me", headers=bearer(token))
+        assert response.status_code == 401, token
+
+
+@pytest.mark.anyio
+async def test_missing_credentials_are_rejected(auth_client: AsyncClient) -> None:
+    """
+    Test a request without the header or with another scheme is rejected with 403.
+    """
+    assert (await auth_client.get("/me")).status_code == 403
+    assert (await auth_client.get("/me", headers={"Authorization": "Bearer"})).status_code == 403
+    assert (await auth_client.get("/me", headers={"Authorization": "Basic dXNlcjpwYXNz"})).status_code == 403
+
+
+@pytest.mark.anyio
+async def test_request_authentication_without_middleware() -> None:
+    """
+    Test the authentication is created on first use without the middleware and verifies its token once.
+    """
+    request = Request({"type": "http", "headers": [(b"authorization", b"bearer token")]})
+    authentication = get_request_authentication(request)
+    assert get_request_authentication(request) is authentication
+    assert authentication.is_provided and authentication.token == "token"
+
+    decoded = []
+
+    async def decode(token: str):
+        decoded.append(token)
+
+    assert await authentication.get_payload(decode) is None
+    assert await authentication.get_payload(decode) is None
+    assert decoded == ["token"]
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""Single statement delete test."""
+import pytest
+from asgiref.sync import sync_to_async
+from django.db import connection
+
+from src.authentication.models import CaptchaChallenge
+from src.authentication.repositories import CaptchaRepository
+from utils.responses.http.api import NotFoundException
+
+
+@pytest.fixture
+async def challenges(transactional_db: None) -> None:
+    """Three captcha challenges, two with the same response."""
+    await CaptchaChallenge.objects.abulk_create(
+        [
+            CaptchaChallenge(challenge="first", response="same"),
+            CaptchaChallenge(challenge="second", response="same"),
+            CaptchaChallenge(challenge="third", response="other"),
+        ]
+    )
+
+
+@pytest.mark.anyio
+async def test_fast_delete_one(challenges: None) -> None:
+    """
+    Test a unique and a non unique filter delete one row with one statement, outside of a transaction.
+    """
+    repository = CaptchaRepository()
+    statements = []
+
+    def execute(execute, sql, params, many, context):
+        statements.append((sql, context["connection"].in_atomic_block))
+        return execute(sql, params, many, context)
+
+    @sync_to_async
+    def delete_one(**kwargs):
+        with connection.execute_wrapper(execute):
+            return repository.delete_one_sync(**kwargs)
+
+    assert await delete_one(challenge="first") == (1, {"authentication.CaptchaChallenge": 1})
+    await delete_one(response="other")
+
+    assert len(statements) == 2
+    assert all(sql.startswith("DELETE") and not in_atomic_block for sql, in_atomic_block in statements)
+    assert [item.challenge async for item in CaptchaChallenge.objects.all()] == ["second"]
+
+
+@pytest.mark.anyio
+async def test_fast_delete_one_multiple(challenges: None) -> None:
+    """
+    Test a filter matching several rows deletes none of them.
+    """
+    with pytest.raises(CaptchaChallenge.MultipleObjectsReturned):
+        await CaptchaRepository().delete_one(response="same")
+
+    assert await CaptchaChallenge.objects.acount() == 3
+
+    with pytest.raises(NotFoundException):
+        await CaptchaRepository().delete_one(challenge="missing")
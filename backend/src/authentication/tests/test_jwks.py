@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""JWKS test."""
+from typing import Tuple
+
+import jwt
+import pytest
+from fastapi import Response
+
+from src.authentication.services import JWTService
+from utils.security.jwt_keys import ES256, HS256, load_key_set
+
+ec = pytest.importorskip("cryptography.hazmat.primitives.asymmetric.ec")
+serialization = pytest.importorskip("cryptography.hazmat.primitives.serialization")
+
+
+def write_key_pair(path, name: str):
+    """Write a new P-256 key pair, returns the private and public key files."""
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    private_file, public_file = path / f"{name}.pem", path / f"{name}.pub.pem"
+    private_file.write_bytes(
+        private_key.private_bytes(
+            serialization.Encoding.PEM,
+            serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption(),
+        )
+    )
+    public_file.write_bytes(
+        private_key.public_key().public_bytes(
+            serialization.Encoding.PEM,
+            serialization.PublicFormat.SubjectPublicKeyInfo,
+        )
+    )
+    return str(private_file), str(public_file)
+
+
+async def get_jwks_response(jwt_service: JWTService) -> Tuple[dict, Response]:
+    """Call the ``/jwks.json`` endpoint with a JWT service, returns the document and the response."""
+    # the registry wires the endpoints, they can only be imported once it is built
+    from src.authentication.endpoints import get_jwks
+
+    response = Response()
+    return await get_jwks(response, jwt_service=jwt_service), response
+
+
+@pytest.mark.anyio
+async def test_jwks_shared_secret() -> None:
+    """
+    Test the shared secret is not published.
+    """
+    jwt_service = JWTService(60, 60, load_key_set(HS256, "test-secret-key-of-at-least-32-bytes"))
+    jwks, response = await get_jwks_response(jwt_service)
+
+    assert jwks == {"keys": []}
+    assert "max-age" in response.headers["cache-control"]
+
+
+@pytest.mark.anyio
+async def test_jwks_key_rotation(tmp_path) -> None:
+    """
+    Test tokens of the previous key stay valid after a rotation and both public keys are published.
+    """
+    old_private_file, old_public_file = write_key_pair(tmp_path, "old")
+    new_private_file, _ = write_key_pair(tmp_path, "new")
+
+    old_service = JWTService(60, 60, load_key_set(ES256, "", old_private_file, key_id="old"))
+    new_service = JWTService(60, 60, load_key_set(ES256, "", new_private_file, "new", {"old": old_public_file}))
+    old_token = old_service.create_access_token({"id": 1})
+    new_token = new_service.create_access_token({"id": 1})
+
+    assert jwt.get_unverified_header(new_token)["kid"] == "new"
+    assert (await new_service.decode_token(old_token))["id"] == 1
+    assert (await new_service.decode_token(new_token))["id"] == 1
+    assert await old_service.decode_token(new_token) is None
+
+    jwks, response = await get_jwks_response(new_service)
+    keys = {key["kid"]: key for key in jwks["keys"]}
+    assert set(keys) == {"old", "new"}
+    assert all(key["alg"] == ES256 and key["kty"] == "EC" and key["crv"] == "P-256" for key in keys.values())
+    assert not any("d" in key for key in keys.values())
+    assert "max-age" in response.headers["cache-control"]
+
+    # a verify-only service publishes the same keys and signs nothing
+    verify_only = JWTService(60, 60, load_key_set(ES256, "", key_id="new", public_key_files={"old": old_public_file}))
+    assert (await verify_only.decode_token(old_token))["id"] == 1
+    with pytest.raises(RuntimeError):
+        verify_only.create_access_token({"id": 1})
@@ -8,7 +8,9 @@ from src.users.models import User
 
 
 @pytest.mark.anyio
-async def test_login(fastapi_app: FastAPI, httpx: AsyncClient, db: None, test_user: User) -> str:
+async def test_login(
+    fastapi_app: FastAPI, httpx: AsyncClient, db: None, test_user: User, assert_max_queries
+) -> str:
     """
     Test get captcha.
     """
@@ -16,7 +18,8 @@ async def test_login(fastapi_app: FastAPI, httpx: AsyncClient, db: None, test_us
         "email": test_user.email,
         "password": "pass12345",
     }
-    response = await httpx.post("/auth/login/", json=data)
+    with assert_max_queries(1):
+        response = await httpx.post("/auth/login/", json=data)
     print(data, response.json())
 
     assert response.status_code == 200
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""Logout and refresh rotation test."""
+from typing import AsyncIterator
+
+import pytest
+from django.conf import settings
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+from src.authentication.schemas.tokens import AccessRefreshTokensSchema
+from src.authentication.services import AuthService, TokenRevocationService
+from src.authentication.tests.test_token_cache import get_payload
+from src.users.models import User
+from utils.middleware import AuthenticationMiddleware
+
+
+async def create_client(redis_url: str) -> AsyncIterator[AsyncClient]:
+    """Client of an app with the auth routes, revoked tokens are kept in the Redis of ``redis_url``."""
+    # the registry wires the endpoints, they can only be imported once it is built
+    from src.authentication.endpoints import auth_router
+    from src.core.registry import registry
+
+    app = FastAPI()
+    app.include_router(auth_router)
+    app.add_middleware(AuthenticationMiddleware)
+
+    # services bound to a revocation service of this event loop
+    service = TokenRevocationService(redis_url, settings.REFRESH_TOKEN_EXPIRE_SECONDS, reconnect_delay=0.01)
+    singletons = (registry.authentication.jwt_service, registry.authentication.auth_service)
+    with registry.authentication.token_revocation_service.override(service):
+        for singleton in singletons:
+            singleton.reset()
+        try:
+            async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+                yield client
+        finally:
+            await service.close()
+            for singleton in singletons:
+                singleton.reset()
+
+
+def url(name: str) -> str:
+    """Get the path of an auth route."""
+    from src.authentication.endpoints import auth_router
+
+    return auth_router.url_path_for(name)
+
+
+@pytest.fixture
+async def auth_client(monkeypatch) -> AsyncIterator[AsyncClient]:
+    """Client of the auth routes."""
+    # tokens of the test payload, the user model has none of the profile fields of ``UserPayload``
+    monkeypatch.setattr(
+        AuthService,
+        "get_payload_and_tokens",
+        lambda self, user: (None, get_payload(user.id), self.jwt_service.create_tokens(get_payload(user.id))),
+    )
+    # the user service has no ``update_last_login`` yet
+    monkeypatch.setattr(AuthService, "update_last_login", lambda self, user: None)
+    async for client in create_client(settings.REDIS_URL):
+        yield client
+
+
+@pytest.fixture
+async def user_tokens(transactional_db: None) -> AccessRefreshTokensSchema:
+    """Tokens of a new user."""
+    # the registry is built once django is set up
+    from src.core.registry import registry
+
+    user = await User.objects.acreate(email="user@example.com")
+    return registry.authentication.jwt_service().create_tokens(get_payload(user.id))
+
+
+@pytest.mark.anyio
+async def test_refresh_token_single_use(auth_client: AsyncClient, user_tokens: AccessRefreshTokensSchema) -> None:
+    """
+    Test a refresh token can be used once, reusing it ends all sessions.
+    """
+    path = url("auth:refresh")
+    response = await auth_client.post(path, json={"refresh": user_tokens.refresh})
+    assert response.status_code == 200
+    rotated_refresh = response.json()["refresh"]
+
+    response = await auth_client.post(path, json={"refresh": user_tokens.refresh})
+    assert response.status_code == 401
+
+    # the rotated token was issued before the reuse, so it is revoked with the user
+    response = await auth_client.post(path, json={"refresh": rotated_refresh})
+    assert response.status_code == 401
+
+
+@pytest.mark.anyio
+async def test_logout(auth_client: AsyncClient, user_tokens: AccessRefreshTokensSchema) -> None:
+    """
+    Test logout revokes the access token of the request and the given refresh token.
+    """
+    headers = {"Authorization": f"Bearer {user_tokens.access}"}
+    path = url("auth:logout")
+    response = await auth_client.post(path, headers=headers, json={"refresh": user_tokens.refresh})
+    assert response.status_code == 200
+
+    response = await auth_client.post(path, headers=headers, json={"refresh": user_tokens.refresh})
+    assert response.status_code == 401
+
+    path = url("auth:refresh")
+    response = await auth_client.post(path, json={"refresh": user_tokens.refresh})
+    assert response.status_code == 401
+
+
+@pytest.mark.anyio
+async def test_logout_all(auth_client: AsyncClient, user_tokens: AccessRefreshTokensSchema) -> None:
+    """
+    Test logout of all sessions revokes the access and the refresh tokens.
+    """
+    headers = {"Authorization": f"Bearer {user_tokens.access}"}
+    path = url("auth:logout-all")
+    response = await auth_client.post(path, headers=headers)
+    assert response.status_code == 200
+
+    response = await auth_client.post(path, headers=headers)
+    assert response.status_code == 401
+
+    path = url("auth:refresh")
+    response = await auth_client.post(path, json={"refresh": user_tokens.refresh})
+    assert response.status_code == 401
+
+
+@pytest.mark.anyio
+async def test_unreachable_redis(user_tokens: AccessRefreshTokensSchema) -> None:
+    """
+    Test refresh and logout answer 503 while Redis is unreachable, tokens could not be used once or revoked.
+    """
+    async for client in create_client("redis://127.0.0.1:1/0"):
+        headers = {"Authorization": f"Bearer {user_tokens.access}"}
+        requests = (
+            ("auth:refresh", {}, {"refresh": user_tokens.refresh}),
+            ("auth:logout", headers, {"refresh": user_tokens.refresh}),
+            ("auth:logout-all", headers, None),
+        )
+        for name, request_headers, data in requests:
+            response = await client.post(url(name), headers=request_headers, json=data)
+            assert response.status_code == 503, name
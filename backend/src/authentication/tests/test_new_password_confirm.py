@@ -10,6 +10,7 @@ from src.authentication.models import PasswordToken
 from src.authentication.repositories import PasswordTokenRepository
 from src.authentication.services import PasswordService
 from src.users.models import User
+from utils.security.hashers import PasswordHasher
 
 
 @pytest.mark.anyio
@@ -21,6 +22,7 @@ async def test_new_password_confirm(
     """
     password_service = PasswordService(
         password_token_repository=PasswordTokenRepository(),
+        password_hasher=PasswordHasher(),
     )
     new_password, token = await password_service.generate_password_token(email=test_user.email)
 
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""Verified token cache test."""
+import asyncio
+import time
+from typing import Set
+
+import jwt
+import pytest
+from fastapi.encoders import jsonable_encoder
+
+from src.authentication.schemas.auth import UserPayload
+from src.authentication.services import JWTService
+from utils.security import token_cache
+from utils.security.jwt_keys import HS256, JWTKey, JWTKeySet
+from utils.security.token_cache import VerifiedTokenCache
+
+SECRET = b"test-secret-key-of-at-least-32-bytes"
+
+
+def get_payload(user_id: int) -> dict:
+    """Get the token payload of a user, as the auth service builds it."""
+    return jsonable_encoder(
+        UserPayload(
+            id=user_id,
+            email="user@example.com",
+            nickname="user",
+            nickname_number=1,
+            is_active=True,
+            is_premium=False,
+            is_censorship_enabled=False,
+            is_language_english=True,
+            is_thumbnail_modern=True,
+        )
+    )
+
+
+class RevokedTokens:
+    """Revocation service of the tokens whose ``jti`` is in ``revoked``."""
+
+    def __init__(self):
+        """Initialize revoked tokens."""
+        self.revoked: Set[str] = set()
+
+    async def is_revoked(self, payload: dict) -> bool:
+        """Check if a token was revoked."""
+        return payload["jti"] in self.revoked
+
+
+def create_service(access_expiration: int = 60, **kwargs) -> JWTService:
+    """Create a JWT service with a shared secret and a verified token cache."""
+    key_set = JWTKeySet(JWTKey(HS256, HS256, SECRET, SECRET), [])
+    return JWTService(access_expiration, 60, key_set, token_cache_size=10, **kwargs)
+
+
+@pytest.fixture
+def decode_calls(monkeypatch) -> list:
+    """Count the signature verifications."""
+    calls = []
+    decode = jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        calls.append(args[0])
+        return decode(*args, **kwargs)
+
+    monkeypatch.setattr(jwt, "decode", counting_decode)
+    return calls
+
+
+def test_hits_expiry_and_size_bound(monkeypatch) -> None:
+    """
+    Test cached tokens are served until they expire and the least recently used is dropped beyond the size.
+    """
+    cache = VerifiedTokenCache(max_size=2)
+    now = time.time()
+    cache.set("first", 1, now + 10)
+    cache.set("second", 2, now + 20)
+    assert cache.get("first") == 1 and cache.get("missing") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # ``first`` was used last, so ``second`` makes room
+    cache.set("third", 3, now + 30)
+    assert len(cache) == 2
+    assert cache.get("second") is None and cache.get("first") == 1 and cache.get("third") == 3
+
+    monkeypatch.setattr(token_cache.time, "time", lambda: now + 15)
+    assert cache.get("first") is None and cache.get("third") == 3
+    assert len(cache) == 1
+
+    # expired and disabled caches store nothing
+    cache.set("expired", 4, now + 5)
+    assert cache.get("expired") is None
+    disabled = VerifiedTokenCache(max_size=0)
+    disabled.set("token", 1, now + 10)
+    assert len(disabled) == 0
+
+
+@pytest.mark.anyio
+async def test_token_is_verified_once(decode_calls: list) -> None:
+    """
+    Test a token is verified once and then served from the cache, callers get their own payload copy.
+    """
+    service = create_service()
+    token = service.create_access_token(get_payload(1))
+
+    payload = await service.decode_token(token)
+    payload["id"] = 2
+    assert (await service.decode_token(token))["id"] == 1
+    assert (await service.decode_user_payload(token)) is (await service.decode_user_payload(token))
+    assert len(decode_calls) == 1
+    assert service.token_cache.hits == 3
+
+
+@pytest.mark.anyio
+async def test_expired_token_is_not_served(decode_calls: list) -> None:
+    """
+    Test a cached token is verified again once it expired and then rejected.
+    """
+    service = create_service(access_expiration=1)
+    token = service.create_access_token(get_payload(1))
+    payload = await service.decode_token(token)
+    assert payload is not None
+
+    await asyncio.sleep(max(payload["exp"] - time.time(), 0) + 0.05)
+    assert await service.decode_token(token) is None
+    assert len(decode_calls) == 2
+    assert len(service.token_cache) == 0
+
+
+@pytest.mark.anyio
+async def test_revoked_token_is_not_served() -> None:
+    """
+    Test a cached token is rejected and evicted once it is revoked, alone or with all tokens of its user.
+    """
+    revoked = RevokedTokens()
+    service = create_service(token_revocation_service=revoked)
+    first, second = service.create_access_token(get_payload(1)), service.create_access_token(get_payload(1))
+    other = service.create_access_token(get_payload(2))
+    for token in (first, second, other):
+        assert await service.decode_token(token) is not None
+    assert len(service.token_cache) == 3
+
+    revoked.revoked.add(jwt.decode(first, options={"verify_signature": False})["jti"])
+    assert await service.decode_token(first) is None
+    assert await service.decode_user_payload(first) is None
+    assert len(service.token_cache) == 2
+
+    assert service.revoke_user_tokens(1) == 1
+    assert len(service.token_cache) == 1
+    assert (await service.decode_token(other))["id"] == 2
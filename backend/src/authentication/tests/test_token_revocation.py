@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""Token revocation test."""
+import asyncio
+import time
+import uuid
+from typing import AsyncIterator
+
+import pytest
+from django.conf import settings
+
+from src.authentication.api_errors import TokenRevocationUnavailableException
+from src.authentication.services import JWTService, TokenRevocationService
+from utils.security.jwt_keys import HS256, JWTKey, JWTKeySet
+
+SECRET = b"test-secret-key-of-at-least-32-bytes"
+
+
+async def create_service(redis_url: str) -> TokenRevocationService:
+    """Create a revocation service and wait until its filter is in sync, if Redis is reachable."""
+    service = TokenRevocationService(redis_url, 60, reconnect_delay=0.01)
+    # the first use of the client starts the listener that loads the filter
+    service.redis
+    for _ in range(100):
+        if service.is_synced:
+            break
+        await asyncio.sleep(0.01)
+    return service
+
+
+@pytest.fixture
+async def revocation_service() -> AsyncIterator[TokenRevocationService]:
+    """Revocation service of the test Redis."""
+    service = await create_service(settings.REDIS_URL)
+    yield service
+    await service.close()
+
+
+@pytest.mark.anyio
+async def test_user_revocation_of_the_same_second(revocation_service: TokenRevocationService) -> None:
+    """
+    Test logging out everywhere revokes the tokens issued before, but not one issued right after.
+    """
+    key_set = JWTKeySet(JWTKey(HS256, HS256, SECRET, SECRET), [])
+    jwt_service = JWTService(60, 60, key_set, token_revocation_service=revocation_service)
+    user_id = uuid.uuid4().int % 10**9
+    before = jwt_service.create_access_token({"id": user_id})
+    await asyncio.sleep(0.002)
+
+    await revocation_service.revoke_user(user_id)
+    await asyncio.sleep(0.002)
+    after = jwt_service.create_access_token({"id": user_id})
+
+    assert await jwt_service.decode_token(before) is None
+    assert (await jwt_service.decode_token(after))["id"] == user_id
+
+    # tokens without ``iat_ms`` are revoked for the whole second of the revocation
+    assert await revocation_service.is_revoked({"id": user_id, "iat": int(time.time())})
+
+
+@pytest.mark.anyio
+async def test_unreachable_redis_falls_back_to_the_filter() -> None:
+    """
+    Test without Redis tokens flagged by the filter are rejected and the others accepted.
+    """
+    service = await create_service("redis://127.0.0.1:1/0")
+    try:
+        assert not service.is_synced
+        service.bloom.add("jti:revoked")
+
+        assert await service.is_revoked({"jti": "revoked", "id": 1, "iat": int(time.time())})
+        assert not await service.is_revoked({"jti": "valid", "id": 1, "iat": int(time.time())})
+    finally:
+        await service.close()
+
+
+@pytest.mark.anyio
+async def test_unreachable_redis_fails_writes() -> None:
+    """
+    Test tokens can not be used once or revoked without Redis, the error is a 503 and not a Redis error.
+    """
+    service = await create_service("redis://127.0.0.1:1/0")
+    try:
+        expires_at = int(time.time()) + 60
+        for write in (
+            service.use_once("jti", expires_at),
+            service.revoke_token("jti", expires_at),
+            service.revoke_user(1),
+        ):
+            with pytest.raises(TokenRevocationUnavailableException):
+                await write
+    finally:
+        await service.close()
+
+
+@pytest.mark.anyio
+async def test_close_stops_the_listener(revocation_service: TokenRevocationService) -> None:
+    """
+    Test closing the service cancels its listener, the next use starts a new one.
+    """
+    listener = revocation_service._listener
+    await revocation_service.close()
+    assert listener.cancelled() and revocation_service._listener is None
+
+    revocation_service.redis
+    assert not revocation_service._listener.done()
@@ -10,7 +10,11 @@ class CoreConfig(AppConfig):
     name = "src.core"
 
     def ready(self):
-        """Wire dependencies on app ready."""
+        """Wire dependencies and install the query statistics on app ready."""
+        from django.db.backends.signals import connection_created
+
         from src.core.registry import registry
+        from utils.db.queries import install_execute_wrapper
 
         registry.wire()
+        connection_created.connect(install_execute_wrapper, dispatch_uid="install_query_stats")
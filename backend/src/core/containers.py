@@ -3,6 +3,7 @@
 from dependency_injector import containers, providers
 
 from src.core.services.image import ImageService
+from utils.security.hashers import PasswordHasher, password_hasher
 
 
 class CoreContainer(containers.DeclarativeContainer):
@@ -11,3 +12,8 @@ class CoreContainer(containers.DeclarativeContainer):
     image_service: providers.Singleton[ImageService] = providers.Singleton(
         ImageService,
     )
+
+    # one process pool per process, shared by every container copy
+    password_hasher: providers.Object[PasswordHasher] = providers.Object(
+        password_hasher,
+    )
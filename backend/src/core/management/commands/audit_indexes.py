@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""Module for the management command 'audit_indexes'."""
+import importlib
+import re
+from typing import Iterator, List, Optional, Tuple, Type
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+
+from utils.repositories import BaseRepository
+
+# tables smaller than this are scanned sequentially by the planner anyway
+MIN_RISKY_ROWS = 1000
+
+
+def iter_repositories() -> Iterator[BaseRepository]:
+    """Instantiate every repository of the local apps."""
+    for app in settings.LOCAL_APPS:
+        try:
+            importlib.import_module(f"{app}.repositories")
+        except ModuleNotFoundError:
+            continue
+
+    classes: List[Type[BaseRepository]] = []
+    pending = list(BaseRepository.__subclasses__())
+    while pending:
+        cls = pending.pop()
+        classes.append(cls)
+        pending.extend(cls.__subclasses__())
+
+    for cls in sorted(classes, key=lambda item: item.__name__):
+        try:
+            repository = cls()
+        except TypeError:
+            continue
+        if getattr(repository, "model", None) is not None:
+            yield repository
+
+
+def get_query_shapes(repository: BaseRepository) -> Iterator[Tuple[str, List[str]]]:
+    """
+    Get the declared hot query shapes of a repository as index keys.
+
+    Keys are column names or ``lower(column)`` for ``__lower`` lookups.
+    """
+    meta = repository.model._meta
+
+    for name, query in repository.prepared_queries.items():
+        keys = []
+        for lookup in query.fields:
+            field_name, _, transform = lookup.partition("__")
+            field = meta.pk if field_name == "pk" else meta.get_field(field_name)
+            keys.append(f"{transform}({field.column})" if transform else field.column)
+        yield f"filter {name}", keys
+
+    if meta.ordering:
+        keys = [meta.get_field(field.lstrip("-")).column for field in meta.ordering if field.lstrip("-") != "?"]
+        yield "ordering", keys
+
+
+def normalize_key(key: str) -> str:
+    """Normalize an index key, ``lower((email)::text)`` and ``lower(email)`` become ``loweremail``."""
+    return re.sub(r"[()\s\"]|::\w+", "", key.lower())
+
+
+def get_index_keys(table: str) -> List[List[str]]:
+    """Get the normalized keys of every index of a table."""
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+
+    indexes = []
+    for constraint in constraints.values():
+        if not constraint["index"] and not constraint["unique"] and not constraint["primary_key"]:
+            continue
+        if constraint["columns"]:
+            indexes.append([normalize_key(column) for column in constraint["columns"]])
+        elif constraint.get("definition"):
+            # an expression index, e.g. "CREATE INDEX ... USING btree (lower((email)::text))"
+            expression = re.search(r"USING \w+ \((.*)\)", constraint["definition"], re.IGNORECASE)
+            if expression:
+                indexes.append([normalize_key(expression.group(1))])
+    return indexes
+
+
+def find_index(keys: List[str], indexes: List[List[str]]) -> Optional[List[str]]:
+    """Find an index that starts with one of the keys, only a leading key lets the planner seek."""
+    keys = [normalize_key(key) for key in keys]
+    for index in indexes:
+        if index[0] in keys:
+            return index
+    return None
+
+
+def get_scan_stats(table: str) -> Optional[Tuple[int, int, int]]:
+    """Get sequential scans, index scans and live rows of a table from ``pg_stat_user_tables``."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT seq_scan, COALESCE(idx_scan, 0), n_live_tup FROM pg_stat_user_tables WHERE relname = %s",
+            [table],
+        )
+        return cursor.fetchone()
+
+
+class Command(BaseCommand):
+    """Compare repository query shapes with the existing indexes and report sequential scan risks."""
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument("--fail-on-risk", action="store_true", help="Exit with an error if a risk is found")
+
+    def handle(self, *args, **options):
+        """Handle command."""
+        risks = 0
+
+        for repository in iter_repositories():
+            table = repository.model._meta.db_table
+            indexes = get_index_keys(table)
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{type(repository).__name__} ({table})"))
+
+            for name, keys in get_query_shapes(repository):
+                index = find_index(keys, indexes)
+                if index is None:
+                    risks += 1
+                    self.stdout.write(self.style.WARNING(f"  RISK {name} on {', '.join(keys)}: no index"))
+                else:
+                    self.stdout.write(f"  ok   {name} on {', '.join(keys)}: index ({', '.join(index)})")
+
+            stats = get_scan_stats(table)
+            if stats:
+                seq_scan, idx_scan, live_rows = stats
+                line = f"  scans: {seq_scan} sequential, {idx_scan} index, {live_rows} rows"
+                if seq_scan > idx_scan and live_rows >= MIN_RISKY_ROWS:
+                    risks += 1
+                    self.stdout.write(self.style.WARNING(f"{line} - mostly sequential scans on a large table"))
+                else:
+                    self.stdout.write(line)
+
+        if risks and options["fail_on_risk"]:
+            raise CommandError(f"{risks} sequential scan risks found")
+        self.stdout.write(f"{risks} sequential scan risks found")
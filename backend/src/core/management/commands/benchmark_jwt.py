@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""Module for the management command 'benchmark_jwt'."""
+import asyncio
+import time
+from typing import Awaitable, Callable, List
+
+from django.core.management import BaseCommand, CommandError
+from jwt.algorithms import has_crypto
+
+from src.authentication.services import JWTService
+from utils.benchmark import BenchmarkResult
+from utils.security.jwt_keys import (ALGORITHMS, ES256, HS256, JWTKey,
+                                     JWTKeySet)
+
+if has_crypto:
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+
+PAYLOAD = {"id": 1, "email": "user@example.com", "is_staff": False}
+
+
+def generate_key(algorithm: str) -> JWTKey:
+    """Generate a throwaway key of an algorithm."""
+    if algorithm == HS256:
+        secret = b"benchmark-secret-key-of-at-least-32-bytes"
+        return JWTKey(HS256, HS256, secret, secret)
+    if algorithm == ES256:
+        private_key = ec.generate_private_key(ec.SECP256R1())
+    else:
+        private_key = ed25519.Ed25519PrivateKey.generate()
+    return JWTKey(algorithm, algorithm, private_key.public_key(), private_key)
+
+
+class Command(BaseCommand):
+    """Measure the cost of signing and verifying a token per algorithm."""
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument("--total", type=int, default=5000, help="Tokens signed and verified per algorithm")
+        parser.add_argument("--algorithm", choices=ALGORITHMS, action="append", help="All algorithms by default")
+
+    def handle(self, *args, **options):
+        """Handle command."""
+        algorithms = options["algorithm"] or list(ALGORITHMS)
+        if not has_crypto and algorithms != [HS256]:
+            raise CommandError("ES256 and EdDSA need the cryptography package, install pyjwt[crypto]")
+
+        for algorithm in algorithms:
+            asyncio.run(self._benchmark(algorithm, options["total"]))
+
+    async def _benchmark(self, algorithm: str, total: int):
+        """Sign and verify ``total`` tokens with a new key."""
+        # no verified token cache, every call pays for the signature
+        service = JWTService(60, 60, JWTKeySet(generate_key(algorithm), []))
+        tokens = [service.create_access_token(dict(PAYLOAD)) for _ in range(total)]
+
+        async def sign(index: int):
+            service.create_access_token(dict(PAYLOAD))
+
+        async def verify(index: int):
+            assert await service.decode_token(tokens[index]) is not None
+
+        self.stdout.write(str(await self._run(f"{algorithm} sign", sign, total)))
+        self.stdout.write(str(await self._run(f"{algorithm} verify", verify, total)))
+        self.stdout.write(f"  token size: {len(tokens[0])} bytes")
+
+    @staticmethod
+    async def _run(name: str, func: Callable[[int], Awaitable], total: int) -> BenchmarkResult:
+        """Call ``func(index)`` ``total`` times in a row, signing and verifying do not wait on anything."""
+        latencies: List[float] = []
+        started = time.perf_counter()
+        for index in range(total):
+            call_started = time.perf_counter()
+            await func(index)
+            latencies.append(time.perf_counter() - call_started)
+        return BenchmarkResult(name, latencies, time.perf_counter() - started)
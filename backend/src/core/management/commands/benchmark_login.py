@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""Module for the management command 'benchmark_login'."""
+import asyncio
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management import BaseCommand, CommandError
+from django.test import override_settings
+from fastapi import FastAPI
+from fastapi_limiter import FastAPILimiter
+from httpx import ASGITransport, AsyncClient
+from redis.asyncio.utils import from_url
+
+from src.authentication.endpoints import auth_router
+from src.users.models import User
+from src.users.repositories import UserRepository
+from utils.benchmark import run_benchmark
+from utils.db.executor import db_executor
+from utils.db.pool import close_pools, get_pool_stats
+from utils.middleware import (QueryStatsMiddleware, RepositoryLoaderMiddleware,
+                              RequestIdMiddleware)
+
+PASSWORD = "benchmark-password"
+
+
+def create_app() -> FastAPI:
+    """Create an app with the auth endpoints and the request middleware of the API app."""
+    app = FastAPI()
+    app.include_router(auth_router)
+    app.add_middleware(RepositoryLoaderMiddleware)
+    app.add_middleware(QueryStatsMiddleware)
+    app.add_middleware(RequestIdMiddleware)
+    return app
+
+
+class Command(BaseCommand):
+    """Compare the login endpoint latency with and without the connection pool."""
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument("--total", type=int, default=5000, help="Number of logins per run")
+        parser.add_argument("--concurrency", type=int, default=50, help="Logins in flight")
+        parser.add_argument("--workers", type=int, default=10, help="Database executor threads")
+
+    def handle(self, *args, **options):
+        """Handle command."""
+        asyncio.run(self._benchmark(options["total"], options["concurrency"], options["workers"]))
+
+    async def _benchmark(self, total: int, concurrency: int, workers: int):
+        """Post ``total`` logins of a temporary user per run, the p99 is in the report of each run."""
+        # every call looks up the same user, coalescing would hide the connection cost
+        UserRepository.coalesce_reads = False
+        email = f"benchmark-{uuid.uuid4()}@example.com"
+        await db_executor.run(User.objects.create, email=email, password=make_password(PASSWORD))
+        redis = from_url(settings.REDIS_URL)
+        await FastAPILimiter.init(redis)
+
+        async with AsyncClient(transport=ASGITransport(app=create_app()), base_url="http://benchmark") as client:
+
+            async def login(index: int):
+                response = await client.post("/auth/login/", json={"email": email, "password": PASSWORD})
+                if response.status_code != 200:
+                    raise CommandError(f"Login failed with {response.status_code}: {response.text}")
+
+            try:
+                # no rate limit and no busy hasher responses, every login is measured
+                with override_settings(
+                    DATABASE_EXECUTOR_WORKERS=workers, LIMIT_ACTIVE=False, PASSWORD_HASHER_MAX_PENDING=concurrency
+                ):
+                    for enabled, name in ((False, "without pool"), (True, "with pool")):
+                        with override_settings(DATABASE_POOL_ENABLED=enabled):
+                            # new threads, so no connection is carried over from the previous run
+                            db_executor.shutdown()
+                            result = await run_benchmark(
+                                f"POST /auth/login/ {name} ({workers} threads)", login, total, concurrency
+                            )
+                            self.stdout.write(str(result))
+                            db_executor.shutdown()
+
+                self.stdout.write(f"pool: {get_pool_stats()}")
+            finally:
+                await db_executor.run(User.objects.filter(email=email).delete)
+                await FastAPILimiter.close()
+                close_pools()
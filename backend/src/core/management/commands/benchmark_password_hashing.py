@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""Module for the management command 'benchmark_password_hashing'."""
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable, List, Optional
+
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.management import BaseCommand
+from django.test import override_settings
+
+from utils.benchmark import run_benchmark
+from utils.security.hashers import PasswordHasher
+
+PASSWORD = "pass12345"
+# interval of the probe that stands in for the other requests of the worker
+PROBE_INTERVAL = 0.005
+
+
+class Command(BaseCommand):
+    """Compare concurrent password checks of one worker on the event loop and in the hasher process pool."""
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument("--total", type=int, default=200, help="Number of logins per run")
+        parser.add_argument("--concurrency", type=int, default=50, help="Logins in flight")
+        parser.add_argument("--workers", type=int, help="Hasher processes, one per core by default")
+
+    def handle(self, *args, **options):
+        """Handle command."""
+        asyncio.run(self._benchmark(options["total"], options["concurrency"], options["workers"]))
+
+    async def _benchmark(self, total: int, concurrency: int, workers: Optional[int]):
+        """Run both benchmarks against one hash."""
+        encoded = make_password(PASSWORD)
+
+        async def on_event_loop(index: int):
+            # what user.check_password did inside the login endpoint
+            check_password(PASSWORD, encoded)
+
+        with override_settings(PASSWORD_HASHER_WORKERS=workers, PASSWORD_HASHER_MAX_PENDING=total):
+            hasher = PasswordHasher()
+
+            async def in_pool(index: int):
+                await hasher.check_password(PASSWORD, encoded)
+
+            try:
+                # start the worker processes before measuring
+                await asyncio.gather(*(hasher.make_password(PASSWORD) for _ in range(hasher.max_workers)))
+
+                await self._run("login on the event loop", on_event_loop, total, concurrency)
+                await self._run(f"login in {hasher.max_workers} hasher processes", in_pool, total, concurrency)
+            finally:
+                hasher.shutdown()
+
+    async def _run(self, name: str, func: Callable[[int], Awaitable], total: int, concurrency: int):
+        """Run a benchmark and measure how long the event loop was blocked meanwhile."""
+        lags: List[float] = []
+        stop = asyncio.Event()
+
+        async def probe():
+            while not stop.is_set():
+                started = time.perf_counter()
+                await asyncio.sleep(PROBE_INTERVAL)
+                lags.append(time.perf_counter() - started - PROBE_INTERVAL)
+
+        probe_task = asyncio.create_task(probe())
+        try:
+            result = await run_benchmark(name, func, total, concurrency)
+        finally:
+            stop.set()
+            await probe_task
+
+        self.stdout.write(str(result))
+        if lags:
+            self.stdout.write(
+                f"  event loop lag: mean {statistics.fmean(lags) * 1000:.2f}ms, max {max(lags) * 1000:.2f}ms"
+            )
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+"""Module for the management command 'benchmark_save_one'."""
+import asyncio
+import logging
+import uuid
+
+from django.core.management import BaseCommand
+from django.test import override_settings
+
+from src.authentication.models import CaptchaChallenge
+from src.authentication.repositories import CaptchaRepository
+from utils.benchmark import run_benchmark
+from utils.db.executor import db_executor
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    """Compare concurrent save_one throughput of sync_to_async and the database executor."""
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument("--total", type=int, default=2000, help="Number of saves per run")
+        parser.add_argument("--concurrency", type=int, default=50, help="Saves in flight")
+        parser.add_argument("--workers", type=int, default=10, help="Database executor threads")
+
+    def handle(self, *args, **options):
+        """Handle command."""
+        asyncio.run(self._benchmark(options["total"], options["concurrency"], options["workers"]))
+
+    async def _benchmark(self, total: int, concurrency: int, workers: int):
+        """Run both benchmarks. Rows are created with a unique prefix and deleted afterwards."""
+        repository = CaptchaRepository()
+        prefix = f"benchmark-{uuid.uuid4()}"
+
+        async def save_one(index: int):
+            await repository.save_one(CaptchaChallenge(challenge=f"{prefix}-{index}-{uuid.uuid4()}", response="ab"))
+
+        try:
+            with override_settings(DATABASE_EXECUTOR_WORKERS=0):
+                result = await run_benchmark("sync_to_async (thread sensitive)", save_one, total, concurrency)
+                self.stdout.write(str(result))
+
+            with override_settings(DATABASE_EXECUTOR_WORKERS=workers):
+                db_executor.shutdown()
+                result = await run_benchmark(f"database executor ({workers} threads)", save_one, total, concurrency)
+                self.stdout.write(str(result))
+                db_executor.shutdown()
+        finally:
+            await repository.delete_many(challenge__startswith=prefix)
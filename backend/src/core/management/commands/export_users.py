@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""Module for the management command 'export_users'."""
+import sys
+
+from django.core.management import BaseCommand
+from django.db import connection
+
+from src.users.entities import USER_COPY_FIELDS
+from src.users.models import User
+from utils.db.bulk_copy import CSV, FORMATS, Progress, copy_to
+
+
+class Command(BaseCommand):
+    """Stream all users into a CSV or NDJSON file with ``COPY``, password hashes included."""
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument("path", help="Output file, '-' for stdout")
+        parser.add_argument("--format", choices=FORMATS, default=CSV, help="Output format")
+        parser.add_argument("--progress", type=int, default=1_000_000, help="Report every N rows, 0 to disable")
+
+    def handle(self, *args, **options):
+        """Handle command."""
+        path = options["path"]
+        # progress goes to stderr when the rows go to stdout
+        report = self.stderr.write if path == "-" else self.stdout.write
+        progress = Progress(report, options["progress"])
+
+        columns = ", ".join(connection.ops.quote_name(User._meta.get_field(name).column) for name in USER_COPY_FIELDS)
+        query = f"SELECT {columns} FROM {connection.ops.quote_name(User._meta.db_table)} ORDER BY id"
+
+        output = sys.stdout if path == "-" else open(path, "w", encoding="utf-8", newline="")
+        try:
+            with connection.cursor() as cursor:
+                copy_to(cursor, query, output, options["format"], progress)
+        finally:
+            if output is not sys.stdout:
+                output.close()
+            else:
+                output.flush()
+
+        report(f"Exported {progress.format()}")
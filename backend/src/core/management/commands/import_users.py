@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""Module for the management command 'import_users'."""
+import csv
+import sys
+
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from src.users.entities import USER_COPY_FIELDS
+from src.users.models import User
+from src.users.repositories import UserRepository
+from utils.db.bulk_copy import CSV, FORMATS, NDJSON, Progress, copy_from, iter_batches
+from utils.repositories.cache import invalidate
+
+SKIP = "skip"
+UPDATE = "update"
+
+STAGING_TABLE = "users_import"
+STAGING_JSON_TABLE = "users_import_json"
+
+# values of columns that are missing or empty in the file, "!" is an unusable password hash
+COLUMN_DEFAULTS = {
+    "password": "'!'",
+    "date_created": "now()",
+    "date_updated": "now()",
+    "is_staff": "false",
+    "is_active": "true",
+    "is_superuser": "false",
+}
+
+
+class Command(BaseCommand):
+    """
+    Stream users from a CSV or NDJSON file into the database with ``COPY``.
+
+    Every batch is copied into a temporary table and inserted from there in its own transaction, so memory
+    use stays flat and an interrupted import keeps the finished batches. Password hashes are stored as they are.
+    Rows with an existing email, in any case, are skipped or, with ``--on-conflict update``, overwrite the existing
+    user and drop it from the user cache.
+    """
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument("path", help="Input file, '-' for stdin")
+        parser.add_argument("--format", choices=FORMATS, default=CSV, help="Input format, CSV needs a header")
+        parser.add_argument("--batch-size", type=int, default=50_000, help="Rows per transaction")
+        parser.add_argument("--on-conflict", choices=(SKIP, UPDATE), default=SKIP, help="Rows with an existing email")
+        parser.add_argument("--progress", type=int, default=1_000_000, help="Report every N rows, 0 to disable")
+
+    def handle(self, *args, **options):
+        """Handle command."""
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive")
+
+        path = options["path"]
+        fmt = options["format"]
+        source = sys.stdin if path == "-" else open(path, encoding="utf-8", newline="")
+        try:
+            columns = self._read_header(source) if fmt == CSV else USER_COPY_FIELDS
+            inserted, updated, skipped, progress = self._import(
+                source, fmt, columns, options["batch_size"], options["on_conflict"], options["progress"]
+            )
+        finally:
+            if source is not sys.stdin:
+                source.close()
+
+        self.stdout.write(f"Imported {progress.format()}: {inserted} inserted, {updated} updated, {skipped} skipped")
+
+    def _read_header(self, source) -> list:
+        """Read and validate the CSV header."""
+        header = next(csv.reader([source.readline().lstrip("\ufeff")]), [])
+        unknown = sorted(set(header) - set(USER_COPY_FIELDS))
+        if unknown:
+            raise CommandError(f"Unknown columns: {', '.join(unknown)}, expected some of {', '.join(USER_COPY_FIELDS)}")
+        if "email" not in header:
+            raise CommandError("The email column is required")
+        return header
+
+    def _import(self, source, fmt: str, columns: list, batch_size: int, on_conflict: str, every: int):
+        """Copy and insert the file batch by batch."""
+        progress = Progress(self.stdout.write, every)
+        inserted = updated = skipped = 0
+        insert_sql = self._get_insert_sql(fmt, on_conflict)
+
+        with connection.cursor() as cursor:
+            # the staging tables live as long as the session, they are emptied for every batch
+            fields = ", ".join(USER_COPY_FIELDS)
+            cursor.execute(
+                f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} AS "
+                f"SELECT {fields} FROM {User._meta.db_table} WITH NO DATA"
+            )
+            if fmt == NDJSON:
+                cursor.execute(f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_JSON_TABLE} (doc jsonb)")
+
+            try:
+                for rows, batch in iter_batches(source, batch_size):
+                    with transaction.atomic():
+                        if fmt == NDJSON:
+                            cursor.execute(f"TRUNCATE {STAGING_TABLE}, {STAGING_JSON_TABLE}")
+                            copy_from(cursor, STAGING_JSON_TABLE, ["doc"], batch, fmt)
+                        else:
+                            cursor.execute(f"TRUNCATE {STAGING_TABLE}")
+                            copy_from(cursor, STAGING_TABLE, columns, batch, fmt)
+                        cursor.execute(insert_sql)
+                        batch_inserted, updated_ids = cursor.fetchone()
+                        # cached users are replaced once the batch is committed
+                        invalidate(UserRepository.cache_params, updated_ids)
+
+                    batch_updated = len(updated_ids)
+                    inserted += batch_inserted
+                    updated += batch_updated
+                    skipped += rows - batch_inserted - batch_updated
+                    progress.add(rows, f"{inserted} inserted, {updated} updated, {skipped} skipped")
+            finally:
+                cursor.execute(f"DROP TABLE IF EXISTS {STAGING_TABLE}, {STAGING_JSON_TABLE}")
+
+        return inserted, updated, skipped, progress
+
+    def _get_insert_sql(self, fmt: str, on_conflict: str) -> str:
+        """
+        Build the statement that moves the staged rows into the users table.
+
+        It returns the number of inserted rows and the ids of the updated ones. Emails are compared case
+        insensitively like the unique ``lower(email)`` index does, duplicates within a batch keep the last row,
+        rows without an email are skipped.
+        """
+        fields = ", ".join(USER_COPY_FIELDS)
+        values = ", ".join(
+            f"COALESCE({name}, {COLUMN_DEFAULTS[name]})" if name in COLUMN_DEFAULTS else name
+            for name in USER_COPY_FIELDS
+        )
+
+        if fmt == NDJSON:
+            source = (
+                f"SELECT r.*, j.ctid AS line FROM {STAGING_JSON_TABLE} j, "
+                f"jsonb_populate_record(NULL::{STAGING_TABLE}, j.doc) r WHERE j.doc IS NOT NULL"
+            )
+        else:
+            source = f"SELECT *, ctid AS line FROM {STAGING_TABLE}"
+
+        if on_conflict == UPDATE:
+            # the creation date of an existing user is kept
+            updates = ", ".join(
+                f"{name} = EXCLUDED.{name}" for name in USER_COPY_FIELDS if name not in ("email", "date_created")
+            )
+            conflict = f"ON CONFLICT ((lower(email))) DO UPDATE SET {updates}"
+        else:
+            conflict = "ON CONFLICT ((lower(email))) DO NOTHING"
+
+        return (
+            f"WITH copied AS ("
+            f"INSERT INTO {User._meta.db_table} ({fields}) "
+            f"SELECT DISTINCT ON (lower(email)) {values} FROM ({source}) s WHERE email IS NOT NULL "
+            f"ORDER BY lower(email), line DESC "
+            f"{conflict} RETURNING id, (xmax = 0) AS inserted"
+            f") SELECT count(*) FILTER (WHERE inserted), "
+            f"COALESCE(array_agg(id) FILTER (WHERE NOT inserted), '{{}}') FROM copied"
+        )
@@ -5,6 +5,7 @@ import logging
 from asgi_lifespan import LifespanManager
 from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.contrib.auth.hashers import make_password
 from faker import Faker
 
 from src.authentication.schemas.registration import UserRegisterFactory
@@ -52,6 +53,9 @@ class ProjectInitialization:
         factory = UserRegisterFactory()
 
         if not users_exists:
+            # hashing is slow on purpose, all test users share one hash
+            password = make_password("pass12345")
+            users = []
             for i in range(10):
                 data = factory.build().dict()
 
@@ -70,9 +74,11 @@ class ProjectInitialization:
                 # )
 
                 # create user
-                user = User(
-                    email=data["email"],
-                    # avatar=File(thumbnail_vertical),
+                users.append(
+                    User(
+                        email=data["email"],
+                        password=password,
+                        # avatar=File(thumbnail_vertical),
+                    )
                 )
-                user.set_password("pass12345")
-                await sync_to_async(user.save)()
+            await User.objects.abulk_create(users)
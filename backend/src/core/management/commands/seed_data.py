@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""Module for the management command 'seed_data'."""
+import csv
+import hashlib
+import io
+import os
+import random
+import string
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Iterable, Iterator, List, Tuple
+
+import django
+from django.apps import apps
+from django.contrib.auth.hashers import make_password
+from django.core.management import BaseCommand, CommandError
+from django.db import connection, connections
+from django.utils import timezone
+from faker import Faker
+
+from src.authentication.models import CaptchaChallenge, PasswordToken
+from src.users.entities import USER_COPY_FIELDS
+from src.users.models import User
+from utils.db.bulk_copy import CSV, Progress, copy_from
+
+# every seeded user can log in with this password
+SEED_PASSWORD = "pass12345"
+
+# a few providers hold most of the addresses
+EMAIL_DOMAINS = (
+    ["gmail.com"] * 40
+    + ["yahoo.com"] * 12
+    + ["outlook.com"] * 10
+    + ["mail.ru"] * 10
+    + ["yandex.ru"] * 10
+    + ["icloud.com"] * 8
+    + ["example.com"] * 5
+    + ["example.org"] * 5
+)
+
+CAPTCHA_FIELDS = ["challenge", "response", "date_created"]
+PASSWORD_TOKEN_FIELDS = ["email", "token_hash", "new_password", "date_created", "date_updated"]
+
+_first_names: List[str] = []
+_last_names: List[str] = []
+
+
+def _init_worker() -> None:
+    """Prepare a worker process, forked workers inherit Django, spawned ones (macOS, Windows) set it up here."""
+    if not apps.ready:
+        django.setup()
+
+    # the same names in every worker, so emails only depend on the row index
+    faker = Faker()
+    faker.seed_instance(0)
+    _first_names[:] = [faker.first_name().lower() for _ in range(500)]
+    _last_names[:] = [faker.last_name().lower() for _ in range(1000)]
+
+
+def _get_email(index: int, tag: str) -> str:
+    """Get the unique email of a seeded user."""
+    first = _first_names[index % len(_first_names)]
+    last = _last_names[index * 7919 % len(_last_names)]
+    domain = EMAIL_DOMAINS[index * 31 % len(EMAIL_DOMAINS)]
+    return f"{first}.{last}{index}.{tag}@{domain}"
+
+
+def _copy_rows(table: str, columns: List[str], rows: Iterable[tuple], batch_size: int) -> int:
+    """Copy rows into a table in batches, returns the number of rows."""
+    total = 0
+    rows = iter(rows)
+    with connection.cursor() as cursor:
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                return total
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(batch)
+            buffer.seek(0)
+            copy_from(cursor, table, columns, buffer, CSV)
+            total += len(batch)
+
+
+def _iter_users(
+    rng: random.Random,
+    start: int,
+    count: int,
+    tag: str,
+    hashes: List[str],
+    days: int,
+    now: datetime,
+) -> Iterator[tuple]:
+    """Generate user rows in ``USER_COPY_FIELDS`` order."""
+    for index in range(start, start + count):
+        # sign ups grow over time, so recent dates are more likely
+        created = now - timedelta(days=days * rng.random() ** 2)
+        # a fifth never logged in, the others mostly did recently
+        last_login = None if rng.random() < 0.2 else created + (now - created) * (1 - rng.random() ** 3)
+        yield (
+            _get_email(index, tag),
+            rng.choice(hashes),
+            last_login,
+            created,
+            last_login or created,
+            None,
+            rng.random() < 0.001,
+            rng.random() < 0.97,
+            False,
+        )
+
+
+def _iter_password_tokens(
+    rng: random.Random,
+    start: int,
+    count: int,
+    tag: str,
+    step: int,
+    tokens: int,
+    now: datetime,
+) -> Iterator[tuple]:
+    """Generate password token rows for every ``step``-th of the first ``tokens * step`` users, requested recently."""
+    for index in range(start + (-start % step), min(start + count, tokens * step), step):
+        requested = now - timedelta(seconds=rng.randrange(86400))
+        token_hash = hashlib.sha256(rng.getrandbits(256).to_bytes(32, "big")).hexdigest()
+        new_password = "".join(rng.choices(string.ascii_letters + string.digits, k=14))
+        yield _get_email(index, tag), token_hash, new_password, requested, requested
+
+
+def _iter_captchas(rng: random.Random, count: int, now: datetime) -> Iterator[tuple]:
+    """Generate captcha rows, most are minutes old and some were never cleaned up."""
+    for _ in range(count):
+        age = rng.randrange(600) if rng.random() < 0.9 else rng.randrange(30 * 86400)
+        challenge = uuid.UUID(int=rng.getrandbits(128), version=4)
+        response = "".join(rng.choices(string.ascii_lowercase, k=6))
+        yield str(challenge), response, now - timedelta(seconds=age)
+
+
+def seed_users(
+    start: int,
+    count: int,
+    tag: str,
+    hashes: List[str],
+    days: int,
+    users: int,
+    tokens: int,
+    batch_size: int,
+    seed: int,
+) -> int:
+    """Seed a chunk of users and their password tokens in a worker, returns the number of rows."""
+    now = timezone.now()
+    rng = random.Random(seed + start)
+    rows = _copy_rows(
+        User._meta.db_table,
+        [User._meta.get_field(name).column for name in USER_COPY_FIELDS],
+        _iter_users(rng, start, count, tag, hashes, days, now),
+        batch_size,
+    )
+    if tokens:
+        # tokens belong to evenly spread users
+        step = users // tokens
+        rows += _copy_rows(
+            PasswordToken._meta.db_table,
+            PASSWORD_TOKEN_FIELDS,
+            _iter_password_tokens(rng, start, count, tag, step, tokens, now),
+            batch_size,
+        )
+    return rows
+
+
+def seed_captchas(start: int, count: int, tag: str, batch_size: int, seed: int) -> int:
+    """Seed a chunk of captcha challenges in a worker, returns the number of rows."""
+    # the run tag gives every run other challenges, they are unique like the emails
+    rng = random.Random(f"captchas:{tag}:{seed}:{start}")
+    rows = _iter_captchas(rng, count, timezone.now())
+    return _copy_rows(CaptchaChallenge._meta.db_table, CAPTCHA_FIELDS, rows, batch_size)
+
+
+def iter_chunks(total: int, size: int) -> Iterator[Tuple[int, int]]:
+    """Split a number of rows into chunks of start and count."""
+    for start in range(0, total, size):
+        yield start, min(size, total - start)
+
+
+class Command(BaseCommand):
+    """
+    Seed the database with production sized load test data.
+
+    Users, password tokens and captcha challenges are generated in parallel worker processes and loaded with
+    ``COPY``. Passwords are hashed once up front, every seeded user logs in with ``SEED_PASSWORD``.
+    """
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument("--users", type=int, default=100_000, help="Number of users")
+        parser.add_argument("--captchas", type=int, help="Number of captcha challenges, a tenth of users by default")
+        parser.add_argument(
+            "--password-tokens", type=int, help="Number of password tokens, a hundredth of users by default"
+        )
+        parser.add_argument("--days", type=int, default=730, help="Sign ups are spread over this many days")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+        parser.add_argument("--chunk-size", type=int, default=100_000, help="Rows per worker task")
+        parser.add_argument("--batch-size", type=int, default=10_000, help="Rows per COPY")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed")
+
+    def handle(self, *args, **options):
+        """Handle command."""
+        users = options["users"]
+        captchas = users // 10 if options["captchas"] is None else options["captchas"]
+        tokens = users // 100 if options["password_tokens"] is None else options["password_tokens"]
+        if min(users, captchas, tokens) < 0 or tokens > users:
+            raise CommandError("Row counts must not be negative and there can't be more password tokens than users")
+        if min(options["workers"], options["chunk_size"], options["batch_size"], options["days"]) < 1:
+            raise CommandError("--workers, --chunk-size, --batch-size and --days must be positive")
+
+        # a few salts are enough, every hash takes a noticeable fraction of a second
+        hashes = [make_password(SEED_PASSWORD) for _ in range(4)]
+        # keeps the emails and captcha challenges of every run unique
+        tag = uuid.uuid4().hex[:6]
+        days, batch_size, seed = options["days"], options["batch_size"], options["seed"]
+
+        progress = Progress(self.stdout.write, options["chunk_size"])
+        # forked workers must not share the connections of this process
+        connections.close_all()
+        with ProcessPoolExecutor(options["workers"], initializer=_init_worker) as executor:
+            futures = [
+                executor.submit(seed_users, start, count, tag, hashes, days, users, tokens, batch_size, seed)
+                for start, count in iter_chunks(users, options["chunk_size"])
+            ]
+            futures += [
+                executor.submit(seed_captchas, start, count, tag, batch_size, seed)
+                for start, count in iter_chunks(captchas, options["chunk_size"])
+            ]
+            for future in as_completed(futures):
+                progress.add(future.result())
+
+        # fresh planner statistics, estimated counts read them
+        with connection.cursor() as cursor:
+            for model in (User, PasswordToken, CaptchaChallenge):
+                cursor.execute(f"ANALYZE {connection.ops.quote_name(model._meta.db_table)}")
+
+        self.stdout.write(f"Seeded {progress.format()}, users log in with {SEED_PASSWORD!r}")
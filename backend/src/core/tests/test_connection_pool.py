@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""Connection pool test."""
+import os
+from contextlib import contextmanager
+from types import SimpleNamespace
+
+import pytest
+from psycopg2 import OperationalError
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+from utils.db import pool as pool_module
+from utils.db.pool import ConnectionPool, PoolOptions, PoolTimeout
+
+
+class FakeConnection:
+    """Raw connection stand-in, ``broken`` ones fail the health check."""
+
+    def __init__(self, broken: bool = False):
+        """Initialize connection."""
+        self.closed = 0
+        self.broken = broken
+        self.info = SimpleNamespace(transaction_status=TRANSACTION_STATUS_IDLE)
+
+    @contextmanager
+    def cursor(self):
+        """Yield a cursor that fails on broken connections."""
+        if self.broken:
+            raise OperationalError("server closed the connection unexpectedly")
+        yield SimpleNamespace(execute=lambda sql: None)
+
+    def rollback(self) -> None:
+        """Roll back."""
+        self.info.transaction_status = TRANSACTION_STATUS_IDLE
+
+    def close(self) -> None:
+        """Close."""
+        self.closed = 1
+
+
+def create_pool(connect=FakeConnection, **options) -> ConnectionPool:
+    """Create a pool of fake connections."""
+    return ConnectionPool(connect, PoolOptions(**{"min_size": 0, "max_size": 2, **options}))
+
+
+def test_failed_fill_is_retried() -> None:
+    """
+    Test a warm-up that could not open every connection is repeated on the next checkout.
+    """
+    attempts = []
+
+    def connect():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise OperationalError("the database system is starting up")
+        return FakeConnection()
+
+    pool = create_pool(connect, min_size=2)
+    connection = pool.getconn()
+    assert not pool._filled
+    pool.putconn(connection)
+
+    pool.putconn(pool.getconn())
+    assert pool._filled
+    assert pool.size == 2
+    assert len(attempts) == 3
+
+
+def test_checkout_timeout() -> None:
+    """
+    Test a checkout waits for a free connection and gives up after ``acquire_timeout``.
+    """
+    pool = create_pool(max_size=1, acquire_timeout=0.05)
+    connection = pool.getconn()
+
+    with pytest.raises(PoolTimeout):
+        pool.getconn()
+    assert pool.stats.timeouts == 1
+    assert pool.stats.waits >= 1
+
+    pool.putconn(connection)
+    assert pool.getconn() is connection
+
+
+def test_unusable_connections_are_discarded() -> None:
+    """
+    Test connections failing the health check or returned closed are replaced by new ones.
+    """
+    pool = create_pool(check_interval=0)
+    broken = pool.getconn()
+    pool.putconn(broken)
+    broken.broken = True
+
+    connection = pool.getconn()
+    assert connection is not broken
+    assert broken.closed
+    assert pool.stats.failed_checks == 1
+
+    connection.close()
+    pool.putconn(connection)
+    assert pool.size == 0
+    assert pool.stats.closed == 2
+
+
+def test_connection_returned_after_close() -> None:
+    """
+    Test a connection in use while the pool was closed is closed when it is returned.
+    """
+    pool = create_pool()
+    idle, in_use = pool.getconn(), pool.getconn()
+    pool.putconn(idle)
+
+    pool.close()
+    assert idle.closed
+    assert not in_use.closed
+    assert pool.size == 0
+
+    pool.putconn(in_use)
+    assert in_use.closed
+    assert pool.size == 0
+    assert not pool._idle
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork is not available")
+def test_forked_child_forgets_pools() -> None:
+    """
+    Test a forked worker starts without the pools of its parent.
+    """
+    pool = pool_module.get_pool("fork-test", {"dbname": "test"}, FakeConnection)
+    try:
+        pid = os.fork()
+        if pid == 0:
+            # the child must not reuse the sockets of the parent
+            fresh = not pool_module._pools and pool_module.get_pool("fork-test", {"dbname": "test"}, FakeConnection)
+            os._exit(0 if fresh and fresh is not pool else 1)
+        _, status = os.waitpid(pid, 0)
+        assert os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
+        assert pool_module.get_pool("fork-test", {"dbname": "test"}, FakeConnection) is pool
+    finally:
+        pool_module._pools.pop(("fork-test", repr([("dbname", "test")])), None)
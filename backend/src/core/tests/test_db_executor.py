@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""Database executor test."""
+import asyncio
+import threading
+
+import pytest
+
+from utils.db.executor import DatabaseExecutor
+from utils.db.routers import is_primary_pinned, pin_primary
+
+
+@pytest.fixture
+def executor(settings) -> DatabaseExecutor:
+    """Executor with two database threads."""
+    settings.DATABASE_EXECUTOR_WORKERS = 2
+    executor = DatabaseExecutor()
+    yield executor
+    executor.shutdown()
+
+
+@pytest.mark.anyio
+async def test_runs_concurrently(executor: DatabaseExecutor) -> None:
+    """
+    Test calls run at the same time on the database threads, not one after another.
+    """
+    barrier = threading.Barrier(2, timeout=5)
+
+    def call():
+        # both calls must be running for the barrier to open
+        barrier.wait()
+        return threading.current_thread().name
+
+    names = set(await asyncio.gather(executor.run(call), executor.run(call)))
+
+    assert len(names) == 2
+    assert all(name.startswith("db") for name in names)
+
+
+@pytest.mark.anyio
+async def test_context_changes_propagate(executor: DatabaseExecutor) -> None:
+    """
+    Test a primary pin set by a write on a database thread applies to the caller.
+    """
+    assert not is_primary_pinned()
+
+    await executor.run(pin_primary)
+
+    assert is_primary_pinned()
+
+
+@pytest.mark.anyio
+async def test_thread_sensitive_fallback(settings) -> None:
+    """
+    Test without database threads calls run through thread sensitive sync_to_async.
+    """
+    settings.DATABASE_EXECUTOR_WORKERS = 0
+    executor = DatabaseExecutor()
+
+    assert await executor.run(lambda value: value * 2, 21) == 42
+    assert executor._executor is None
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""Replica router test."""
+import contextvars
+
+import pytest
+from django.db import router
+
+from src.authentication.repositories import CaptchaRepository
+from src.users.models import User
+from src.users.repositories.user import UserRepository
+from utils.db.routers import PrimaryReplicaRouter, is_primary_pinned, pin_primary
+
+
+@pytest.fixture
+def replica_router(monkeypatch) -> PrimaryReplicaRouter:
+    """Route with one replica, without connecting to it."""
+    replica_router = PrimaryReplicaRouter()
+    replica_router.replicas = ["replica_0"]
+    monkeypatch.setattr(router, "routers", [replica_router])
+    return replica_router
+
+
+def run_in_context(func):
+    """Run a test in its own context, primary pins must not leak into other tests."""
+    return contextvars.copy_context().run(func)
+
+
+def test_reads_go_to_replicas(replica_router: PrimaryReplicaRouter) -> None:
+    """
+    Test reads go to a replica unless the repository opts out.
+    """
+
+    def check():
+        assert UserRepository()._get_queryset().db == "replica_0"
+        assert CaptchaRepository()._get_queryset().db == "default"
+
+    run_in_context(check)
+
+
+def test_write_pins_primary(replica_router: PrimaryReplicaRouter) -> None:
+    """
+    Test a write pins the following reads of the context to the primary until the pin expires.
+    """
+
+    def check():
+        assert replica_router.db_for_write(User) == "default"
+        assert is_primary_pinned()
+        assert UserRepository()._get_queryset().db == "default"
+
+        pin_primary(0)
+        assert not is_primary_pinned()
+        assert UserRepository()._get_queryset().db == "replica_0"
+
+    run_in_context(check)
+
+
+def test_pin_is_per_context(replica_router: PrimaryReplicaRouter) -> None:
+    """
+    Test a pin of one request does not send the reads of other requests to the primary.
+    """
+    run_in_context(lambda: replica_router.db_for_write(User))
+
+    assert run_in_context(lambda: UserRepository()._get_queryset().db) == "replica_0"
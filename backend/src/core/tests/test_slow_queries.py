@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""Slow query log test."""
+from typing import List
+
+import pytest
+from django.db import connection
+from loguru import logger
+
+from utils.db import slow_queries
+from utils.db.queries import repository_call
+
+
+@pytest.fixture
+def slow_query_records(settings) -> List[dict]:
+    """Log every query slower than 10 ms and explain all of them, yields the slow query log records."""
+    settings.SLOW_QUERY_THRESHOLD_MS = 10
+    settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE = 1.0
+    records: List[dict] = []
+    sink_id = logger.add(
+        lambda message: records.append(message.record),
+        filter=lambda record: "slow_query" in record["extra"],
+    )
+    yield records
+    logger.remove(sink_id)
+    # the explain connection must not keep the test database open
+    slow_queries.close_explain_connection()
+
+
+def wait_for_explains() -> None:
+    """Wait until the explain thread is idle."""
+    slow_queries._explain_executor.submit(lambda: None).result()
+
+
+def test_slow_select_is_logged_with_plan(transactional_db: None, slow_query_records: List[dict]) -> None:
+    """
+    Test a slow read is logged with its source and its plan is logged by the explain thread.
+    """
+    with repository_call("UserRepository.get_one"):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_sleep(%s)", [0.02])
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+    wait_for_explains()
+
+    slow, plan = slow_query_records
+    assert slow["extra"]["repository"] == "UserRepository.get_one"
+    assert slow["extra"]["sql"] == "SELECT pg_sleep(%s)"
+    assert slow["extra"]["params"] == "[0.02]"
+    assert slow["extra"]["duration_ms"] >= 10
+    assert "actual time" in plan["extra"]["plan"]
+
+
+def test_writes_are_not_explained(transactional_db: None, slow_query_records: List[dict]) -> None:
+    """
+    Test slow writes and locking reads are logged without a plan, ``ANALYZE`` would execute them.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("CREATE TEMPORARY TABLE slow_test (id int)")
+        cursor.execute("INSERT INTO slow_test SELECT 1 FROM pg_sleep(%s)", [0.02])
+        cursor.execute("SELECT id FROM slow_test, pg_sleep(%s) FOR UPDATE OF slow_test", [0.02])
+    wait_for_explains()
+
+    logged = [record for record in slow_query_records if "pg_sleep" in record["extra"].get("sql", "")]
+    assert len(logged) == 2
+    assert not any("plan" in record["extra"] for record in slow_query_records)
+
+
+def test_failed_explain_frees_its_slot(transactional_db: None, slow_query_records: List[dict]) -> None:
+    """
+    Test an ``EXPLAIN`` that fails is logged and does not keep its slot.
+    """
+    for _ in range(slow_queries.MAX_PENDING_EXPLAINS + 1):
+        slow_queries.log_slow_query("default", "SELECT * FROM missing_table", None, False, 1.0, None)
+        wait_for_explains()
+
+    failures = [record for record in slow_query_records if record["message"].startswith("EXPLAIN failed")]
+    assert len(failures) == slow_queries.MAX_PENDING_EXPLAINS + 1
+
+
+def test_threshold_and_sampling(settings) -> None:
+    """
+    Test the threshold switch and the sample rate.
+    """
+    settings.SLOW_QUERY_THRESHOLD_MS = 0
+    assert not slow_queries.is_slow(10.0)
+    settings.SLOW_QUERY_THRESHOLD_MS = 500
+    assert slow_queries.is_slow(0.5) and not slow_queries.is_slow(0.4)
+
+    settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE = 0.0
+    assert not slow_queries._should_explain("SELECT 1")
+    settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE = 1.0
+    assert slow_queries._should_explain("  select 1")
+    assert not slow_queries._should_explain("UPDATE users_user SET is_active = false")
+
+
+def test_params_and_plan_literals_are_redacted(transactional_db: None, slow_query_records: List[dict]) -> None:
+    """
+    Test text parameters, e.g. password hashes, are logged neither with the query nor in its plan.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_sleep(%s) FROM generate_series(1, 1) AS s WHERE s::text <> %s", [0.02, "secret-hash"])
+    wait_for_explains()
+
+    slow, plan = slow_query_records
+    assert slow["extra"]["params"] == "[0.02, '<redacted>']"
+    assert "secret-hash" not in plan["extra"]["plan"] and "'<redacted>'" in plan["extra"]["plan"]
+    assert slow_queries.redact_params({"id": 1, "token": b"abc"}) == {"id": 1, "token": "<redacted>"}
+
+
+def test_broken_explain_connection_is_replaced(transactional_db: None, slow_query_records: List[dict]) -> None:
+    """
+    Test a connection that went away, e.g. killed by the server, is replaced before the next plan.
+    """
+    slow_queries.log_slow_query("default", "SELECT 1", None, False, 1.0, None)
+    wait_for_explains()
+
+    def break_connection():
+        slow_queries._explain_connection.ensure_connection()
+        slow_queries._explain_connection.connection.close()
+
+    slow_queries._explain_executor.submit(break_connection).result()
+    slow_queries.log_slow_query("default", "SELECT 2", None, False, 1.0, None)
+    wait_for_explains()
+
+    plans = [record for record in slow_query_records if "plan" in record["extra"]]
+    assert len(plans) == 2
+    assert not any(record["message"].startswith("EXPLAIN failed") for record in slow_query_records)
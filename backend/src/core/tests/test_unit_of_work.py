@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""Unit of work test."""
+from typing import List
+
+import pytest
+from django.db import IntegrityError
+from loguru import logger
+
+from src.users.models import User
+from src.users.repositories.user import UserRepository
+from utils.db.executor import db_executor
+from utils.db.unit_of_work import get_unit_of_work, unit_of_work
+
+
+async def get_emails() -> List[str]:
+    """Get the emails of the committed users."""
+    return sorted([email async for email in User.objects.values_list("email", flat=True)])
+
+
+@pytest.mark.anyio
+async def test_writes_are_committed_at_the_end(transactional_db: None) -> None:
+    """
+    Test writes of the block are deferred and committed together, callbacks run after the commit.
+    """
+    repository = UserRepository()
+    committed: List[List[str]] = []
+
+    async def after_async():
+        committed.append(await get_emails())
+
+    async with unit_of_work() as uow:
+        first = await repository.acreate_one(email="first@example.com")
+        second = await repository.acreate_one(email="second@example.com")
+        assert first.pk is None
+        assert await get_emails() == []
+
+        # a nested unit of work joins the outer one
+        async with unit_of_work() as nested:
+            assert nested is uow
+            uow.add(lambda: None, after=lambda: committed.append(["sync"]))
+            uow.add(lambda: None, after=after_async)
+        assert len(uow) == 4
+
+    assert get_unit_of_work() is None
+    assert first.pk is not None and second.pk is not None
+    assert await get_emails() == ["first@example.com", "second@example.com"]
+    assert committed == [["sync"], ["first@example.com", "second@example.com"]]
+
+
+@pytest.mark.anyio
+async def test_immediate_write_flushes_pending_writes(transactional_db: None) -> None:
+    """
+    Test a write whose result is needed right away commits the writes deferred before it.
+    """
+    repository = UserRepository()
+
+    async with unit_of_work() as uow:
+        await repository.acreate_one(email="first@example.com")
+        user, created = await repository.get_or_create_one(email="second@example.com")
+        assert created and user.pk is not None
+        assert len(uow) == 0
+        assert await get_emails() == ["first@example.com", "second@example.com"]
+
+        await repository.acreate_one(email="third@example.com")
+        assert len(uow) == 1
+
+    assert len(await get_emails()) == 3
+
+
+@pytest.mark.anyio
+async def test_failures_write_nothing(transactional_db: None) -> None:
+    """
+    Test nothing is written if the block raises or one of the writes fails.
+    """
+    repository = UserRepository()
+    await db_executor.run(User.objects.create, email="taken@example.com")
+
+    with pytest.raises(RuntimeError):
+        async with unit_of_work():
+            await repository.acreate_one(email="first@example.com")
+            raise RuntimeError("service failed")
+
+    with pytest.raises(IntegrityError):
+        async with unit_of_work():
+            await repository.acreate_one(email="second@example.com")
+            await repository.acreate_one(email="TAKEN@example.com")
+
+    assert await get_emails() == ["taken@example.com"]
+
+
+@pytest.mark.anyio
+async def test_failure_after_immediate_write(transactional_db: None) -> None:
+    """
+    Test a failure after an immediate write keeps the writes it committed and rolls back the later ones.
+    """
+    repository = UserRepository()
+    warnings: List[str] = []
+    sink_id = logger.add(lambda message: warnings.append(message.record["message"]), level="WARNING")
+
+    try:
+        with pytest.raises(RuntimeError):
+            async with unit_of_work():
+                await repository.acreate_one(email="first@example.com")
+                await repository.get_or_create_one(email="second@example.com")
+                await repository.acreate_one(email="third@example.com")
+                raise RuntimeError("service failed")
+    finally:
+        logger.remove(sink_id)
+
+    assert await get_emails() == ["first@example.com", "second@example.com"]
+    assert any(message.startswith("Unit of work commits 1 pending writes early") for message in warnings)
@@ -2,6 +2,9 @@
 """User containers module."""
 from dependency_injector import containers, providers
 
+from src.authentication.repositories.password_token_repository import \
+    PasswordTokenRepository
+from src.authentication.services import PasswordService
 from src.core.containers import CoreContainer
 from src.users.repositories import UserRepository
 from src.users.services import UserService
@@ -14,8 +17,20 @@ class UserContainer(containers.DeclarativeContainer):
         UserRepository,
     )
 
+    # users get their passwords set by the password service, the auth container shares it
+    password_token_repository: PasswordTokenRepository = providers.Singleton(
+        PasswordTokenRepository,
+    )
+
+    password_service: PasswordService = providers.Singleton(
+        PasswordService,
+        password_token_repository=password_token_repository,
+        password_hasher=CoreContainer.password_hasher,
+    )
+
     user_service: UserService = providers.Singleton(
         UserService,
         user_repository=user_repository,
         image_service=CoreContainer.image_service,
+        password_service=password_service,
     )
@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+"""User entities."""
+
+# columns needed to verify and change a password, saving such an instance updates only these columns
+USER_PASSWORD_FIELDS = ["id", "email", "password", "is_active", "date_updated"]
+
+# heavy columns that are not part of the token payload
+USER_PAYLOAD_DEFERRED_FIELDS = ["password", "avatar"]
+
+# columns moved by the ``export_users`` and ``import_users`` commands, password hashes are copied as they are
+USER_COPY_FIELDS = [
+    "email",
+    "password",
+    "last_login",
+    "date_created",
+    "date_updated",
+    "avatar",
+    "is_staff",
+    "is_active",
+    "is_superuser",
+]
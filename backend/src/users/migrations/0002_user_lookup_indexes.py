@@ -0,0 +1,26 @@
+# Generated by Django 4.2 on 2026-10-18 09:01
+
+import django.db.models.functions.text
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # indexes are built concurrently, so the users table stays writable during the migration
+    atomic = False
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='user',
+            index=models.Index(fields=['-date_created', 'id'], name='users_user_created_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='user',
+            index=models.Index(django.db.models.functions.text.Lower('email'), name='users_user_email_lower_idx'),
+        ),
+    ]
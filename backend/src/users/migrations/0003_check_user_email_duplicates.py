@@ -0,0 +1,38 @@
+# Generated by Django 4.2 on 2026-10-18 12:40
+
+from django.db import IntegrityError, migrations
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+# duplicated emails listed in the error
+MAX_LISTED_DUPLICATES = 20
+
+
+def check_email_duplicates(apps, schema_editor):
+    """Fail with the duplicated emails before the unique index is built, users are not merged automatically."""
+    User = apps.get_model('users', 'User')
+    duplicates = list(
+        User.objects.using(schema_editor.connection.alias)
+        .annotate(email_lower=Lower('email'))
+        .order_by()
+        .values('email_lower')
+        .annotate(count=Count('id'))
+        .filter(count__gt=1)
+        .values_list('email_lower', flat=True)[:MAX_LISTED_DUPLICATES]
+    )
+    if duplicates:
+        raise IntegrityError(
+            'Users with emails differing only in case must be merged or renamed before '
+            f'users_user_email_lower_uniq is built: {", ".join(sorted(duplicates))}'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_user_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_email_duplicates, migrations.RunPython.noop),
+    ]
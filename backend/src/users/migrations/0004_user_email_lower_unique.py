@@ -0,0 +1,44 @@
+# Generated by Django 4.2 on 2026-10-18 10:05
+
+import django.db.models.functions.text
+from django.contrib.postgres.operations import RemoveIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    # the unique index is built concurrently, so the users table stays writable during the migration
+    atomic = False
+
+    dependencies = [
+        ('users', '0003_check_user_email_duplicates'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                # an index left invalid by a failed concurrent build would be kept by IF NOT EXISTS
+                migrations.RunSQL(
+                    'DROP INDEX CONCURRENTLY IF EXISTS "users_user_email_lower_uniq"',
+                    reverse_sql=migrations.RunSQL.noop,
+                ),
+                migrations.RunSQL(
+                    'CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS "users_user_email_lower_uniq" '
+                    'ON "users_user" ((LOWER("email")))',
+                    reverse_sql='DROP INDEX CONCURRENTLY IF EXISTS "users_user_email_lower_uniq"',
+                ),
+            ],
+            state_operations=[
+                migrations.AddConstraint(
+                    model_name='user',
+                    constraint=models.UniqueConstraint(
+                        django.db.models.functions.text.Lower('email'), name='users_user_email_lower_uniq'
+                    ),
+                ),
+            ],
+        ),
+        RemoveIndexConcurrently(
+            model_name='user',
+            name='users_user_email_lower_idx',
+        ),
+    ]
@@ -3,6 +3,7 @@
 from django.contrib.auth.base_user import AbstractBaseUser
 from django.contrib.auth.models import PermissionsMixin, UserManager
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils import timezone
 
 from utils.models.magic_image import MagicImageField
@@ -36,5 +37,17 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     class Meta:
         ordering = ("-date_created",)
+        indexes = [
+            # default ordering and keyset pagination of lists
+            models.Index(fields=["-date_created", "id"], name="users_user_created_id_idx"),
+        ]
+        constraints = [
+            # case insensitive email lookups (``email__lower``), and no two users differing only in the email case
+            models.UniqueConstraint(Lower("email"), name="users_user_email_lower_uniq"),
+        ]
         verbose_name = "Юзер"
         verbose_name_plural = "Юзеры"
+
+
+# ``email__lower=...`` compares lower(email), so it is served by the functional index; other email fields are untouched
+User._meta.get_field("email").register_lookup(Lower)
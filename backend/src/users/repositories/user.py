@@ -1,15 +1,32 @@
 # -*- coding: utf-8 -*-
 """User repository module."""
+from typing import Optional
+
+from django.conf import settings
+
+from src.core.schemas.caches import ServiceCacheParams
 from src.users.models import User
+from utils.repositories import PreparedQuery
 from utils.repositories.base import BaseRepository
 
 
 class UserRepository(BaseRepository):
     """User repository."""
 
-    def __init__(self):
-        """Initialize user repository."""
-        self.model = User
+    # the same user is read by many concurrent requests, e.g. on token refresh
+    coalesce_reads = True
+    model = User
+    cache_params = ServiceCacheParams(namespace="repository:users:{pk}", timeout=settings.USER_CACHE_TIMEOUT)
+    # password hashes stay out of Redis
+    cache_exclude_fields = ("password",)
+    prepared_queries = {
+        "by_id": PreparedQuery(fields=("id",)),
+        "by_email": PreparedQuery(fields=("email__lower",)),
+    }
+
+    async def get_one_by_email(self, email: str) -> Optional[User]:
+        """Get user by email, case insensitive."""
+        return await self.get_one(email__lower=email.lower(), raise_not_found=False)
 
     def get_profile(self, user_id: int):
         """Get user profile."""
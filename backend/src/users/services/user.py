@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 """User service module."""
+from typing import TYPE_CHECKING, Optional
+
 from django.core.files import File
 from fastapi import UploadFile
 
@@ -10,6 +12,9 @@ from src.users.repositories import UserRepository
 from src.users.schemas.profile import ProfileUpdateSchema
 from utils.services import BaseService
 
+if TYPE_CHECKING:
+    from src.authentication.services import PasswordService
+
 
 class UserService(BaseService):
     """User service."""
@@ -18,10 +23,12 @@ class UserService(BaseService):
         self,
         user_repository: UserRepository,
         image_service: ImageService,
+        password_service: "PasswordService",
     ):
         """Initialize user service."""
         self.repository: UserRepository = user_repository
         self.image_service: ImageService = image_service
+        self.password_service: "PasswordService" = password_service
         self.avatar_max_size: int = 1024 * 1024 * 10  # 10 MB
 
     async def get_profile(self, user_id: int):
@@ -29,6 +36,10 @@ class UserService(BaseService):
         user: User = await self.repository.get_one(id=user_id)
         return user
 
+    async def get_one_by_email(self, email: str) -> Optional[User]:
+        """Get user by email, ``None`` if there is no such user."""
+        return await self.repository.get_one_by_email(email)
+
     async def create_user(self, email: str, password: str, nickname: str, nickname_number: str, slug: str):
         """Create user."""
         # create user object
@@ -38,14 +49,14 @@ class UserService(BaseService):
         )
 
         # set password
-        user.set_password(password)
+        await self.password_service.set_password(user, password)
 
         # save user
         return await self.repository.save_one(user)
 
     async def update_user_password(self, user: User, new_password: str):
         """Update user password."""
-        user.set_password(new_password)
+        await self.password_service.set_password(user, new_password)
         return await self.repository.save_one(user)
 
     async def patch_profile(self, user_id: int, profile_update_schema: ProfileUpdateSchema) -> User:
@@ -61,7 +72,7 @@ class UserService(BaseService):
     async def check_email_exists(self, email: str, exclude_id: int = None):
         """Check if email exists."""
         # get users with this email
-        email_checked = await self.get_one(email=email, raise_not_found=False)
+        email_checked = await self.get_one(email__lower=email.lower(), raise_not_found=False)
         email_patreon_checked = await self.get_one(email_patreon=email, raise_not_found=False)
 
         # check if email exists
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""Bulk upsert test."""
+import pytest
+from django.db import connection
+
+from src.users.models import User
+from src.users.repositories.user import UserRepository
+
+
+@pytest.mark.anyio
+async def test_bulk_upsert(transactional_db: None) -> None:
+    """
+    Test conflicting rows are updated, get their primary keys and are dropped from the cache.
+    """
+    repository = UserRepository()
+    existing = await User.objects.acreate(email="existing@example.com")
+    # cache the current row
+    assert not (await repository.get_one_by_id(existing.id)).is_staff
+
+    objs = await repository.bulk_upsert(
+        [User(email="existing@example.com", is_staff=True), User(email="new@example.com", is_staff=True)],
+        unique_fields=["email"],
+        update_fields=["is_staff"],
+    )
+
+    assert objs[0].pk == existing.id
+    assert objs[1].pk is not None
+    assert await User.objects.acount() == 2
+    assert (await repository.get_one_by_id(existing.id)).is_staff
+
+
+@pytest.mark.anyio
+async def test_bulk_upsert_reads_back_in_batches(transactional_db: None, assert_max_queries, monkeypatch) -> None:
+    """
+    Test primary keys are read back with one query per batch, inside the transaction of the upsert.
+    """
+    repository = UserRepository()
+    await User.objects.acreate(email="user0@example.com")
+    in_transaction = []
+    set_pks = repository._set_pks_by_unique_fields
+
+    def set_pks_in_transaction(*args):
+        in_transaction.append(connection.in_atomic_block)
+        set_pks(*args)
+
+    monkeypatch.setattr(repository, "_set_pks_by_unique_fields", set_pks_in_transaction)
+
+    with assert_max_queries(8) as stats:
+        objs = await repository.bulk_upsert(
+            [User(email=f"user{index}@example.com", is_staff=True) for index in range(5)],
+            unique_fields=["email"],
+            update_fields=["is_staff"],
+            batch_size=2,
+        )
+
+    statements = [shape.split()[0].upper() for shape in stats.shapes for _ in range(stats.shapes[shape])]
+    assert statements == ["INSERT"] * 3 + ["SELECT"] * 3
+    assert in_transaction == [True]
+    assert len({obj.pk for obj in objs}) == 5
+    assert await User.objects.filter(is_staff=True).acount() == 5
+
+
+@pytest.mark.anyio
+async def test_bulk_update(transactional_db: None) -> None:
+    """
+    Test the fields of existing rows are updated in batches and the rows are dropped from the cache.
+    """
+    repository = UserRepository()
+    users = await User.objects.abulk_create([User(email=f"user{index}@example.com") for index in range(3)])
+    # cache the current row
+    assert not (await repository.get_one_by_id(users[0].id)).is_staff
+
+    for user in users:
+        user.is_staff = True
+    assert await repository.bulk_update(users, fields=["is_staff"], batch_size=2) == 3
+
+    assert await User.objects.filter(is_staff=True).acount() == 3
+    assert (await repository.get_one_by_id(users[0].id)).is_staff
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""Paginated list with total count test."""
+from typing import List
+
+import pytest
+
+from src.users.models import User
+from src.users.repositories.user import UserRepository
+from utils.repositories import CountStrategy
+
+
+@pytest.fixture
+async def users(transactional_db: None) -> List[User]:
+    """Five users, two of them staff."""
+    return await User.objects.abulk_create(
+        [User(email=f"user{index}@example.com", is_staff=index < 2) for index in range(5)]
+    )
+
+
+@pytest.mark.anyio
+async def test_window_count(users: List[User], assert_max_queries) -> None:
+    """
+    Test the page and the filtered total come from one query.
+    """
+    with assert_max_queries(1):
+        items, total_count = await UserRepository().get_all_and_count(limit=2, offset=1)
+
+    assert total_count == 5 and total_count.exact
+    assert len(items) == 2
+    assert all(not hasattr(item, "_window_total_count") for item in items)
+
+    with assert_max_queries(1):
+        items, total_count = await UserRepository().get_all_and_count(limit=10, is_staff=True, values=["id"])
+
+    assert total_count == 2
+    assert items and all(set(item) == {"id"} for item in items)
+
+
+@pytest.mark.anyio
+async def test_window_count_past_end(users: List[User]) -> None:
+    """
+    Test a page past the end still gets the total, from a second count query.
+    """
+    items, total_count = await UserRepository().get_all_and_count(limit=2, offset=10)
+
+    assert items == []
+    assert total_count == 5
+
+    items, total_count = await UserRepository().get_all_and_count(limit=2, email="missing@example.com")
+
+    assert items == []
+    assert total_count == 0
+
+
+@pytest.mark.anyio
+async def test_separate_count(users: List[User], assert_max_queries) -> None:
+    """
+    Test the separate strategy counts with its own query.
+    """
+    with assert_max_queries(2) as stats:
+        items, total_count = await UserRepository().get_all_and_count(
+            limit=2,
+            is_staff=False,
+            count_strategy=CountStrategy.SEPARATE,
+        )
+
+    assert stats.count == 2
+    assert len(items) == 2
+    assert total_count == 3
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""Keyset pagination test."""
+import base64
+import json
+from datetime import timedelta
+from typing import List
+
+import pytest
+from django.utils import timezone
+
+from src.users.models import User
+from src.users.repositories.user import UserRepository
+from utils.repositories.cursor import get_keyset_ordering
+from utils.responses.http.api import InvalidCursorException
+
+
+@pytest.fixture
+async def users(transactional_db: None) -> List[User]:
+    """Five users, the middle three created at the same time."""
+    now = timezone.now()
+    minute = timedelta(minutes=1)
+    dates = [now, now - minute, now - minute, now - minute, now - 2 * minute]
+    return await User.objects.abulk_create(
+        [User(email=f"user{index}@example.com", date_created=date) for index, date in enumerate(dates)]
+    )
+
+
+def expected_order(users: List[User]) -> List[int]:
+    """Ids in the default ordering, newest first and ties by id."""
+    return [user.id for user in sorted(users, key=lambda user: (-user.date_created.timestamp(), user.id))]
+
+
+@pytest.mark.anyio
+async def test_cursor_forward(users: List[User]) -> None:
+    """
+    Test walking all pages forward, ties on date_created are split by id without gaps or repeats.
+    """
+    repository = UserRepository()
+    ids, cursor, pages = [], None, 0
+    while True:
+        items, cursor, previous_cursor = await repository.get_all_by_cursor(limit=2, cursor=cursor)
+        ids += [item.id for item in items]
+        pages += 1
+        assert (previous_cursor is None) == (pages == 1)
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert ids == expected_order(users)
+
+
+@pytest.mark.anyio
+async def test_cursor_backward(users: List[User]) -> None:
+    """
+    Test the previous cursor returns the page before, in the same order.
+    """
+    repository = UserRepository()
+    first_page, next_cursor, _ = await repository.get_all_by_cursor(limit=2)
+    second_page, _, previous_cursor = await repository.get_all_by_cursor(limit=2, cursor=next_cursor)
+
+    items, next_again, previous_again = await repository.get_all_by_cursor(limit=2, cursor=previous_cursor)
+
+    assert [item.id for item in items] == [item.id for item in first_page]
+    assert previous_again is None
+    assert next_again is not None
+    assert [item.id for item in second_page] == expected_order(users)[2:4]
+
+
+@pytest.mark.anyio
+async def test_cursor_values(users: List[User]) -> None:
+    """
+    Test pagination of values() rows.
+    """
+    repository = UserRepository()
+    items, cursor, _ = await repository.get_all_by_cursor(limit=3, values=["id", "date_created"])
+    more, cursor, _ = await repository.get_all_by_cursor(limit=3, cursor=cursor, values=["id", "date_created"])
+
+    assert cursor is None
+    assert [item["id"] for item in items + more] == expected_order(users)
+
+
+@pytest.mark.anyio
+async def test_cursor_invalid(users: List[User]) -> None:
+    """
+    Test invalid cursors and nullable ordering fields are rejected.
+    """
+    with pytest.raises(InvalidCursorException):
+        await UserRepository().get_all_by_cursor(limit=2, cursor="not-a-cursor")
+
+    # well formed JSON of the wrong shape
+    for data in (["n", 5], ["n", {"a": 1, "b": 2}], ["n", [[1], 2]], ["n", ["2024-01-01", {}]]):
+        cursor = base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+        with pytest.raises(InvalidCursorException):
+            await UserRepository().get_all_by_cursor(limit=2, cursor=cursor)
+
+    with pytest.raises(ValueError):
+        get_keyset_ordering(User, ["last_login"])
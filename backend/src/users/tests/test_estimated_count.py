@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""Estimated total count test."""
+from typing import List
+
+import pytest
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import connection
+from redis.exceptions import RedisError
+
+from src.users.models import User
+from src.users.repositories.user import UserRepository
+from utils.repositories import CountStrategy
+
+
+@pytest.fixture
+async def users(transactional_db: None) -> List[User]:
+    """Five analyzed users, two of them staff."""
+    await sync_to_async(cache.clear)()
+    users = await User.objects.abulk_create(
+        [User(email=f"user{index}@example.com", is_staff=index < 2) for index in range(5)]
+    )
+
+    @sync_to_async
+    def analyze():
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {User._meta.db_table}")
+
+    await analyze()
+    return users
+
+
+async def get_page(**kwargs):
+    """Get a page with the estimated count strategy."""
+    return await UserRepository().get_all_and_count(count_strategy=CountStrategy.ESTIMATED, **kwargs)
+
+
+@pytest.mark.anyio
+async def test_small_counts_are_exact_and_cached(users: List[User], settings, assert_max_queries) -> None:
+    """
+    Test a total below the threshold is counted exactly once and then served from the cache.
+    """
+    settings.PAGINATION_ESTIMATED_COUNT_THRESHOLD = 1000
+
+    with assert_max_queries(3):
+        items, total_count = await get_page(limit=2)
+    assert len(items) == 2
+    assert total_count == 5 and total_count.exact
+
+    with assert_max_queries(2) as stats:
+        items, total_count = await get_page(limit=2, offset=2)
+    assert stats.count == 2
+    assert total_count == 5 and total_count.exact
+
+
+@pytest.mark.anyio
+async def test_large_counts_are_estimated(users: List[User], settings, assert_max_queries) -> None:
+    """
+    Test a total above the threshold comes from the table statistics or the query plan.
+    """
+    settings.PAGINATION_ESTIMATED_COUNT_THRESHOLD = 1
+
+    with assert_max_queries(2):
+        items, total_count = await get_page(limit=2)
+    assert total_count == 5 and not total_count.exact
+
+    items, total_count = await get_page(limit=1, is_staff=True)
+    assert len(items) == 1
+    assert total_count >= 1 and not total_count.exact
+
+
+@pytest.mark.anyio
+async def test_known_totals_skip_counting(users: List[User], settings, assert_max_queries, monkeypatch) -> None:
+    """
+    Test the last page needs no count, an estimate is raised to the rows seen but not by a page past the end.
+    """
+    settings.PAGINATION_ESTIMATED_COUNT_THRESHOLD = 1
+
+    with assert_max_queries(1):
+        items, total_count = await get_page(limit=10, offset=3)
+    assert len(items) == 2
+    assert total_count == 5 and total_count.exact
+
+    items, total_count = await get_page(limit=10, offset=10)
+    assert items == []
+    assert total_count == 5 and not total_count.exact
+
+    # statistics older than the latest inserts
+    monkeypatch.setattr("utils.repositories.base.estimate_count", lambda qs: 1)
+    items, total_count = await get_page(limit=2, offset=2)
+    assert total_count == 4 and not total_count.exact
+
+
+@pytest.mark.anyio
+async def test_failing_cache_counts_exactly(users: List[User], settings, monkeypatch) -> None:
+    """
+    Test the exact count is returned when the count cache can not be read or written.
+    """
+    settings.PAGINATION_ESTIMATED_COUNT_THRESHOLD = 1000
+
+    async def fail(*args, **kwargs):
+        raise RedisError("connection refused")
+
+    monkeypatch.setattr(cache, "aset", fail)
+    items, total_count = await get_page(limit=2)
+    assert total_count == 5 and total_count.exact
+
+    monkeypatch.setattr(cache, "aget", fail)
+    items, total_count = await get_page(limit=2)
+    assert total_count == 5 and total_count.exact
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""Request loader test."""
+import asyncio
+
+import pytest
+
+from src.users.models import User
+from src.users.repositories.user import UserRepository
+from utils.repositories.loader import activate_loaders, deactivate_loaders
+
+
+@pytest.fixture
+def loaders() -> None:
+    """Run the test inside a request loader scope."""
+    token = activate_loaders()
+    yield
+    deactivate_loaders(token)
+
+
+@pytest.mark.anyio
+async def test_loader_batches(transactional_db: None, loaders: None, assert_max_queries) -> None:
+    """
+    Test concurrent primary key lookups share one query and get their own copies.
+    """
+    first, second = await User.objects.abulk_create([User(email="first@example.com"), User(email="second@example.com")])
+    repository = UserRepository()
+
+    with assert_max_queries(1):
+        users = await asyncio.gather(
+            repository.get_one_by_id(first.id, use_cache=False),
+            repository.get_one_by_id(second.id, use_cache=False),
+            repository.get_one_by_id(first.id, use_cache=False),
+        )
+
+    assert [user.id for user in users] == [first.id, second.id, first.id]
+    assert users[0] is not users[2]
+
+    users[0].email = "changed@example.com"
+    with assert_max_queries(0):
+        memoised = await repository.get_one_by_id(first.id, use_cache=False)
+
+    assert memoised.email == "first@example.com"
+
+
+@pytest.mark.anyio
+async def test_loader_does_not_memoise_misses(transactional_db: None, loaders: None) -> None:
+    """
+    Test a row created after a miss in the same request is found.
+    """
+    repository = UserRepository()
+    missing_id = 10**9
+
+    assert await repository.get_one_by_id(missing_id, raise_not_found=False, use_cache=False) is None
+
+    await User.objects.acreate(id=missing_id, email="late@example.com")
+
+    assert (await repository.get_one_by_id(missing_id, use_cache=False)).email == "late@example.com"
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""Users migrations test."""
+import importlib
+
+import pytest
+from django.apps import apps
+from django.db import IntegrityError, connection
+
+from src.users.models import User
+
+check_email_duplicates = importlib.import_module(
+    "src.users.migrations.0003_check_user_email_duplicates"
+).check_email_duplicates
+
+
+def test_email_duplicates_stop_the_unique_index(db: None) -> None:
+    """
+    Test emails differing only in case are listed before the unique index is built.
+    """
+    User.objects.create(email="user@example.com")
+    check_email_duplicates(apps, connection.schema_editor())
+
+    # the state before the unique index, rolled back with the test
+    with connection.cursor() as cursor:
+        cursor.execute('DROP INDEX "users_user_email_lower_uniq"')
+    User.objects.bulk_create([User(email="USER@example.com"), User(email="other@example.com")])
+
+    with pytest.raises(IntegrityError, match="user@example.com"):
+        check_email_duplicates(apps, connection.schema_editor())
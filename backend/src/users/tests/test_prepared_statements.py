@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""Prepared statements test."""
+from typing import List
+
+import pytest
+from asgiref.sync import sync_to_async
+from django.db import connection, transaction
+
+from src.users.models import User
+from src.users.repositories.user import UserRepository
+from utils.repositories.prepared import to_server_placeholders
+
+
+def get_statements(stats) -> List[str]:
+    """Get the first word of every recorded statement."""
+    return [shape.split()[0].upper() for shape in stats.shapes for _ in range(stats.shapes[shape])]
+
+
+@pytest.mark.anyio
+async def test_statement_is_prepared_once(transactional_db: None, assert_max_queries) -> None:
+    """
+    Test the first lookup prepares the statement and later lookups only execute it.
+    """
+    await User.objects.acreate(email="user@example.com")
+    repository = UserRepository()
+
+    with assert_max_queries(1) as stats:
+        user = await repository.get_one_prepared("by_email", email__lower="user@example.com")
+    assert get_statements(stats) == ["EXECUTE"]
+    assert stats.prepares == 1
+    assert user.email == "user@example.com"
+    assert not user.get_deferred_fields()
+
+    with assert_max_queries(1) as stats:
+        assert await repository.get_one_by_email("USER@example.com") == user
+    assert get_statements(stats) == ["EXECUTE"]
+    assert stats.prepares == 0
+
+    missing = await repository.get_one_prepared("by_email", raise_not_found=False, email__lower="other@example.com")
+    assert missing is None
+
+
+@pytest.mark.anyio
+async def test_get_one_runs_prepared_outside_transaction(transactional_db: None, assert_max_queries) -> None:
+    """
+    Test ``get_one`` with the filters of a declared query runs it prepared, as one query.
+    """
+    user = await User.objects.acreate(email="user@example.com")
+    repository = UserRepository()
+
+    with assert_max_queries(1) as stats:
+        assert await repository.get_one_by_id(user.id, use_cache=False) == user
+    assert get_statements(stats) == ["EXECUTE"]
+    assert stats.prepares <= 1
+
+
+@pytest.mark.anyio
+async def test_dropped_statement_is_prepared_again(transactional_db: None) -> None:
+    """
+    Test a statement dropped by the server, e.g. by ``DISCARD ALL`` of a pooler, is prepared again.
+    """
+    user = await User.objects.acreate(email="user@example.com")
+    repository = UserRepository()
+    await repository.get_one_prepared("by_id", id=user.id)
+
+    @sync_to_async
+    def deallocate():
+        with connection.cursor() as cursor:
+            cursor.execute("DEALLOCATE ALL")
+
+    await deallocate()
+    assert await repository.get_one_prepared("by_id", id=user.id) == user
+
+
+def test_plain_query_inside_transaction(transactional_db: None) -> None:
+    """
+    Test a lookup inside a transaction runs as a plain query, a failed ``PREPARE`` would abort the transaction.
+    """
+    user = User.objects.create(email="user@example.com")
+    statements: List[str] = []
+
+    with transaction.atomic():
+        with connection.execute_wrapper(lambda execute, sql, *args: statements.append(sql) or execute(sql, *args)):
+            assert UserRepository()._get_one_prepared_sync("by_id", {"id": user.id}) == user
+
+    assert len(statements) == 1
+    assert statements[0].startswith("SELECT")
+
+
+def test_wrong_fields_and_placeholders() -> None:
+    """
+    Test the declared fields are enforced and placeholders are numbered.
+    """
+    with pytest.raises(ValueError):
+        UserRepository()._get_one_prepared_sync("by_id", {"email": "user@example.com"})
+
+    assert to_server_placeholders("SELECT %s, '100%%', %s") == "SELECT $1, '100%', $2"
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""Projected reads test."""
+import pytest
+from asgiref.sync import sync_to_async
+
+from src.users.entities import (USER_PASSWORD_FIELDS,
+                                USER_PAYLOAD_DEFERRED_FIELDS)
+from src.users.models import User
+from src.users.repositories.user import UserRepository
+
+
+@pytest.fixture
+async def user(transactional_db: None) -> User:
+    """A user with a password."""
+    return await User.objects.acreate(email="user@example.com", password="hash")
+
+
+@pytest.mark.anyio
+async def test_get_one_only(user: User, assert_max_queries) -> None:
+    """
+    Test only() loads just the given columns.
+    """
+    with assert_max_queries(1):
+        obj = await UserRepository().get_one_by_id(user.id, only=USER_PASSWORD_FIELDS, use_cache=False)
+
+    assert obj.get_deferred_fields() == {field.attname for field in User._meta.concrete_fields} - set(
+        USER_PASSWORD_FIELDS
+    )
+    assert obj.password == "hash"
+
+
+@pytest.mark.anyio
+async def test_get_one_defer(user: User) -> None:
+    """
+    Test defer() leaves the heavy columns out.
+    """
+    obj = await UserRepository().get_one_by_id(user.id, defer=USER_PAYLOAD_DEFERRED_FIELDS, use_cache=False)
+
+    assert obj.get_deferred_fields() == set(USER_PAYLOAD_DEFERRED_FIELDS)
+    assert obj.email == user.email
+
+
+@pytest.mark.anyio
+async def test_only_save_updates_loaded_columns(user: User) -> None:
+    """
+    Test saving an only() instance writes just the loaded columns, so concurrent changes of others survive.
+    """
+    obj = await UserRepository().get_one_by_id(user.id, only=USER_PASSWORD_FIELDS, use_cache=False)
+    await User.objects.filter(id=user.id).aupdate(is_staff=True)
+
+    obj.password = "new-hash"
+    await sync_to_async(obj.save)()
+
+    saved = await User.objects.aget(id=user.id)
+    assert saved.password == "new-hash"
+    assert saved.is_staff
+
+
+@pytest.mark.anyio
+async def test_values(user: User) -> None:
+    """
+    Test values() returns dictionaries with just the given fields.
+    """
+    repository = UserRepository()
+    row = await repository.get_one(email=user.email, values=["id", "email"])
+    rows = await repository.get_all(values=["email"])
+
+    assert row == {"id": user.id, "email": user.email}
+    assert rows == [{"email": user.email}]
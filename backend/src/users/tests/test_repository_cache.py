@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""Repository cache test."""
+import pytest
+from django.core.cache import cache
+
+from src.users.entities import (USER_PASSWORD_FIELDS,
+                                USER_PAYLOAD_DEFERRED_FIELDS)
+from src.users.models import User
+from src.users.repositories.user import UserRepository
+from utils.repositories.cache import aget_cached, ainvalidate, aset_cached
+
+
+@pytest.fixture(autouse=True)
+def clear_cache() -> None:
+    """Start every test with an empty cache."""
+    cache.clear()
+
+
+@pytest.mark.anyio
+async def test_cached_row_leaves_out_password(transactional_db: None, assert_max_queries) -> None:
+    """
+    Test a primary key lookup is cached without the password hash.
+    """
+    user = await User.objects.acreate(email="user@example.com", password="hash")
+    repository = UserRepository()
+    await repository.get_one_by_id(user.id)
+
+    with assert_max_queries(0):
+        cached = await repository.get_one_by_id(user.id)
+
+    assert cached.email == "user@example.com"
+    assert cached.get_deferred_fields() == {"password"}
+    version, data = await cache.aget(UserRepository.cache_params.build_key(pk=user.id))
+    assert "hash" not in data
+
+
+@pytest.mark.anyio
+async def test_projected_lookup_uses_cache(transactional_db: None, assert_max_queries) -> None:
+    """
+    Test lookups projecting cached columns fill and read the cache.
+    """
+    user = await User.objects.acreate(email="user@example.com", password="hash")
+    repository = UserRepository()
+    await repository.get_one_by_id(user.id, defer=USER_PAYLOAD_DEFERRED_FIELDS)
+    assert await cache.aget(UserRepository.cache_params.build_key(pk=user.id)) is not None
+
+    with assert_max_queries(0):
+        deferred = await repository.get_one_by_id(user.id, defer=USER_PAYLOAD_DEFERRED_FIELDS)
+        projected = await repository.get_one_by_id(user.id, only=["id", "email"])
+
+    assert deferred.get_deferred_fields() == projected.get_deferred_fields() == {"password"}
+    assert projected.email == "user@example.com"
+
+
+@pytest.mark.anyio
+async def test_password_lookup_skips_cache(transactional_db: None, assert_max_queries) -> None:
+    """
+    Test lookups projecting the password query the database, the cached row has no password to check.
+    """
+    user = await User.objects.acreate(email="user@example.com", password="hash")
+    repository = UserRepository()
+    await repository.get_one_by_id(user.id)
+
+    with assert_max_queries(1) as stats:
+        projected = await repository.get_one_by_id(user.id, only=USER_PASSWORD_FIELDS)
+    assert stats.count == 1
+    assert projected.password == "hash"
+    assert "is_staff" in projected.get_deferred_fields()
+
+    with assert_max_queries(1) as stats:
+        deferred = await repository.get_one_by_id(user.id, defer=["avatar"])
+    assert stats.count == 1
+    assert deferred.password == "hash"
+
+
+@pytest.mark.anyio
+async def test_replica_row_is_not_cached(transactional_db: None, monkeypatch) -> None:
+    """
+    Test rows read from a replica are returned but not cached.
+    """
+    user = await User.objects.acreate(email="user@example.com")
+    repository = UserRepository()
+
+    async def get_from_replica(*args):
+        replica_user = await User.objects.aget(id=user.id)
+        replica_user._state.db = "replica"
+        return replica_user
+
+    monkeypatch.setattr(repository, "_get_one", get_from_replica)
+    assert (await repository.get_one_by_id(user.id)).id == user.id
+    assert await cache.aget(UserRepository.cache_params.build_key(pk=user.id)) is None
+
+
+@pytest.mark.anyio
+async def test_row_read_before_invalidation_is_not_served(transactional_db: None) -> None:
+    """
+    Test a row cached after a concurrent invalidation is ignored by later reads.
+    """
+    user = await User.objects.acreate(email="old@example.com")
+    params = UserRepository.cache_params
+
+    # a read misses and loads the old row, a write commits and invalidates before the read caches it
+    cached, version = await aget_cached(User, params, user.id)
+    assert cached is None
+    await ainvalidate(params, [user.id])
+    await aset_cached(params, user, version)
+
+    cached, new_version = await aget_cached(User, params, user.id)
+    assert cached is None
+    assert new_version != version
+
+    await aset_cached(params, user, new_version)
+    cached, _ = await aget_cached(User, params, user.id)
+    assert cached.email == "old@example.com"
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""Coalesced reads test."""
+import asyncio
+
+import pytest
+
+from src.users.models import User
+from src.users.repositories.user import UserRepository
+from utils.repositories.singleflight import SingleFlight, singleflight
+
+
+@pytest.mark.anyio
+async def test_identical_reads_share_one_query(transactional_db: None, assert_max_queries) -> None:
+    """
+    Test concurrent identical reads send one query and every caller gets its own instance.
+    """
+    user = await User.objects.acreate(email="user@example.com")
+    repository = UserRepository()
+    singleflight.reset_stats()
+
+    with assert_max_queries(1):
+        users = await asyncio.gather(*(repository.get_one_by_id(user.id, use_cache=False) for _ in range(5)))
+
+    assert {item.id for item in users} == {user.id}
+    assert len({id(item) for item in users}) == 5
+    assert singleflight.stats()["users.User"] == {"calls": 5, "executed": 1, "coalesced": 4}
+
+
+@pytest.mark.anyio
+async def test_different_reads_do_not_share(transactional_db: None, assert_max_queries) -> None:
+    """
+    Test reads with different filters or projections run their own queries.
+    """
+    first, second = await User.objects.abulk_create([User(email="first@example.com"), User(email="second@example.com")])
+    repository = UserRepository()
+
+    with assert_max_queries(3):
+        users = await asyncio.gather(
+            repository.get_one_by_id(first.id, use_cache=False),
+            repository.get_one_by_id(second.id, use_cache=False),
+            repository.get_one_by_id(first.id, use_cache=False, only=["id", "email"]),
+        )
+
+    assert [item.id for item in users] == [first.id, second.id, first.id]
+    assert users[2].get_deferred_fields()
+
+
+@pytest.mark.anyio
+async def test_errors_and_cancellation() -> None:
+    """
+    Test an error reaches every caller and a cancelled caller does not cancel the query of the others.
+    """
+    flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def fail():
+        await release.wait()
+        raise RuntimeError("query failed")
+
+    callers = [asyncio.ensure_future(flight.do("label", "key", fail)) for _ in range(3)]
+    await asyncio.sleep(0)
+    callers[0].cancel()
+    release.set()
+    results = await asyncio.gather(*callers, return_exceptions=True)
+
+    assert isinstance(results[0], asyncio.CancelledError)
+    assert all(isinstance(result, RuntimeError) for result in results[1:])
+
+    async def succeed():
+        return "fresh"
+
+    # the failed query is forgotten, the next call runs again
+    assert await flight.do("label", "key", succeed) == "fresh"
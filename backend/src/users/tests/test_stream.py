@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""Streaming iteration test."""
+from typing import List
+
+import pytest
+
+from src.users.models import User
+from src.users.repositories.user import UserRepository
+
+
+@pytest.fixture
+async def users(transactional_db: None) -> List[User]:
+    """Seven users."""
+    return await User.objects.abulk_create([User(email=f"user{index}@example.com") for index in range(7)])
+
+
+@pytest.mark.anyio
+async def test_stream(users: List[User]) -> None:
+    """
+    Test streaming in chunks smaller than the table returns every row once, in order.
+    """
+    streamed = [user async for user in UserRepository().stream(chunk_size=2, order_by=["id"])]
+
+    assert [user.id for user in streamed] == sorted(user.id for user in users)
+
+
+@pytest.mark.anyio
+async def test_stream_filtered_values(users: List[User]) -> None:
+    """
+    Test streaming values() rows of a filtered query.
+    """
+    ids = sorted(user.id for user in users)[:3]
+    rows = [row async for row in UserRepository().stream(chunk_size=2, values=["id", "email"], id__in=ids)]
+
+    assert sorted(row["id"] for row in rows) == ids
+    assert all(set(row) == {"id", "email"} for row in rows)
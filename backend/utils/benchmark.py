@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""Helpers for the benchmark management commands."""
+import asyncio
+import statistics
+import time
+from typing import Awaitable, Callable, List
+
+
+class BenchmarkResult:
+    """Latencies of one benchmark run."""
+
+    def __init__(self, name: str, latencies: List[float], elapsed: float):
+        """Initialize result."""
+        self.name = name
+        self.latencies = sorted(latencies)
+        self.elapsed = elapsed
+
+    @property
+    def throughput(self) -> float:
+        """Calls per second."""
+        return len(self.latencies) / self.elapsed if self.elapsed else 0.0
+
+    def percentile(self, percent: float) -> float:
+        """Latency percentile in milliseconds."""
+        if not self.latencies:
+            return 0.0
+        index = min(len(self.latencies) - 1, int(len(self.latencies) * percent / 100))
+        return self.latencies[index] * 1000
+
+    def __str__(self) -> str:
+        """Return a one line report."""
+        mean = statistics.fmean(self.latencies) * 1000 if self.latencies else 0.0
+        return (
+            f"{self.name}: {len(self.latencies)} calls in {self.elapsed:.2f}s, "
+            f"{self.throughput:.1f} calls/s, mean {mean:.2f}ms, "
+            f"p50 {self.percentile(50):.2f}ms, p99 {self.percentile(99):.2f}ms"
+        )
+
+
+async def run_benchmark(
+    name: str,
+    func: Callable[[int], Awaitable],
+    total: int,
+    concurrency: int,
+) -> BenchmarkResult:
+    """Call ``func(index)`` ``total`` times with at most ``concurrency`` calls in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def call(index: int):
+        async with semaphore:
+            started = time.perf_counter()
+            await func(index)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(call(index) for index in range(total)))
+    return BenchmarkResult(name, latencies, time.perf_counter() - started)
@@ -0,0 +1,2 @@
+# -*- coding: utf-8 -*-
+"""PostgreSQL backend with a process wide connection pool."""
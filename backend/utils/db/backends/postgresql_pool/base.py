@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""PostgreSQL database wrapper that takes its connections from a pool."""
+from functools import partial
+
+from django.conf import settings
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.creation import DatabaseCreation
+from django.db.backends.postgresql.psycopg_any import IsolationLevel
+
+from utils.db.pool import close_pools, get_pool
+
+
+class PoolDatabaseCreation(DatabaseCreation):
+    """Test database creation that closes the pooled connections before dropping the database."""
+
+    def destroy_test_db(self, *args, **kwargs):
+        """Destroy the test database."""
+        close_pools()
+        return super().destroy_test_db(*args, **kwargs)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    PostgreSQL wrapper with pooled connections.
+
+    Opening a connection takes one from the pool, closing it returns it, so ``CONN_MAX_AGE = 0``
+    gives every thread a connection just for the duration of a call without a new handshake.
+    Pool options are read from ``OPTIONS["pool"]``, ``DATABASE_POOL_ENABLED = False`` turns the pool off.
+    """
+
+    creation_class = PoolDatabaseCreation
+
+    def get_connection_params(self):
+        """Get connection params without the pool options."""
+        conn_params = super().get_connection_params()
+        conn_params.pop("pool", None)
+        return conn_params
+
+    def get_new_connection(self, conn_params):
+        """Take a connection from the pool."""
+        if not settings.DATABASE_POOL_ENABLED:
+            self._pool = None
+            return super().get_new_connection(conn_params)
+
+        options = self.settings_dict["OPTIONS"]
+        # normally set while connecting, the pooled connection might have been opened by another wrapper
+        self.isolation_level = IsolationLevel(options.get("isolation_level", IsolationLevel.READ_COMMITTED))
+        self._pool = get_pool(
+            self.alias,
+            conn_params,
+            partial(super().get_new_connection, conn_params),
+            options.get("pool"),
+        )
+        return self._pool.getconn()
+
+    def _close(self):
+        """Return the connection to the pool it was taken from."""
+        pool, self._pool = getattr(self, "_pool", None), None
+        if self.connection is None or pool is None:
+            return super()._close()
+
+        with self.wrap_database_errors:
+            pool.putconn(self.connection)
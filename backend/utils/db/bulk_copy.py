@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""Streaming bulk import and export with PostgreSQL ``COPY``."""
+import io
+import time
+from itertools import islice
+from typing import Callable, Iterator, List, Optional, TextIO, Tuple
+
+from django.db.backends.utils import CursorWrapper
+
+CSV = "csv"
+NDJSON = "ndjson"
+FORMATS = (CSV, NDJSON)
+
+# CSV with quote and delimiter characters that never occur in JSON text, so every line is copied verbatim
+NDJSON_COPY_OPTIONS = "FORMAT csv, QUOTE E'\\x01', DELIMITER E'\\x02'"
+CSV_COPY_OPTIONS = "FORMAT csv"
+
+
+class Progress:
+    """Row counter that reports every ``every`` rows and once at the end."""
+
+    def __init__(self, report: Callable[[str], None], every: int):
+        """Initialize progress."""
+        self.report = report
+        self.every = every
+        self.rows = 0
+        self.started = time.monotonic()
+        self._next = every
+
+    @property
+    def rate(self) -> float:
+        """Rows per second."""
+        return self.rows / max(time.monotonic() - self.started, 1e-9)
+
+    def add(self, rows: int, details: str = "") -> None:
+        """Count rows and report if the next step was reached."""
+        self.rows += rows
+        if self.every and self.rows >= self._next:
+            self._next = (self.rows // self.every + 1) * self.every
+            self.report(self.format(details))
+
+    def format(self, details: str = "") -> str:
+        """Format the current state."""
+        line = f"{self.rows} rows, {self.rate:.0f} rows/s"
+        return f"{line}, {details}" if details else line
+
+
+class _CountingWriter(io.TextIOBase):
+    """File wrapper that counts the lines written by ``COPY TO``."""
+
+    def __init__(self, file: TextIO, progress: Progress, skip: int = 0):
+        """Initialize writer, the first ``skip`` lines (a header) are not counted."""
+        self.file = file
+        self.progress = progress
+        self.skip = skip
+
+    def write(self, data: str) -> int:
+        """Write a chunk and count its lines."""
+        lines = data.count("\n")
+        skipped = min(lines, self.skip)
+        self.skip -= skipped
+        self.progress.add(lines - skipped)
+        return self.file.write(data)
+
+
+def copy_to(cursor: CursorWrapper, query: str, file: TextIO, fmt: str, progress: Optional[Progress] = None) -> None:
+    """
+    Stream the rows of a query into a file.
+
+    CSV gets a header line, NDJSON one JSON object per row. The rows are written in chunks as they
+    arrive, so memory use does not grow with the number of rows.
+    """
+    if fmt == NDJSON:
+        sql = f"COPY (SELECT row_to_json(t) FROM ({query}) t) TO STDOUT WITH ({NDJSON_COPY_OPTIONS})"
+    else:
+        sql = f"COPY ({query}) TO STDOUT WITH ({CSV_COPY_OPTIONS}, HEADER true)"
+
+    if progress is not None:
+        file = _CountingWriter(file, progress, skip=1 if fmt == CSV else 0)
+    cursor.copy_expert(sql, file)
+
+
+def copy_from(cursor: CursorWrapper, table: str, columns: List[str], file: TextIO, fmt: str) -> None:
+    """Load a CSV (without header) or NDJSON file into a table, NDJSON goes into a single ``jsonb`` column."""
+    options = NDJSON_COPY_OPTIONS if fmt == NDJSON else CSV_COPY_OPTIONS
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH ({options})", file)
+
+
+def iter_batches(file: TextIO, size: int) -> Iterator[Tuple[int, io.StringIO]]:
+    """
+    Split a file into batches of at most ``size`` lines, yields the number of lines and the batch.
+
+    Records are split on line breaks, so CSV values with embedded line breaks are not supported.
+    """
+    while True:
+        lines = list(islice(file, size))
+        if not lines:
+            return
+        yield len(lines), io.StringIO("".join(lines))
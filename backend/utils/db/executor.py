@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""Dedicated executor for sync database calls."""
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+
+class DatabaseExecutor:
+    """
+    Run sync ORM calls on a sized pool of database threads.
+
+    ``sync_to_async`` is thread sensitive by default, so every ORM call of the process
+    is queued onto one thread. This executor runs them concurrently instead, each worker
+    thread keeps its own persistent connection (see ``CONN_MAX_AGE``) or, with the connection pool,
+    returns it to the pool after every call.
+    With ``DATABASE_EXECUTOR_WORKERS = 0`` it falls back to thread sensitive ``sync_to_async``.
+    """
+
+    def __init__(self):
+        """Initialize executor. Threads are started on first use."""
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def max_workers(self) -> int:
+        """Configured number of database threads."""
+        return settings.DATABASE_EXECUTOR_WORKERS
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Get or create the thread pool."""
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="db")
+        return self._executor
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Run a sync function that touches the database."""
+        if not self.max_workers:
+            return await sync_to_async(func)(*args, **kwargs)
+
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, self._call, func, *args, **kwargs)
+        result = await asyncio.get_running_loop().run_in_executor(self._get_executor(), call)
+
+        # propagate context changes (e.g. primary pinning) back to the caller, like sync_to_async does
+        for var, value in context.items():
+            if var.get(None) is not value:
+                var.set(value)
+
+        return result
+
+    @staticmethod
+    def _call(func: Callable, *args, **kwargs) -> Any:
+        """Drop broken or expired connections of this thread around the call."""
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    def shutdown(self) -> None:
+        """Stop database threads."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+db_executor = DatabaseExecutor()
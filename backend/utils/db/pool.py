@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+"""Process wide pool of database connections."""
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from loguru import logger
+from psycopg2 import OperationalError
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+
+class PoolTimeout(OperationalError):
+    """No connection became available within the acquire timeout."""
+
+
+@dataclass
+class PoolOptions:
+    """Pool options, set in ``DATABASES[alias]["OPTIONS"]["pool"]``."""
+
+    min_size: int = 2  # connections opened up front and kept open when idle
+    max_size: int = 20  # connections open at most, callers wait for a free one beyond that
+    max_lifetime: float = 1800.0  # seconds after which a connection is replaced
+    max_idle: float = 600.0  # seconds after which an idle connection above ``min_size`` is closed
+    acquire_timeout: float = 10.0  # seconds to wait for a free connection
+    check_interval: float = 30.0  # seconds of idleness after which a connection is checked before use
+
+
+@dataclass
+class PoolStats:
+    """Pool counters."""
+
+    acquired: int = 0
+    released: int = 0
+    opened: int = 0
+    closed: int = 0
+    failed_checks: int = 0
+    timeouts: int = 0
+    waits: int = 0
+    wait_time: float = 0.0
+    max_wait_time: float = 0.0
+
+
+class _PooledConnection:
+    """A raw connection with its timestamps."""
+
+    __slots__ = ("connection", "created_at", "released_at")
+
+    def __init__(self, connection: Any):
+        """Initialize pooled connection."""
+        self.connection = connection
+        self.created_at = time.monotonic()
+        self.released_at = self.created_at
+
+
+class ConnectionPool:
+    """
+    A bounded pool of raw psycopg2 connections shared by all threads of the process.
+
+    Connections are replaced after ``max_lifetime``, checked with ``SELECT 1`` when they were idle
+    for longer than ``check_interval`` and rolled back when they are returned inside a transaction.
+    """
+
+    def __init__(self, connect: Callable[[], Any], options: PoolOptions):
+        """Initialize pool. Connections are opened on first use."""
+        self._connect = connect
+        self.options = options
+        self.stats = PoolStats()
+        self._idle: Deque[_PooledConnection] = deque()
+        self._in_use: Dict[int, _PooledConnection] = {}
+        self._size = 0
+        self._condition = threading.Condition()
+        self._filled = False
+        self._filling = False
+
+    @property
+    def size(self) -> int:
+        """Number of open connections."""
+        return self._size
+
+    def getconn(self) -> Any:
+        """Take a connection, open a new one or wait for a free one."""
+        started = time.monotonic()
+        deadline = started + self.options.acquire_timeout
+        self._fill()
+
+        while True:
+            with self._condition:
+                item = None
+                while item is None:
+                    if self._idle:
+                        item = self._idle.pop()
+                    elif self._size < self.options.max_size:
+                        self._size += 1
+                        break
+                    else:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.stats.timeouts += 1
+                            raise PoolTimeout(
+                                f"No database connection available within {self.options.acquire_timeout}s "
+                                f"({self._size} of {self.options.max_size} in use)"
+                            )
+                        self.stats.waits += 1
+                        self._condition.wait(remaining)
+
+            if item is None:
+                item = self._open()
+            elif not self._is_usable(item):
+                self._discard(item)
+                continue
+
+            waited = time.monotonic() - started
+            with self._condition:
+                self._in_use[id(item.connection)] = item
+                self.stats.acquired += 1
+                self.stats.wait_time += waited
+                self.stats.max_wait_time = max(self.stats.max_wait_time, waited)
+            return item.connection
+
+    def putconn(self, connection: Any) -> None:
+        """Return a connection, broken or expired ones are closed."""
+        with self._condition:
+            item = self._in_use.pop(id(connection), None)
+            self.stats.released += 1
+        if item is None:
+            # opened before a fork or by another pool
+            connection.close()
+            return
+
+        if not connection.closed and connection.info.transaction_status != TRANSACTION_STATUS_IDLE:
+            try:
+                connection.rollback()
+            except Exception:
+                pass
+
+        if connection.closed or connection.info.transaction_status != TRANSACTION_STATUS_IDLE or self._expired(item):
+            self._discard(item)
+            return
+
+        item.released_at = time.monotonic()
+        with self._condition:
+            self._idle.append(item)
+            self._shrink()
+            self._condition.notify()
+
+    def close(self) -> None:
+        """Close the idle connections, connections in use are closed when they are returned."""
+        with self._condition:
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle) + len(self._in_use)
+            self._in_use.clear()
+            self._filled = False
+        for item in idle:
+            self._close(item)
+
+    def _fill(self) -> None:
+        """Open ``min_size`` connections on first use, retried on the next use if one could not be opened."""
+        if self._filled:
+            return
+        with self._condition:
+            if self._filled or self._filling:
+                return
+            self._filling = True
+            missing = max(0, self.options.min_size - self._size)
+            self._size += missing
+
+        failed = False
+        try:
+            for _ in range(missing):
+                try:
+                    item = self._open()
+                except Exception as e:
+                    logger.warning(f"Could not open a pooled database connection: {e}")
+                    failed = True
+                    continue
+                with self._condition:
+                    self._idle.append(item)
+                    self._condition.notify()
+        finally:
+            with self._condition:
+                self._filling = False
+                self._filled = not failed
+
+    def _open(self) -> _PooledConnection:
+        """Open a connection, the slot must be reserved already."""
+        try:
+            connection = self._connect()
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+        self.stats.opened += 1
+        return _PooledConnection(connection)
+
+    def _discard(self, item: _PooledConnection) -> None:
+        """Close a connection and free its slot."""
+        self._close(item)
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+
+    def _close(self, item: _PooledConnection) -> None:
+        """Close a connection."""
+        self.stats.closed += 1
+        try:
+            item.connection.close()
+        except Exception:
+            pass
+
+    def _shrink(self) -> None:
+        """Close connections idle for longer than ``max_idle`` above ``min_size``, the lock must be held."""
+        now = time.monotonic()
+        while self._size > self.options.min_size and self._idle:
+            oldest = self._idle[0]
+            if now - oldest.released_at < self.options.max_idle:
+                break
+            self._idle.popleft()
+            self._size -= 1
+            self._close(oldest)
+
+    def _expired(self, item: _PooledConnection) -> bool:
+        """Check if a connection outlived ``max_lifetime``."""
+        return time.monotonic() - item.created_at >= self.options.max_lifetime
+
+    def _is_usable(self, item: _PooledConnection) -> bool:
+        """Health check of an idle connection."""
+        if item.connection.closed or self._expired(item):
+            return False
+        if time.monotonic() - item.released_at < self.options.check_interval:
+            return True
+        try:
+            with item.connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            return True
+        except Exception:
+            self.stats.failed_checks += 1
+            return False
+
+
+_pools: Dict[Tuple[str, str], ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(
+    alias: str,
+    conn_params: dict,
+    connect: Callable[[], Any],
+    options: Optional[dict] = None,
+) -> ConnectionPool:
+    """Get the pool of a database alias and its connection parameters, created on first use."""
+    key = (alias, repr(sorted(conn_params.items())))
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = ConnectionPool(connect, PoolOptions(**(options or {})))
+    return pool
+
+
+def get_pool_stats() -> Dict[str, dict]:
+    """Get counters and sizes of every pool of the process."""
+    return {
+        alias: {**asdict(pool.stats), "size": pool.size, "max_size": pool.options.max_size}
+        for (alias, _), pool in _pools.items()
+    }
+
+
+def close_pools() -> None:
+    """Close the idle connections of every pool."""
+    for pool in list(_pools.values()):
+        pool.close()
+
+
+def _reset_after_fork() -> None:
+    """
+    Forget the pools of the parent process in a forked child (gunicorn and celery workers).
+
+    The inherited sockets belong to the parent, so they are dropped without being closed.
+    """
+    global _pools_lock
+    _pools.clear()
+    _pools_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
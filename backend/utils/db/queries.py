@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""Per-request SQL query statistics and the slow query log."""
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from django.db.backends.base.base import BaseDatabaseWrapper
+
+from utils.db.slow_queries import is_slow, log_slow_query
+
+# statistics collecting the queries of the current context, a request and any number of test captures
+_active_stats: ContextVar[Tuple["QueryStats", ...]] = ContextVar("query_stats", default=())
+# repository method that issues the queries, e.g. ``UserRepository.get_one_by_id``
+_repository_call: ContextVar[Optional[str]] = ContextVar("repository_call", default=None)
+
+_IN_LIST = re.compile(r"\((?:%s, )+%s\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def get_query_shape(sql: str) -> str:
+    """Get the shape of a query, parameter lists of any length collapse into one."""
+    return _WHITESPACE.sub(" ", _IN_LIST.sub("(%s, ...)", sql)).strip()
+
+
+class QueryStats:
+    """
+    Number, time and shapes of the queries executed in a context.
+
+    A prepared lookup counts as one query, its ``PREPARE`` is only counted in ``prepares``
+    and its time is added to the total.
+    """
+
+    def __init__(self):
+        """Initialize statistics."""
+        self.count = 0
+        self.prepares = 0
+        self.duration = 0.0
+        self.shapes: Counter = Counter()
+        self.sources: Dict[str, str] = {}
+        # ORM calls of one request may run on several database threads at once
+        self._lock = threading.Lock()
+
+    def record(self, sql: str, duration: float, source: Optional[str] = None) -> None:
+        """Record an executed query."""
+        if sql.startswith("PREPARE "):
+            with self._lock:
+                self.prepares += 1
+                self.duration += duration
+            return
+
+        shape = get_query_shape(sql)
+        with self._lock:
+            self.count += 1
+            self.duration += duration
+            self.shapes[shape] += 1
+            if source:
+                self.sources.setdefault(shape, source)
+
+    @property
+    def duration_ms(self) -> float:
+        """Total database time in milliseconds."""
+        return round(self.duration * 1000, 2)
+
+    @property
+    def duplicates(self) -> List[Tuple[str, int]]:
+        """Query shapes executed more than once, a likely N+1."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > 1]
+
+    def describe_duplicates(self) -> List[str]:
+        """Describe the duplicated shapes with the repository call that issued them."""
+        return [
+            f"{count}x {self.sources.get(shape, 'unknown')}: {shape}"
+            for shape, count in self.duplicates
+        ]
+
+
+def execute_wrapper(execute: Callable, sql: str, params: Any, many: bool, context: Dict[str, Any]) -> Any:
+    """Record the queries of the connection into the active statistics and the slow query log."""
+    stats = _active_stats.get()
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - start
+        source = _repository_call.get()
+        for item in stats:
+            item.record(sql, duration, source)
+        # plans of the slow query log are slow queries themselves
+        if is_slow(duration) and not sql.lstrip().upper().startswith("EXPLAIN"):
+            log_slow_query(context["connection"].alias, sql, params, many, duration, source)
+
+
+def install_execute_wrapper(sender, connection: BaseDatabaseWrapper, **kwargs) -> None:
+    """Add the statistics wrapper to a new connection, connected to ``connection_created``."""
+    if execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(execute_wrapper)
+
+
+@contextmanager
+def capture_queries() -> Iterator[QueryStats]:
+    """Collect the queries executed inside the block."""
+    stats = QueryStats()
+    token = _active_stats.set(_active_stats.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _active_stats.reset(token)
+
+
+@contextmanager
+def repository_call(name: str) -> Iterator[None]:
+    """Attribute the queries of the block to a repository method, the outermost call wins."""
+    if _repository_call.get() is not None:
+        yield
+        return
+
+    token = _repository_call.set(name)
+    try:
+        yield
+    finally:
+        _repository_call.reset(token)
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""Database routers."""
+import random
+import time
+from contextvars import ContextVar
+from typing import List, Optional
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# monotonic time until which the current request reads from the primary
+_primary_pinned_until: ContextVar[float] = ContextVar("primary_pinned_until", default=0.0)
+
+
+def pin_primary(seconds: Optional[float] = None) -> None:
+    """
+    Send reads of the current context to the primary for a while.
+
+    Called on every write, so a request reads its own writes instead of a lagging replica.
+    """
+    seconds = settings.DATABASE_REPLICA_PIN_SECONDS if seconds is None else seconds
+    _primary_pinned_until.set(time.monotonic() + seconds)
+
+
+def is_primary_pinned() -> bool:
+    """Check if reads of the current context are pinned to the primary."""
+    return _primary_pinned_until.get() > time.monotonic()
+
+
+class PrimaryReplicaRouter:
+    """
+    Route reads to the replicas and writes to the primary.
+
+    Every alias in ``DATABASES`` besides ``default`` is treated as a replica.
+    """
+
+    def __init__(self):
+        """Initialize router."""
+        self.replicas: List[str] = [alias for alias in settings.DATABASES if alias != DEFAULT_DB_ALIAS]
+
+    def db_for_read(self, model, **hints) -> str:
+        """Pick a random replica unless the context has written recently."""
+        if not self.replicas or is_primary_pinned():
+            return DEFAULT_DB_ALIAS
+        return random.choice(self.replicas)
+
+    def db_for_write(self, model, **hints) -> str:
+        """Write to the primary and pin the following reads to it."""
+        pin_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints) -> bool:
+        """All databases hold the same data."""
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints) -> bool:
+        """Migrate only the primary, replicas follow it."""
+        return db == DEFAULT_DB_ALIAS
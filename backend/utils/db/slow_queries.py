@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""Slow query log with sampled EXPLAIN plans."""
+import random
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+
+from django.conf import settings
+from django.db import connections
+from loguru import logger
+
+from utils.logger.request_id import get_request_id
+
+# plans waiting for the explain thread, slow queries beyond it are logged without a plan
+MAX_PENDING_EXPLAINS = 10
+
+_explain_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="explain")
+_explain_slots = threading.BoundedSemaphore(MAX_PENDING_EXPLAINS)
+# connection of the explain thread, never shared with the request threads
+_explain_connection = None
+
+# quoted literals of a plan, the client interpolates the parameters into the statement
+_PLAN_LITERAL = re.compile(r"'(?:[^']|'')*'")
+
+
+def is_slow(duration: float) -> bool:
+    """Check if a query took longer than ``SLOW_QUERY_THRESHOLD_MS``."""
+    threshold = settings.SLOW_QUERY_THRESHOLD_MS
+    return bool(threshold) and duration * 1000 >= threshold
+
+
+def log_slow_query(alias: str, sql: str, params: Any, many: bool, duration: float, source: Optional[str]) -> None:
+    """Log a slow query and maybe schedule its plan."""
+    request_id = get_request_id()
+    duration_ms = round(duration * 1000, 2)
+    logger.bind(
+        slow_query=True,
+        request_id=request_id,
+        repository=source,
+        duration_ms=duration_ms,
+        sql=sql,
+        params=repr(redact_params(params)),
+    ).warning(f"Slow query {duration_ms} ms in {source or 'unknown'}: {sql}")
+
+    if not many and _should_explain(sql) and _explain_slots.acquire(blocking=False):
+        _explain_executor.submit(_explain, alias, sql, params, source, request_id)
+
+
+def redact_params(params: Any) -> Any:
+    """Hide text and binary parameters, e.g. password hashes and tokens, keep numbers and dates for debugging."""
+    if isinstance(params, dict):
+        return {key: redact_params(value) for key, value in params.items()}
+    if isinstance(params, (list, tuple)):
+        return [redact_params(value) for value in params]
+    if isinstance(params, (str, bytes, bytearray, memoryview)):
+        return "<redacted>"
+    return params
+
+
+def _should_explain(sql: str) -> bool:
+    """Sample plain reads only, ``ANALYZE`` executes the statement."""
+    rate = settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE
+    statement = sql.lstrip().upper()
+    return (
+        rate > 0
+        and statement.startswith("SELECT")
+        and " FOR UPDATE" not in statement
+        and random.random() < rate
+    )
+
+
+def _explain(alias: str, sql: str, params: Any, source: Optional[str], request_id: Optional[str]) -> None:
+    """Run ``EXPLAIN (ANALYZE, BUFFERS)`` of a query and log the plan."""
+    global _explain_connection
+
+    try:
+        if _explain_connection is not None and (
+            _explain_connection.alias != alias
+            or (_explain_connection.connection is not None and not _explain_connection.is_usable())
+        ):
+            _close_explain_connection()
+        if _explain_connection is None:
+            _explain_connection = connections.create_connection(alias)
+
+        with _explain_connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {sql}", params)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+        # honor CONN_MAX_AGE, pooled connections go back to the pool
+        _explain_connection.close_if_unusable_or_obsolete()
+    except Exception as e:
+        # start over with a fresh connection next time
+        _close_explain_connection()
+        logger.bind(slow_query=True, request_id=request_id, repository=source).warning(f"EXPLAIN failed: {e}")
+        return
+    finally:
+        _explain_slots.release()
+
+    plan = _PLAN_LITERAL.sub("'<redacted>'", plan)
+    logger.bind(slow_query=True, request_id=request_id, repository=source, sql=sql, plan=plan).info(
+        f"Plan of a slow query in {source or 'unknown'}:\n{plan}"
+    )
+
+
+def _close_explain_connection() -> None:
+    """Close the connection of the explain thread, on that thread."""
+    global _explain_connection
+
+    if _explain_connection is not None:
+        try:
+            _explain_connection.close()
+        except Exception as e:
+            logger.warning(f"Closing the EXPLAIN connection failed: {e}")
+        _explain_connection = None
+
+
+def close_explain_connection() -> None:
+    """Close the connection of the explain thread once the pending plans are done, e.g. on shutdown."""
+    _explain_executor.submit(_close_explain_connection).result()
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""Unit of work, the writes of a service call committed in one transaction."""
+import inspect
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Callable, List, Optional, Tuple
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from loguru import logger
+
+from utils.db.executor import db_executor
+
+# (write, callback run after the commit)
+Write = Tuple[Callable[[], Any], Optional[Callable[[], Any]]]
+
+_current: ContextVar[Optional["UnitOfWork"]] = ContextVar("unit_of_work", default=None)
+
+
+class UnitOfWork:
+    """
+    Writes collected by the repositories while the unit of work is active.
+
+    They are sent in one database call inside one transaction when the unit of work ends,
+    instead of one call, connection checkout and commit per write.
+    """
+
+    def __init__(self, using: str = DEFAULT_DB_ALIAS):
+        """Initialize unit of work."""
+        self.using = using
+        self._writes: List[Write] = []
+
+    def __len__(self) -> int:
+        """Number of pending writes."""
+        return len(self._writes)
+
+    def add(self, write: Callable[[], Any], after: Optional[Callable[[], Any]] = None) -> None:
+        """Defer a sync write, ``after`` (sync or async) runs once it is committed."""
+        self._writes.append((write, after))
+
+    async def run(self, write: Callable[[], Any], after: Optional[Callable[[], Any]] = None) -> Any:
+        """
+        Run a write whose result is needed right away.
+
+        The pending writes are committed together with it, writes added later go into another transaction:
+        if the block fails after this call, the writes committed here stay. Run such writes first.
+        """
+        if self._writes:
+            logger.warning(
+                f"Unit of work commits {len(self._writes)} pending writes early, "
+                "the writes after them are no longer atomic with them"
+            )
+        self.add(write, after)
+        results = await self.flush()
+        return results[-1]
+
+    async def flush(self) -> List[Any]:
+        """Commit the pending writes, returns their results."""
+        if not self._writes:
+            return []
+
+        writes, self._writes = self._writes, []
+        results = await db_executor.run(self._commit, [write for write, _ in writes])
+
+        for _, after in writes:
+            if after is not None:
+                result = after()
+                if inspect.isawaitable(result):
+                    await result
+        return results
+
+    def _commit(self, writes: List[Callable[[], Any]]) -> List[Any]:
+        """Run the writes in one transaction on one connection."""
+        with transaction.atomic(using=self.using):
+            return [write() for write in writes]
+
+
+def get_unit_of_work() -> Optional[UnitOfWork]:
+    """Get the active unit of work of the context."""
+    return _current.get()
+
+
+@asynccontextmanager
+async def unit_of_work(using: str = DEFAULT_DB_ALIAS) -> AsyncIterator[UnitOfWork]:
+    """
+    Collect the repository writes of the block and commit them in one transaction at its end.
+
+    Reads inside the block do not see the deferred writes, so read first and write after.
+    If the block raises, nothing is written, except the writes committed by an earlier ``UnitOfWork.run``.
+    A nested unit of work joins the outer one.
+    """
+    current = _current.get()
+    if current is not None:
+        yield current
+        return
+
+    uow = UnitOfWork(using)
+    token = _current.set(uow)
+    try:
+        yield uow
+    finally:
+        _current.reset(token)
+    await uow.flush()
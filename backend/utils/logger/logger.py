@@ -81,6 +81,17 @@ class CustomizeLogger:
             level=level.upper(),
             format=format,
         )
+        if settings.SLOW_QUERY_THRESHOLD_MS:
+            # slow queries and their plans, one JSON record per line
+            logger.add(
+                settings.SLOW_QUERY_LOG_FILE,
+                enqueue=True,
+                level=logging.INFO,
+                rotation=settings.SLOW_QUERY_LOG_ROTATION,
+                retention=settings.SLOW_QUERY_LOG_RETENTION,
+                serialize=True,
+                filter=lambda record: record["extra"].get("slow_query", False),
+            )
         logging.getLogger("uvicorn.server").handlers.clear()
         logging.basicConfig(handlers=[InterceptHandler()], level=0)
         logging.getLogger("uvicorn.access").handlers = [InterceptHandler()]
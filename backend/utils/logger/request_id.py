@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+"""Request id of the current context."""
+from contextvars import ContextVar
+from typing import Optional
+
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+
+def get_request_id() -> Optional[str]:
+    """Get the id of the current request, ``None`` outside of a request."""
+    return _request_id.get()
+
+
+def set_request_id(request_id: Optional[str]):
+    """Set the id of the current request, returns the token to reset it."""
+    return _request_id.set(request_id)
+
+
+def reset_request_id(token) -> None:
+    """Restore the previous request id."""
+    _request_id.reset(token)
@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+"""ASGI middlewares."""
+from .authentication import AuthenticationMiddleware
+from .loaders import RepositoryLoaderMiddleware
+from .queries import QueryStatsMiddleware
+from .request_id import RequestIdMiddleware
+
+__all__ = ["AuthenticationMiddleware", "QueryStatsMiddleware", "RepositoryLoaderMiddleware", "RequestIdMiddleware"]
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+"""Authentication middleware."""
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from utils.security.authentication import SCOPE_KEY, RequestAuthentication
+
+
+class AuthenticationMiddleware:
+    """
+    Give every request a lazy ``RequestAuthentication`` as ``request.auth``.
+
+    The security dependencies read the credentials and the verified payload from it,
+    so the token is parsed and verified once per request however many dependencies need it.
+    """
+
+    def __init__(self, app: ASGIApp):
+        """Initialize middleware."""
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Attach the request authentication."""
+        if scope["type"] in ("http", "websocket"):
+            scope[SCOPE_KEY] = RequestAuthentication(scope)
+        await self.app(scope, receive, send)
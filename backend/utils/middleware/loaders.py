@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+"""Repository loader middleware."""
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from utils.repositories.loader import activate_loaders, deactivate_loaders
+
+
+class RepositoryLoaderMiddleware:
+    """Give every request its own repository loaders, so batched lookups never leak between requests."""
+
+    def __init__(self, app: ASGIApp):
+        """Initialize middleware."""
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Run the request inside a loader scope."""
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        token = activate_loaders()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            deactivate_loaders(token)
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""Query statistics middleware."""
+from django.conf import settings
+from loguru import logger
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from utils.db.queries import capture_queries
+from utils.logger.request_id import get_request_id
+
+
+class QueryStatsMiddleware:
+    """
+    Count the SQL queries, the database time and the duplicated query shapes of every request.
+
+    In debug mode the numbers are sent as ``X-DB-*`` response headers,
+    otherwise they are logged as fields of one record per request.
+    """
+
+    def __init__(self, app: ASGIApp):
+        """Initialize middleware."""
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Run the request and report its queries."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with capture_queries() as stats:
+
+            async def send_with_stats(message: Message) -> None:
+                if message["type"] == "http.response.start" and settings.DEBUG:
+                    headers = MutableHeaders(scope=message)
+                    headers["X-DB-Query-Count"] = str(stats.count)
+                    headers["X-DB-Query-Time-Ms"] = str(stats.duration_ms)
+                    headers["X-DB-Duplicate-Queries"] = str(sum(count - 1 for _, count in stats.duplicates))
+                await send(message)
+
+            await self.app(scope, receive, send_with_stats)
+
+        if stats.duplicates and settings.DEBUG:
+            logger.warning(f"Duplicate queries in {scope['method']} {scope['path']}: {stats.describe_duplicates()}")
+        elif not settings.DEBUG:
+            logger.bind(
+                request_id=get_request_id(),
+                method=scope["method"],
+                path=scope["path"],
+                db_queries=stats.count,
+                db_time_ms=stats.duration_ms,
+                db_duplicates=stats.describe_duplicates(),
+            ).info("Request database usage")
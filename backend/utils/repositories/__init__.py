@@ -1,5 +1,8 @@
 # -*- coding: utf-8 -*-
 """Base repository module."""
 from .base import BaseRepository
+from .counts import TotalCount
+from .enums import CountStrategy
+from .prepared import PreparedQuery
 
-__all__ = ["BaseRepository"]
+__all__ = ["BaseRepository", "CountStrategy", "PreparedQuery", "TotalCount"]
@@ -1,13 +1,59 @@
 # -*- coding: utf-8 -*-
 """Base repository module for defining abstract repository interfaces."""
+import functools
+import inspect
 from abc import ABC
-from typing import Any, List, Optional, Tuple, Type, final
+from typing import (TYPE_CHECKING, Any, AsyncIterator, Callable, Dict,
+                    Hashable, List, Optional, Tuple, Type, final)
 
-from asgiref.sync import sync_to_async
-from django.db.models import Model
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist
+from django.db import (DEFAULT_DB_ALIAS, DatabaseError, connections, router,
+                       transaction)
+from django.db.models import Count, Model, Q, QuerySet, Subquery, Window
+from django.db.models.deletion import Collector
+from django.db.models.sql import DeleteQuery
+from loguru import logger
 
+from utils.db.executor import db_executor
+from utils.db.queries import repository_call
+from utils.db.routers import is_primary_pinned
+from utils.db.unit_of_work import get_unit_of_work
+from utils.repositories.cache import (aget_cached, ainvalidate, aset_cached,
+                                      connect_invalidation, is_cache_enabled)
+from utils.repositories.counts import (TotalCount, estimate_count,
+                                       get_count_cache_key)
+from utils.repositories.cursor import (CURSOR_NEXT, CURSOR_PREVIOUS,
+                                       build_seek_filter, decode_cursor,
+                                       encode_cursor, get_keyset_ordering,
+                                       reverse_ordering)
+from utils.repositories.enums import CountStrategy
+from utils.repositories.loader import forget_loaded, get_loader
+from utils.repositories.prepared import (PreparedQuery, execute_prepared,
+                                         from_rows, get_statement_name,
+                                         prepared_statements_enabled)
+from utils.repositories.singleflight import singleflight
 from utils.responses.http.api import NotFoundException
 
+if TYPE_CHECKING:
+    from src.core.schemas.caches import ServiceCacheParams
+
+# SQLSTATE of a scalar subquery that returned more than one row
+CARDINALITY_VIOLATION = "21000"
+
+
+def _track_queries(name: str, method: Callable) -> Callable:
+    """Attribute the queries of a repository method to it, e.g. ``UserRepository.get_one``."""
+
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        with repository_call(f"{type(self).__name__}.{name}"):
+            return await method(self, *args, **kwargs)
+
+    wrapper._tracks_queries = True
+    return wrapper
+
 
 class BaseRepository(ABC):
     """
@@ -15,21 +61,61 @@ class BaseRepository(ABC):
     """
 
     model: Type[Model]
+    count_strategy: CountStrategy = CountStrategy.WINDOW
+    # estimated row count above which ``CountStrategy.ESTIMATED`` stops counting, ``None`` - from settings
+    estimated_count_threshold: Optional[int] = None
+    fast_delete: bool = True
+    # reads go to the replicas when they are configured, disable for data that must be read right after a write
+    read_from_replicas: bool = True
+    # batch primary key lookups made in the same request tick into one query
+    batch_loads: bool = True
+    # share one in-flight query between identical concurrent ``get_one`` calls
+    coalesce_reads: bool = False
+    # cache of primary key lookups, the namespace is formatted with ``pk``; requires a class level ``model``
+    cache_params: Optional["ServiceCacheParams"] = None
+    # fields left out of the repository cache, they are deferred on cached objects
+    cache_exclude_fields: Tuple[str, ...] = ()
+    # hot single row lookups run as server side prepared statements, ``get_one`` uses them when the filters match
+    prepared_queries: Dict[str, PreparedQuery] = {}
+
+    _window_count_alias = "_window_total_count"
+
+    def __init_subclass__(cls, **kwargs):
+        """
+        Set up a concrete repository.
+
+        Public coroutine methods attribute their queries to the repository for the query statistics,
+        the repository cache is invalidated on every save and delete of the model.
+        """
+        super().__init_subclass__(**kwargs)
+        for name in dir(cls):
+            method = inspect.getattr_static(cls, name)
+            if not name.startswith("_") and inspect.iscoroutinefunction(method):
+                if not getattr(method, "_tracks_queries", False):
+                    setattr(cls, name, _track_queries(name, method))
+
+        if cls.__dict__.get("cache_params") is not None:
+            connect_invalidation(cls.model, cls.cache_params)
 
     @final
-    async def get_all(
+    def _get_queryset(
         self,
-        limit: Optional[int] = None,
-        offset: Optional[int] = None,
         select_related: Optional[List[str]] = None,
         prefetch_related: Optional[List[str]] = None,
         order_by: Optional[List[str]] = None,
+        only: Optional[List[str]] = None,
+        defer: Optional[List[str]] = None,
+        values: Optional[List[str]] = None,
         **kwargs,
-    ) -> List[Any]:
+    ) -> QuerySet:
         """
-        List all items.
+        Build a filtered queryset for read methods.
+
+        ``only`` and ``defer`` limit the loaded columns of model instances,
+        ``values`` returns dictionaries with just the given fields.
         """
-        qs = self.model.objects.filter(**kwargs)
+        manager = self.model.objects if self.read_from_replicas else self.model.objects.db_manager(DEFAULT_DB_ALIAS)
+        qs = manager.filter(**kwargs)
 
         if select_related:
             qs = qs.select_related(*select_related)
@@ -37,22 +123,269 @@ class BaseRepository(ABC):
             qs = qs.prefetch_related(*prefetch_related)
         if order_by:
             qs = qs.order_by(*order_by)
+        if only:
+            qs = qs.only(*only)
+        if defer:
+            qs = qs.defer(*defer)
+        if values:
+            qs = qs.values(*values)
+
+        return qs
+
+    @final
+    def _singleflight_key(
+        self,
+        select_related: Optional[List[str]],
+        prefetch_related: Optional[List[str]],
+        only: Optional[List[str]],
+        defer: Optional[List[str]],
+        values: Optional[List[str]],
+        filters: dict,
+    ) -> Optional[Hashable]:
+        """Get the key of a single row read, ``None`` if the filters can not be hashed."""
+        key = (
+            self.model._meta.label,
+            # pinned requests read from the primary and must not get a replica result
+            self.read_from_replicas and not is_primary_pinned(),
+            tuple(select_related or ()),
+            tuple(prefetch_related or ()),
+            tuple(only or ()),
+            tuple(defer or ()),
+            tuple(values or ()),
+            tuple(sorted(filters.items())),
+        )
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    @staticmethod
+    @final
+    def _slice_queryset(qs: QuerySet, limit: Optional[int] = None, offset: Optional[int] = None) -> QuerySet:
+        """
+        Apply limit and offset to the queryset.
+        """
         if limit and not offset:
             qs = qs[:limit]
         elif limit and offset:
             qs = qs[offset : offset + limit]
 
+        return qs
+
+    @final
+    async def get_all(
+        self,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        select_related: Optional[List[str]] = None,
+        prefetch_related: Optional[List[str]] = None,
+        order_by: Optional[List[str]] = None,
+        only: Optional[List[str]] = None,
+        defer: Optional[List[str]] = None,
+        values: Optional[List[str]] = None,
+        **kwargs,
+    ) -> List[Any]:
+        """
+        List all items.
+        """
+        qs = self._get_queryset(
+            select_related=select_related,
+            prefetch_related=prefetch_related,
+            order_by=order_by,
+            only=only,
+            defer=defer,
+            values=values,
+            **kwargs,
+        )
+        qs = self._slice_queryset(qs, limit=limit, offset=offset)
+
         return [item async for item in qs]
 
     @final
-    async def get_all_and_count(self, *args, **kwargs) -> Tuple[list, int]:
+    async def stream(
+        self,
+        chunk_size: int = 2000,
+        select_related: Optional[List[str]] = None,
+        order_by: Optional[List[str]] = None,
+        only: Optional[List[str]] = None,
+        defer: Optional[List[str]] = None,
+        values: Optional[List[str]] = None,
+        **kwargs,
+    ) -> AsyncIterator[Any]:
+        """
+        Iterate over all matching items without loading them into memory at once.
+
+        Rows are read in ``chunk_size`` batches from a Postgres server-side cursor,
+        so memory stays flat regardless of the table size.
+        Prefetching is not supported by server-side iteration.
+        """
+        qs = self._get_queryset(
+            select_related=select_related,
+            order_by=order_by,
+            only=only,
+            defer=defer,
+            values=values,
+            **kwargs,
+        )
+
+        async for item in qs.aiterator(chunk_size=chunk_size):
+            yield item
+
+    @final
+    async def get_all_by_cursor(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        select_related: Optional[List[str]] = None,
+        prefetch_related: Optional[List[str]] = None,
+        order_by: Optional[List[str]] = None,
+        only: Optional[List[str]] = None,
+        defer: Optional[List[str]] = None,
+        values: Optional[List[str]] = None,
+        **kwargs,
+    ) -> Tuple[List[Any], Optional[str], Optional[str]]:
         """
-        List all items and count.
+        List items with keyset pagination.
+
+        Seeks on the ordering columns (``order_by`` or ``Meta.ordering`` plus the primary key)
+        instead of skipping rows, so every page costs the same as the first one.
+        Returns items, next cursor and previous cursor. Projections must include the ordering fields.
         """
-        qs = self.model.objects.all()
-        items = [item async for item in qs]
-        total_count = await qs.acount()
-        return items, total_count
+        ordering = get_keyset_ordering(self.model, order_by)
+        qs = self._get_queryset(
+            select_related=select_related,
+            prefetch_related=prefetch_related,
+            only=only,
+            defer=defer,
+            values=values,
+            **kwargs,
+        )
+
+        direction = CURSOR_NEXT
+        if cursor:
+            direction, cursor_values = decode_cursor(self.model, cursor, ordering)
+            qs = qs.filter(build_seek_filter(ordering, cursor_values, reverse=direction == CURSOR_PREVIOUS))
+
+        backwards = direction == CURSOR_PREVIOUS
+        qs = qs.order_by(*(reverse_ordering(ordering) if backwards else ordering))
+
+        # fetch one extra row to know if there is one more page in this direction
+        items = [item async for item in qs[: limit + 1]]
+        has_more = len(items) > limit
+        items = items[:limit]
+
+        if backwards:
+            items.reverse()
+
+        next_cursor, previous_cursor = None, None
+        if items:
+            if has_more or backwards:
+                next_cursor = encode_cursor(items[-1], ordering, CURSOR_NEXT)
+            if (has_more and backwards) or (cursor and not backwards):
+                previous_cursor = encode_cursor(items[0], ordering, CURSOR_PREVIOUS)
+
+        return items, next_cursor, previous_cursor
+
+    @final
+    async def get_all_and_count(
+        self,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        select_related: Optional[List[str]] = None,
+        prefetch_related: Optional[List[str]] = None,
+        order_by: Optional[List[str]] = None,
+        count_strategy: Optional[CountStrategy] = None,
+        only: Optional[List[str]] = None,
+        defer: Optional[List[str]] = None,
+        values: Optional[List[str]] = None,
+        **kwargs,
+    ) -> Tuple[List[Any], TotalCount]:
+        """
+        List items and count all items matching the filters.
+
+        With the window strategy the page and the total come from one query
+        (``COUNT(*) OVER ()``), the separate strategy runs a second ``COUNT(*)``,
+        the estimated strategy may return a planner estimate (``total_count.exact`` is ``False``).
+        """
+        qs = self._get_queryset(
+            select_related=select_related,
+            prefetch_related=prefetch_related,
+            order_by=order_by,
+            only=only,
+            defer=defer,
+            values=values,
+            **kwargs,
+        )
+        count_strategy = count_strategy or self.count_strategy
+
+        if count_strategy == CountStrategy.SEPARATE:
+            items = [item async for item in self._slice_queryset(qs, limit=limit, offset=offset)]
+            return items, TotalCount(await qs.acount())
+
+        if count_strategy == CountStrategy.ESTIMATED:
+            items = [item async for item in self._slice_queryset(qs, limit=limit, offset=offset)]
+            return items, await self._estimated_total_count(qs, len(items), limit, offset)
+
+        window_qs = qs.annotate(**{self._window_count_alias: Window(expression=Count("*"))})
+        items = [item async for item in self._slice_queryset(window_qs, limit=limit, offset=offset)]
+
+        if items:
+            # every row carries the same total, drop the helper column from the results
+            rows = items if values else [item.__dict__ for item in items]
+            total_count = rows[0][self._window_count_alias]
+            for row in rows:
+                del row[self._window_count_alias]
+        elif offset:
+            # the page is past the end, so the window did not return any row to read the total from
+            total_count = await qs.acount()
+        else:
+            total_count = 0
+
+        return items, TotalCount(total_count)
+
+    @final
+    async def _estimated_total_count(
+        self,
+        qs: QuerySet,
+        count: int,
+        limit: Optional[int],
+        offset: Optional[int],
+    ) -> TotalCount:
+        """
+        Count the items with a planner estimate, exactly if the estimate is below the threshold.
+
+        Exact counts are cached for ``PAGINATION_COUNT_CACHE_TIMEOUT`` seconds, without the cache they are counted.
+        """
+        offset = offset or 0
+        if not count and not offset:
+            return TotalCount(0)
+        if count and (limit is None or count < limit):
+            # the last page, so the total is known without counting
+            return TotalCount(offset + count)
+
+        threshold = self.estimated_count_threshold
+        if threshold is None:
+            threshold = settings.PAGINATION_ESTIMATED_COUNT_THRESHOLD
+
+        estimate = await db_executor.run(estimate_count, qs)
+        if estimate >= threshold:
+            # a non empty page proves a lower bound the estimate must not undercut, one past the end proves nothing
+            return TotalCount(max(estimate, offset + count if count else 0), exact=False)
+
+        cache_key = get_count_cache_key(qs)
+        try:
+            total_count = await cache.aget(cache_key)
+        except Exception as e:
+            logger.warning(f"Count cache read failed: {e}")
+            return TotalCount(await qs.acount())
+        if total_count is None:
+            total_count = await qs.acount()
+            try:
+                await cache.aset(cache_key, total_count, timeout=settings.PAGINATION_COUNT_CACHE_TIMEOUT)
+            except Exception as e:
+                logger.warning(f"Count cache write failed: {e}")
+        return TotalCount(total_count)
 
     @final
     async def get_one(
@@ -60,21 +393,48 @@ class BaseRepository(ABC):
         raise_not_found: bool = True,
         select_related: Optional[List[str]] = None,
         prefetch_related: Optional[List[str]] = None,
+        only: Optional[List[str]] = None,
+        defer: Optional[List[str]] = None,
+        values: Optional[List[str]] = None,
+        use_cache: bool = True,
         **kwargs,
     ):
         """
         Get an existing item.
+
+        Plain primary key lookups are served from the repository cache if ``cache_params`` is set, only rows
+        read from the primary are cached. Cached rows come back with ``cache_exclude_fields`` deferred, lookups
+        projecting one of those fields skip the cache. Inside a request primary key lookups are batched
+        by the request loader. Other identical lookups running at the same time share one query
+        if ``coalesce_reads`` is set.
         """
-        select_related = select_related or []
-        prefetch_related = prefetch_related or []
+        pk = None
+        if not (select_related or prefetch_related or values):
+            if len(kwargs) == 1 and next(iter(kwargs)) in ("id", "pk"):
+                pk = next(iter(kwargs.values()))
+        projected = bool(only or defer)
 
-        # create a query set
-        qs = self.model.objects.select_related(*select_related).prefetch_related(*prefetch_related).aget(**kwargs)
-        # get the object
-        try:
-            obj = await qs
-        except self.model.DoesNotExist:
-            obj = None
+        use_cache = (
+            use_cache
+            and pk is not None
+            and self.cache_params is not None
+            and is_cache_enabled()
+            and (not projected or self._is_cached_projection(only, defer))
+        )
+        obj, version = None, None
+        if use_cache:
+            obj, version = await aget_cached(self.model, self.cache_params, pk, self.cache_exclude_fields)
+            if obj is None and projected:
+                # load the cached columns, they cover the projection
+                only, defer = None, list(self.cache_exclude_fields)
+                projected = bool(defer)
+        if obj is None:
+            obj = await self._get_one(
+                None if projected else pk, select_related, prefetch_related, only, defer, values, kwargs
+            )
+            # a replica may lag behind a write whose invalidation already ran
+            if obj is not None and use_cache and obj._state.db == DEFAULT_DB_ALIAS:
+                await aset_cached(self.cache_params, obj, version, self.cache_exclude_fields)
 
         # raise not found exception
         if raise_not_found and not obj:
@@ -82,6 +442,106 @@ class BaseRepository(ABC):
 
         return obj
 
+    @final
+    def _is_cached_projection(self, only: Optional[List[str]], defer: Optional[List[str]]) -> bool:
+        """Check a projection is covered by cached rows, i.e. needs none of the ``cache_exclude_fields``."""
+        exclude = set(self.cache_exclude_fields)
+        if only and exclude & set(only):
+            return False
+        return not defer or exclude <= set(defer)
+
+    @final
+    async def _get_one(
+        self,
+        pk: Any,
+        select_related: Optional[List[str]],
+        prefetch_related: Optional[List[str]],
+        only: Optional[List[str]],
+        defer: Optional[List[str]],
+        values: Optional[List[str]],
+        filters: dict,
+    ):
+        """Query a single item through the request loader, a prepared statement or the single flight."""
+        loader = get_loader(self.model, self._get_queryset) if pk is not None and self.batch_loads else None
+        if loader is not None:
+            return await loader.load(pk)
+
+        prepared_name = None
+        if not (select_related or prefetch_related or only or defer or values):
+            prepared_name = self._find_prepared_query(filters)
+
+        async def fetch():
+            if prepared_name is not None:
+                return await db_executor.run(self._get_one_prepared_sync, prepared_name, filters)
+
+            # create a query set
+            qs = self._get_queryset(
+                select_related=select_related,
+                prefetch_related=prefetch_related,
+                only=only,
+                defer=defer,
+                values=values,
+            ).aget(**filters)
+            # get the object
+            try:
+                return await qs
+            except self.model.DoesNotExist:
+                return None
+
+        key = None
+        if self.coalesce_reads:
+            key = self._singleflight_key(select_related, prefetch_related, only, defer, values, filters)
+        if key is not None:
+            return await singleflight.do(self.model._meta.label, key, fetch)
+        return await fetch()
+
+    @final
+    def _find_prepared_query(self, filters: dict) -> Optional[str]:
+        """Get the name of the declared prepared query matching the filters, ``first`` lookups never match."""
+        for name, query in self.prepared_queries.items():
+            if not query.first and set(query.fields) == set(filters):
+                return name
+        return None
+
+    @final
+    async def get_one_prepared(self, name: str, raise_not_found: bool = True, **kwargs):
+        """
+        Get an existing item with the prepared query declared as ``name`` in ``prepared_queries``.
+
+        ``kwargs`` are the values of the query fields.
+        """
+        obj = await db_executor.run(self._get_one_prepared_sync, name, kwargs)
+
+        # raise not found exception
+        if raise_not_found and not obj:
+            raise NotFoundException()
+
+        return obj
+
+    @final
+    def _get_one_prepared_sync(self, name: str, filters: dict):
+        """Run a prepared query, falls back to a plain query where statements can not be prepared."""
+        query = self.prepared_queries[name]
+        if set(query.fields) != set(filters):
+            raise ValueError(f"Prepared query '{name}' expects the fields {query.fields}, got {tuple(filters)}")
+
+        qs = self._get_queryset(**filters)
+        # the same limits as first() and get()
+        qs = qs.order_by(self.model._meta.pk.name)[:1] if query.first else qs.order_by()[:2]
+        connection = connections[qs.db]
+
+        if prepared_statements_enabled(connection):
+            sql, params = qs.query.get_compiler(qs.db).as_sql()
+            statement = get_statement_name(self.model, name, sql)
+            rows, columns = execute_prepared(connection, statement, sql, params)
+            objs = from_rows(self.model, qs.db, rows, columns)
+        else:
+            objs = list(qs)
+
+        if len(objs) > 1:
+            raise self.model.MultipleObjectsReturned(f"get() returned more than one {self.model._meta.object_name}")
+        return objs[0] if objs else None
+
     @final
     async def get_one_by_id(
         self,
@@ -89,6 +549,10 @@ class BaseRepository(ABC):
         raise_not_found: bool = True,
         select_related: Optional[List[str]] = None,
         prefetch_related: Optional[List[str]] = None,
+        only: Optional[List[str]] = None,
+        defer: Optional[List[str]] = None,
+        values: Optional[List[str]] = None,
+        use_cache: bool = True,
         **kwargs,
     ):
         """
@@ -99,6 +563,10 @@ class BaseRepository(ABC):
             raise_not_found=raise_not_found,
             select_related=select_related,
             prefetch_related=prefetch_related,
+            only=only,
+            defer=defer,
+            values=values,
+            use_cache=use_cache,
             **kwargs,
         )
 
@@ -111,6 +579,9 @@ class BaseRepository(ABC):
         raise_not_found: bool = True,
         select_related: Optional[List[str]] = None,
         prefetch_related: Optional[List[str]] = None,
+        only: Optional[List[str]] = None,
+        defer: Optional[List[str]] = None,
+        values: Optional[List[str]] = None,
         **kwargs,
     ):
         """
@@ -121,24 +592,58 @@ class BaseRepository(ABC):
             raise_not_found=raise_not_found,
             select_related=select_related,
             prefetch_related=prefetch_related,
+            only=only,
+            defer=defer,
+            values=values,
             **kwargs,
         )
 
         return obj
 
+    @final
+    async def _write(
+        self,
+        write: Callable[[], Any],
+        after: Optional[Callable[[], Any]] = None,
+        defer: bool = True,
+    ) -> Any:
+        """
+        Run a write, inside a unit of work it is deferred to the commit of the unit of work.
+
+        A deferred write returns ``None``. Writes whose result is needed right away (``defer=False``)
+        are committed at once, together with the writes deferred so far.
+        """
+        uow = get_unit_of_work()
+        if uow is not None:
+            if not defer:
+                return await uow.run(write, after)
+            uow.add(write, after)
+            return None
+
+        result = await db_executor.run(write)
+        if after is not None:
+            after_result = after()
+            if inspect.isawaitable(after_result):
+                await after_result
+        return result
+
     @final
     async def get_or_create_one(self, *args, **kwargs) -> Tuple[Any, bool]:
         """
         Get or create an existing item.
         """
-        return await self.model.objects.aget_or_create(*args, **kwargs)
+        return await self._write(functools.partial(self.model.objects.get_or_create, *args, **kwargs), defer=False)
 
     @final
     async def update_or_create_one(self, *args, **kwargs) -> Tuple[Any, bool]:
         """
         Update or create an existing item.
         """
-        return await self.model.objects.aupdate_or_create(*args, **kwargs)
+        obj, created = await self._write(
+            functools.partial(self.model.objects.update_or_create, *args, **kwargs), defer=False
+        )
+        forget_loaded(self.model, obj.pk)
+        return obj, created
 
     @final
     def create_one(self, **kwargs):
@@ -151,16 +656,22 @@ class BaseRepository(ABC):
     async def acreate_one(self, *args, **kwargs):
         """
         Create a new item.
+
+        Inside a unit of work the item is returned unsaved and gets its primary key on commit.
         """
-        return await sync_to_async(self.create_one)(**kwargs)
+        if get_unit_of_work() is None:
+            return await db_executor.run(self.create_one, **kwargs)
+
+        obj = self.model(**kwargs)
+        await self._write(functools.partial(obj.save, force_insert=True))
+        return obj
 
-    @sync_to_async
     @final
-    def save_one(self, obj: Model):
+    async def save_one(self, obj: Model):
         """
         Save an existing item.
         """
-        obj.save()
+        await self._write(obj.save, after=lambda: forget_loaded(self.model, obj.pk))
         return obj
 
     @staticmethod
@@ -173,14 +684,94 @@ class BaseRepository(ABC):
         return obj.refresh_from_db()
 
     @final
-    async def delete_one(self, raise_not_found: bool = True, **kwargs) -> [bool, int]:
+    async def delete_one(self, raise_not_found: bool = True, **kwargs) -> Optional[Tuple[int, dict]]:
+        """
+        Delete an existing item.
+
+        Inside a unit of work the delete is deferred, a missing item raises on commit and rolls it back.
+        """
+        return await self._write(
+            functools.partial(self.delete_one_sync, raise_not_found=raise_not_found, **kwargs),
+            after=lambda: forget_loaded(self.model),
+        )
+
+    @final
+    def delete_one_sync(self, raise_not_found: bool = True, **kwargs) -> Optional[Tuple[int, dict]]:
         """
         Delete an existing item.
+
+        Models without cascades and delete signals are deleted with a single
+        ``DELETE ... RETURNING`` statement, others go through the Django delete collector.
+        """
+        using = router.db_for_write(self.model)
+
+        if self.fast_delete and self._can_fast_delete(using):
+            deleted = self._fast_delete_one(using, **kwargs)
+        else:
+            try:
+                item = self.model.objects.db_manager(using).get(**kwargs)
+            except self.model.DoesNotExist:
+                item = None
+            deleted = self.model.objects.db_manager(using).filter(pk=item.pk).delete() if item else None
+
+        if not deleted or not deleted[0]:
+            if raise_not_found:
+                raise NotFoundException()
+            return None
+
+        return deleted
+
+    @final
+    def _can_fast_delete(self, using: str) -> bool:
+        """
+        Check if the model can be deleted without the delete collector.
+        """
+        return connections[using].vendor == "postgresql" and Collector(using=using).can_fast_delete(self.model)
+
+    @final
+    def _fast_delete_one(self, using: str, **kwargs) -> Tuple[int, dict]:
+        """
+        Delete one item with a single ``DELETE ... RETURNING`` statement.
+
+        Filters that are not unique select the row with a scalar subquery, Postgres fails the statement
+        on a second match, so nothing is deleted and ``MultipleObjectsReturned`` is raised like by ``get()``.
         """
-        item = await self.get_one(raise_not_found=raise_not_found, **kwargs)
+        connection = connections[using]
+        query = DeleteQuery(self.model)
+        if self._is_unique_lookup(kwargs):
+            query.add_q(Q(**kwargs))
+        else:
+            query.add_q(Q(pk=Subquery(self.model._base_manager.using(using).filter(**kwargs).values("pk"))))
+        delete_sql, params = query.get_compiler(using).as_sql()
+        pk_column = connection.ops.quote_name(self.model._meta.pk.column)
 
-        if item:
-            return await self.model.objects.filter(id=item.id).adelete()
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(f"{delete_sql} RETURNING {pk_column}", params)
+                deleted_count = len(cursor.fetchall())
+        except DatabaseError as e:
+            if getattr(e.__cause__, "pgcode", None) != CARDINALITY_VIOLATION:
+                raise
+            raise self.model.MultipleObjectsReturned(
+                f"delete_one() matched more than one {self.model._meta.object_name}"
+            ) from e
+
+        return deleted_count, {self.model._meta.label: deleted_count} if deleted_count else {}
+
+    @final
+    def _is_unique_lookup(self, filters: dict) -> bool:
+        """Check if the filters are one exact lookup of a unique field, they can match one row at most."""
+        if len(filters) != 1:
+            return False
+        name = next(iter(filters))
+        if name == "pk":
+            return True
+        if "__" in name:
+            return False
+        try:
+            return self.model._meta.get_field(name).unique
+        except FieldDoesNotExist:
+            return False
 
     @final
     async def delete_one_by_id(self, item_id: int, raise_not_found: bool = True, **kwargs) -> None:
@@ -201,7 +792,86 @@ class BaseRepository(ABC):
         """
         Bulk create items.
         """
-        return await self.model.objects.abulk_create(objs)
+        await self._write(
+            functools.partial(self.model.objects.bulk_create, objs),
+            after=lambda: self._invalidate_cached(objs),
+        )
+        return objs
+
+    @final
+    async def bulk_upsert(
+        self,
+        objs: List[Model],
+        unique_fields: List[str],
+        update_fields: List[str],
+        batch_size: int = 1000,
+    ) -> List[Model]:
+        """
+        Bulk insert items, updating ``update_fields`` of rows that conflict on ``unique_fields``.
+
+        Runs one ``INSERT ... ON CONFLICT DO UPDATE`` per ``batch_size`` items. Django does not return
+        the primary keys of upserted rows, they are read back by ``unique_fields`` in the same transaction
+        and set on the items.
+        """
+        def upsert():
+            with transaction.atomic(using=router.db_for_write(self.model)):
+                self.model.objects.bulk_create(
+                    objs,
+                    batch_size=batch_size,
+                    update_conflicts=True,
+                    unique_fields=unique_fields,
+                    update_fields=update_fields,
+                )
+                self._set_pks_by_unique_fields(objs, unique_fields, batch_size)
+
+        async def after():
+            forget_loaded(self.model)
+            await self._invalidate_cached(objs)
+
+        await self._write(upsert, after=after)
+        return objs
+
+    @final
+    def _set_pks_by_unique_fields(self, objs: List[Model], unique_fields: List[str], batch_size: int) -> None:
+        """Set the primary keys of items from the rows matching their ``unique_fields`` values."""
+        attnames = [self.model._meta.get_field(field).attname for field in unique_fields]
+        keys = {tuple(getattr(obj, attname) for attname in attnames): obj for obj in objs}
+        # from the primary, inside the transaction of the upsert
+        manager = self.model.objects.db_manager(router.db_for_write(self.model))
+        batch = list(keys)
+        for start in range(0, len(batch), batch_size):
+            chunk = batch[start:start + batch_size]
+            if len(attnames) == 1:
+                condition = Q(**{f"{attnames[0]}__in": [key[0] for key in chunk]})
+            else:
+                condition = Q()
+                for key in chunk:
+                    condition |= Q(**dict(zip(attnames, key)))
+            for *key, pk in manager.filter(condition).values_list(*attnames, "pk"):
+                obj = keys.get(tuple(key))
+                if obj is not None:
+                    obj.pk = pk
+
+    @final
+    async def bulk_update(self, objs: List[Model], fields: List[str], batch_size: int = 1000) -> int:
+        """
+        Bulk update ``fields`` of existing items.
+
+        Runs one ``UPDATE ... CASE`` statement per ``batch_size`` items. Returns the number of updated rows.
+        """
+        updated = await self._write(
+            functools.partial(self.model.objects.bulk_update, objs, fields=fields, batch_size=batch_size),
+            defer=False,
+        )
+        forget_loaded(self.model)
+        await self._invalidate_cached(objs)
+        return updated
+
+    @final
+    async def _invalidate_cached(self, objs: List[Model]) -> None:
+        """Drop cached objects written without model signals."""
+        if self.cache_params is not None:
+            await ainvalidate(self.cache_params, [obj.pk for obj in objs])
 
     @final
     def delete_many_sync(self, **kwargs) -> None:
@@ -211,4 +881,4 @@ class BaseRepository(ABC):
     @final
     async def delete_many(self, **kwargs) -> None:
         """Delete many items."""
-        await sync_to_async(self.delete_many_sync)(**kwargs)
+        await self._write(functools.partial(self.delete_many_sync, **kwargs), after=lambda: forget_loaded(self.model))
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""Read-through cache of repository rows."""
+import uuid
+from functools import partial
+from typing import Any, Iterable, List, Optional, Tuple, Type
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Model
+from django.db.models.signals import post_delete, post_save
+from loguru import logger
+
+# version of a failed cache read, nothing is cached after it
+MISSING_VERSION = "missing"
+
+
+def is_cache_enabled() -> bool:
+    """Check the global switch of the repository cache."""
+    return getattr(settings, "REPOSITORY_CACHE_ENABLED", True)
+
+
+def get_version_key(key: str) -> str:
+    """Get the key of the version token that guards a cached object."""
+    return f"{key}:version"
+
+
+def get_cached_fields(model: Type[Model], exclude: Iterable[str] = ()) -> List[str]:
+    """Get the attribute names of the cached fields, e.g. without password hashes."""
+    exclude = set(exclude)
+    return [field.attname for field in model._meta.concrete_fields if field.name not in exclude]
+
+
+def pack(obj: Model, fields: List[str]) -> Tuple[Any, ...]:
+    """Pack the field values of an object, far smaller than a pickled instance."""
+    return tuple(getattr(obj, field) for field in fields)
+
+
+def unpack(model: Type[Model], fields: List[str], data: Tuple[Any, ...]) -> Optional[Model]:
+    """Rebuild an object packed with ``pack``, fields left out are deferred. ``None`` if the fields changed since."""
+    if len(data) != len(fields):
+        return None
+    return model.from_db(DEFAULT_DB_ALIAS, fields, data)
+
+
+async def aget_cached(
+    model: Type[Model],
+    cache_params,
+    pk: Any,
+    exclude: Iterable[str] = (),
+) -> Tuple[Optional[Model], Optional[str]]:
+    """
+    Get a cached object and the current version token of its key.
+
+    The object is ``None`` on a miss or if it was cached before the last invalidation,
+    the token must be passed to ``aset_cached`` when the object is cached after the miss.
+    """
+    key = cache_params.build_key(pk=pk)
+    version_key = get_version_key(key)
+    try:
+        entries = await cache.aget_many([key, version_key])
+    except Exception as e:
+        logger.warning(f"Repository cache read failed: {e}")
+        return None, MISSING_VERSION
+
+    version = entries.get(version_key)
+    if key not in entries:
+        return None, version
+    cached_version, data = entries[key]
+    if cached_version != version:
+        # cached by a read that started before the last write
+        return None, version
+    return unpack(model, get_cached_fields(model, exclude), data), version
+
+
+async def aset_cached(cache_params, obj: Model, version: Optional[str], exclude: Iterable[str] = ()) -> None:
+    """
+    Cache an object read after ``aget_cached`` returned ``version``.
+
+    The object is stored with that version, a write committed meanwhile has replaced the token,
+    so readers ignore the old row instead of serving it until the timeout.
+    """
+    if version == MISSING_VERSION:
+        return
+    data = pack(obj, get_cached_fields(type(obj), exclude))
+    try:
+        await cache.aset(cache_params.build_key(pk=obj.pk), (version, data), timeout=cache_params.timeout)
+    except Exception as e:
+        logger.warning(f"Repository cache write failed: {e}")
+
+
+def invalidate(cache_params, pks: Iterable[Any], using: str = DEFAULT_DB_ALIAS) -> None:
+    """
+    Invalidate cached objects after the commit, outside of a transaction right away.
+
+    The version tokens of the keys are replaced, so objects cached by reads that started before
+    the commit are ignored as well.
+    """
+    keys = [cache_params.build_key(pk=pk) for pk in pks if pk is not None]
+    if keys:
+        transaction.on_commit(partial(_replace_versions, keys, cache_params.timeout), using=using)
+
+
+async def ainvalidate(cache_params, pks: Iterable[Any]) -> None:
+    """Invalidate cached objects after a write that has already been committed."""
+    keys = [cache_params.build_key(pk=pk) for pk in pks if pk is not None]
+    if keys:
+        await sync_to_async(_replace_versions)(keys, cache_params.timeout)
+
+
+def _replace_versions(keys: List[str], timeout: int) -> None:
+    """Give the keys new version tokens and drop the objects cached under the old ones."""
+    # the token outlives every object cached with it
+    versions = {get_version_key(key): uuid.uuid4().hex for key in keys}
+    try:
+        cache.set_many(versions, timeout=timeout * 2)
+        cache.delete_many(keys)
+    except Exception as e:
+        logger.warning(f"Repository cache invalidation failed: {e}")
+
+
+def connect_invalidation(model: Type[Model], cache_params) -> None:
+    """Invalidate cached objects of the model on every save and delete."""
+
+    def receiver(sender, instance, using=DEFAULT_DB_ALIAS, **kwargs):
+        invalidate(cache_params, [instance.pk], using=using)
+
+    # the receiver is kept alive by the signal, the uid makes reconnecting a no-op
+    dispatch_uid = f"repository_cache:{model._meta.label}:{cache_params.namespace}"
+    post_save.connect(receiver, sender=model, weak=False, dispatch_uid=dispatch_uid)
+    post_delete.connect(receiver, sender=model, weak=False, dispatch_uid=dispatch_uid)
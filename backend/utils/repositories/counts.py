@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""Exact and estimated row counts for paginated lists."""
+import hashlib
+import json
+
+from django.db import connections
+from django.db.models import QuerySet
+
+
+class TotalCount(int):
+    """Total number of items, ``exact`` is ``False`` for a planner estimate."""
+
+    exact: bool
+
+    def __new__(cls, value: int, exact: bool = True) -> "TotalCount":
+        """Create total count."""
+        total_count = super().__new__(cls, value)
+        total_count.exact = exact
+        return total_count
+
+
+def estimate_count(qs: QuerySet) -> int:
+    """
+    Estimate the number of rows of a queryset without counting them.
+
+    Unfiltered tables use the ``pg_class.reltuples`` statistics, filtered querysets the row
+    estimate of the query plan. ``-1`` if the table has never been analyzed.
+    """
+    connection = connections[qs.db]
+    qs = qs.order_by()
+
+    with connection.cursor() as cursor:
+        if not qs.query.has_filters():
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [qs.model._meta.db_table])
+            row = cursor.fetchone()
+            return row[0] if row else -1
+
+        sql, params = qs.query.sql_with_params()
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def get_count_cache_key(qs: QuerySet) -> str:
+    """Get the cache key of the exact count of a queryset."""
+    sql, params = qs.order_by().query.sql_with_params()
+    digest = hashlib.sha1(f"{qs.db}:{sql}:{params!r}".encode()).hexdigest()
+    return f"repository:count:{qs.model._meta.db_table}:{digest}"
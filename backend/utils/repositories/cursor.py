@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""Keyset (cursor) pagination helpers for repositories."""
+import base64
+import datetime
+import json
+from typing import Any, List, Optional, Sequence, Tuple, Type, Union
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Model, Q
+
+from utils.responses.http.api import InvalidCursorException
+
+CURSOR_NEXT = "n"
+CURSOR_PREVIOUS = "p"
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """JSON encoder of cursor values, keeps the microseconds that ``DjangoJSONEncoder`` drops."""
+
+    def default(self, o):
+        """Encode datetimes and times at full precision, seeking needs the exact stored value."""
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+def get_keyset_ordering(model: Type[Model], order_by: Optional[List[str]] = None) -> List[str]:
+    """
+    Get a deterministic ordering for keyset pagination.
+
+    Falls back to the model ``Meta.ordering`` and always ends with the primary key,
+    so rows with equal ordering values still have a stable position.
+    Nullable columns are rejected, ``NULL`` can not be compared with ``<`` and ``>``.
+    """
+    pk_name = model._meta.pk.name
+    ordering = []
+    for field in order_by or model._meta.ordering or []:
+        if "__" in field or field.startswith("?"):
+            raise ValueError(f"Keyset pagination supports only plain model fields, got '{field}'")
+        name = field.lstrip("-")
+        if name == "pk":
+            # ``values()`` rows only have the real field name
+            field = field.replace("pk", pk_name)
+        elif model._meta.get_field(name).null:
+            raise ValueError(f"Keyset pagination does not support the nullable field '{name}'")
+        ordering.append(field)
+
+    if not any(field.lstrip("-") == pk_name for field in ordering):
+        ordering.append(pk_name)
+
+    return ordering
+
+
+def encode_cursor(obj: Union[Model, dict], ordering: Sequence[str], direction: str) -> str:
+    """Encode the ordering values of the boundary object (or ``values()`` row) into an opaque cursor."""
+    if isinstance(obj, dict):
+        values = [obj[field.lstrip("-")] for field in ordering]
+    else:
+        values = [getattr(obj, field.lstrip("-")) for field in ordering]
+    data = json.dumps([direction, values], cls=CursorEncoder, separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+
+def decode_cursor(model: Type[Model], cursor: str, ordering: Sequence[str]) -> Tuple[str, List[Any]]:
+    """Decode a cursor into its direction and the typed ordering values."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        direction, values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise InvalidCursorException()
+
+    if direction not in (CURSOR_NEXT, CURSOR_PREVIOUS) or not isinstance(values, list) or len(values) != len(ordering):
+        raise InvalidCursorException()
+
+    typed_values = []
+    for field, value in zip(ordering, values):
+        if value is None:
+            raise InvalidCursorException()
+        try:
+            typed_values.append(model._meta.get_field(field.lstrip("-")).to_python(value))
+        except (ValidationError, TypeError, ValueError):
+            # e.g. a list or an object in place of a date
+            raise InvalidCursorException()
+
+    return direction, typed_values
+
+
+def build_seek_filter(ordering: Sequence[str], values: Sequence[Any], reverse: bool = False) -> Q:
+    """
+    Build a filter that seeks past the given row values.
+
+    For ``(-date_created, id)`` it produces
+    ``date_created < v1 OR (date_created = v1 AND id > v2)``, which Postgres can
+    answer with an index range scan instead of skipping ``offset`` rows.
+    """
+    condition = Q()
+    equal = Q()
+
+    for field, value in zip(ordering, values):
+        name = field.lstrip("-")
+        descending = field.startswith("-") != reverse
+        lookup = "lt" if descending else "gt"
+
+        condition |= equal & Q(**{f"{name}__{lookup}": value})
+        equal &= Q(**{name: value})
+
+    return condition
+
+
+def reverse_ordering(ordering: Sequence[str]) -> List[str]:
+    """Reverse every field direction of the ordering."""
+    return [field[1:] if field.startswith("-") else f"-{field}" for field in ordering]
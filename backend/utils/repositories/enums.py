@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+"""Repository enums."""
+from enum import Enum
+
+
+class CountStrategy(str, Enum):
+    """How ``get_all_and_count`` computes the total count."""
+
+    WINDOW = "window"  # one query, the total comes from ``COUNT(*) OVER ()``
+    SEPARATE = "separate"  # two queries, the page and a plain ``COUNT(*)``
+    ESTIMATED = "estimated"  # planner estimate above ``estimated_count_threshold``, cached exact count below
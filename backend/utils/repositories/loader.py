@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""Request scoped batching of primary key lookups."""
+import asyncio
+import copy
+from contextvars import ContextVar, Token
+from typing import Any, Callable, Dict, Optional, Type
+
+from django.db.models import Model, QuerySet
+
+# loaders of the current request, ``None`` outside of a request scope
+_loaders: ContextVar[Optional[Dict[Type[Model], "ModelLoader"]]] = ContextVar("repository_loaders", default=None)
+
+
+class ModelLoader:
+    """
+    Collect primary key lookups of one model and resolve them with a single ``pk__in`` query.
+
+    Lookups made in the same event loop tick are sent together, found objects are memoised
+    until the end of the request or the next write. Every caller gets its own copy, so changes
+    made by one caller do not leak to the others. Misses are not memoised, a row created later
+    in the request is found.
+    """
+
+    def __init__(self, model: Type[Model], get_queryset: Callable[[], QuerySet]):
+        """Initialize loader."""
+        self.model = model
+        self._get_queryset = get_queryset
+        self._futures: Dict[Any, asyncio.Future] = {}
+        self._pending: Dict[Any, asyncio.Future] = {}
+
+    async def load(self, pk: Any) -> Optional[Model]:
+        """Get the object with the given primary key, ``None`` if it does not exist."""
+        pk = self.model._meta.pk.to_python(pk)
+        future = self._futures.get(pk)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._futures[pk] = future
+
+            if not self._pending:
+                # dispatch after the other coroutines of this tick had the chance to add their keys
+                loop.call_soon(self._dispatch)
+            self._pending[pk] = future
+
+        # a cancelled caller must not cancel the lookup of the others
+        obj = await asyncio.shield(future)
+        return None if obj is None else copy.copy(obj)
+
+    def forget(self, pk: Any = None) -> None:
+        """Drop memoised objects after a write, all of them if no primary key is given."""
+        keys = list(self._futures) if pk is None else [self.model._meta.pk.to_python(pk)]
+        for key in keys:
+            # lookups in flight are left alone, their callers already wait for them
+            if key in self._futures and self._futures[key].done():
+                del self._futures[key]
+
+    def _dispatch(self) -> None:
+        """Send the collected keys as one query."""
+        pending, self._pending = self._pending, {}
+        asyncio.ensure_future(self._resolve(pending))
+
+    async def _resolve(self, pending: Dict[Any, asyncio.Future]) -> None:
+        """Query the objects and resolve the futures."""
+        try:
+            objs = {obj.pk: obj async for obj in self._get_queryset().filter(pk__in=list(pending))}
+        except Exception as e:
+            for pk, future in pending.items():
+                self._futures.pop(pk, None)
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for pk, future in pending.items():
+            obj = objs.get(pk)
+            if obj is None and self._futures.get(pk) is future:
+                del self._futures[pk]
+            if not future.done():
+                future.set_result(obj)
+
+
+def activate_loaders() -> Token:
+    """Start a new loader scope, returns the token for ``deactivate_loaders``."""
+    return _loaders.set({})
+
+
+def deactivate_loaders(token: Token) -> None:
+    """Close the loader scope."""
+    _loaders.reset(token)
+
+
+def get_loader(model: Type[Model], get_queryset: Callable[[], QuerySet]) -> Optional[ModelLoader]:
+    """Get the loader of the model in the current scope, ``None`` if there is no scope."""
+    loaders = _loaders.get()
+    if loaders is None:
+        return None
+    if model not in loaders:
+        loaders[model] = ModelLoader(model, get_queryset)
+    return loaders[model]
+
+
+def forget_loaded(model: Type[Model], pk: Any = None) -> None:
+    """Drop memoised objects of the model in the current scope."""
+    loaders = _loaders.get()
+    if loaders and model in loaders:
+        loaders[model].forget(pk)
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""Server side prepared statements for hot repository queries."""
+import hashlib
+import re
+from dataclasses import dataclass
+from typing import Any, List, Sequence, Set, Tuple, Type
+from weakref import WeakKeyDictionary
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.models import Model
+
+# names of the statements prepared on every raw connection, pooled connections keep them between calls
+_prepared: "WeakKeyDictionary[Any, Set[str]]" = WeakKeyDictionary()
+
+_PLACEHOLDER = re.compile(r"%([s%])")
+_NOT_IDENTIFIER = re.compile(r"\W")
+
+# SQLSTATE codes of a statement that was dropped by the server and of one that already exists
+INVALID_STATEMENT_NAME = "26000"
+DUPLICATE_PREPARED_STATEMENT = "42P05"
+
+
+@dataclass(frozen=True)
+class PreparedQuery:
+    """
+    A hot single row lookup of a repository, declared in ``prepared_queries``.
+
+    ``fields`` are the filter fields, the lookup is prepared once per connection and then only executed.
+    With ``first`` the lookup behaves like ``first()``: ordered by primary key, several matches are fine.
+    """
+
+    fields: Tuple[str, ...]
+    first: bool = False
+
+
+def prepared_statements_enabled(connection: BaseDatabaseWrapper) -> bool:
+    """
+    Check if statements can be prepared on the connection.
+
+    Disable ``DATABASE_PREPARED_STATEMENTS`` behind a transaction pooler (e.g. PgBouncer in transaction mode),
+    there every transaction may run on another server connection that does not know the statement.
+    Inside a transaction a failed ``PREPARE`` would abort it, so the lookup falls back to a plain query.
+    """
+    return (
+        settings.DATABASE_PREPARED_STATEMENTS
+        and connection.vendor == "postgresql"
+        and not connection.in_atomic_block
+    )
+
+
+def get_statement_name(model: Type[Model], name: str, sql: str) -> str:
+    """Get a statement name unique for the SQL text, a changed query gets its own statement."""
+    digest = hashlib.md5(sql.encode()).hexdigest()[:12]
+    return _NOT_IDENTIFIER.sub("_", f"{model._meta.db_table}_{name}")[:48].lower() + f"_{digest}"
+
+
+def to_server_placeholders(sql: str) -> str:
+    """Replace the driver ``%s`` placeholders with the positional ``$n`` of ``PREPARE``."""
+    index = 0
+
+    def replace(match: re.Match) -> str:
+        nonlocal index
+        if match.group(1) == "%":
+            return "%"
+        index += 1
+        return f"${index}"
+
+    return _PLACEHOLDER.sub(replace, sql)
+
+
+def execute_prepared(
+    connection: BaseDatabaseWrapper,
+    name: str,
+    sql: str,
+    params: Sequence[Any],
+) -> Tuple[List[tuple], List[str]]:
+    """Prepare the statement on the connection if needed and execute it, returns rows and column names."""
+    connection.ensure_connection()
+    names = _prepared.setdefault(connection.connection, set())
+
+    try:
+        return _execute(connection, names, name, sql, params)
+    except DatabaseError as e:
+        if _sqlstate(e) != INVALID_STATEMENT_NAME:
+            raise
+        # the server dropped the statement, e.g. after DISCARD ALL, prepare it again
+        names.discard(name)
+        return _execute(connection, names, name, sql, params)
+
+
+def _execute(
+    connection: BaseDatabaseWrapper,
+    names: Set[str],
+    name: str,
+    sql: str,
+    params: Sequence[Any],
+) -> Tuple[List[tuple], List[str]]:
+    """Prepare and execute a statement."""
+    with connection.cursor() as cursor:
+        if name not in names:
+            try:
+                cursor.execute(f"PREPARE {name} AS {to_server_placeholders(sql)}")
+            except DatabaseError as e:
+                if _sqlstate(e) != DUPLICATE_PREPARED_STATEMENT:
+                    raise
+            names.add(name)
+
+        if params:
+            cursor.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", params)
+        else:
+            cursor.execute(f"EXECUTE {name}")
+        return cursor.fetchall(), [column.name for column in cursor.description]
+
+
+def from_rows(model: Type[Model], alias: str, rows: List[tuple], columns: List[str]) -> List[Model]:
+    """Build model instances from the rows of a prepared statement."""
+    attnames = {field.column: field.attname for field in model._meta.concrete_fields}
+    field_names = [attnames[column] for column in columns]
+    return [model.from_db(alias, field_names, row) for row in rows]
+
+
+def _sqlstate(error: DatabaseError) -> str:
+    """Get the SQLSTATE of a wrapped driver error."""
+    return getattr(error.__cause__, "pgcode", None) or ""
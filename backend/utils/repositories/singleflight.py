@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""Coalescing of identical concurrent repository reads."""
+import asyncio
+import copy
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+@dataclass
+class SingleFlightStats:
+    """Counters of one model."""
+
+    calls: int = 0  # all reads that went through the single flight
+    executed: int = 0  # reads that actually queried the database
+    coalesced: int = 0  # reads that waited for a query already in flight
+
+
+class SingleFlight:
+    """
+    Run at most one query per key at a time.
+
+    Callers that come while a query with the same key is in flight wait for it
+    instead of sending their own. The query runs as a separate task, so a cancelled
+    caller does not cancel it for the others.
+    """
+
+    def __init__(self):
+        """Initialize single flight."""
+        self._tasks: Dict[Tuple[int, Hashable], asyncio.Task] = {}
+        self._stats: Dict[str, SingleFlightStats] = defaultdict(SingleFlightStats)
+
+    async def do(self, label: str, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Get the result of ``func``, shared with the concurrent calls of the same key."""
+        stats = self._stats[label]
+        stats.calls += 1
+
+        # tasks can not be shared between event loops
+        key = (id(asyncio.get_running_loop()), key)
+        task = self._tasks.get(key)
+        leader = task is None
+
+        if leader:
+            task = asyncio.ensure_future(func())
+            task.add_done_callback(partial(self._forget, key))
+            self._tasks[key] = task
+            stats.executed += 1
+        else:
+            stats.coalesced += 1
+
+        result = await asyncio.shield(task)
+        # followers get their own copy, so changes made by one caller do not leak to the others
+        return result if leader else copy.copy(result)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Get the counters per model label."""
+        return {label: asdict(stats) for label, stats in self._stats.items()}
+
+    def reset_stats(self) -> None:
+        """Reset the counters."""
+        self._stats.clear()
+
+    def _forget(self, key: Tuple[int, Hashable], task: asyncio.Task) -> None:
+        """Remove the finished task, so the next call queries fresh data."""
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            # mark the exception as retrieved in case every caller was cancelled
+            task.exception()
+
+
+singleflight = SingleFlight()
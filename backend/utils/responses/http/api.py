@@ -11,3 +11,11 @@ class NotFoundException(DefaultHTTPException):
     error = "NOT_FOUND"
     message = "The requested resource was not found."
     status_code = status.HTTP_404_NOT_FOUND
+
+
+class InvalidCursorException(DefaultHTTPException):
+    """Exception raised when the pagination cursor is malformed or outdated."""
+
+    error = "INVALID_CURSOR"
+    message = "The pagination cursor is invalid."
+    status_code = status.HTTP_400_BAD_REQUEST
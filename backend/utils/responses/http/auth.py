@@ -27,3 +27,11 @@ class InsufficientRightsException(DefaultHTTPException):
     error = "INSUFFICIENT_RIGHTS"
     message = "Insufficient rights to perform this action."
     status_code = status.HTTP_403_FORBIDDEN
+
+
+class PasswordHasherBusyException(DefaultHTTPException):
+    """Exception raised when too many password hashes are waiting for the hasher."""
+
+    error = "AUTH_BUSY"
+    message = "Too many authentication requests, try again later."
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""Streaming responses for large exports."""
+import csv
+import io
+from typing import Any, AsyncIterator, List, Optional, Type
+
+from pydantic import BaseModel
+from starlette.responses import StreamingResponse
+
+
+def _content_disposition(filename: Optional[str]) -> dict:
+    """Build attachment headers."""
+    return {"Content-Disposition": f'attachment; filename="{filename}"'} if filename else {}
+
+
+async def _ndjson_lines(rows: AsyncIterator[Any], schema: Type[BaseModel], batch_size: int) -> AsyncIterator[str]:
+    """Serialize rows into NDJSON lines, yielding them in batches."""
+    batch: List[str] = []
+    async for row in rows:
+        batch.append(schema.from_orm(row).json(by_alias=True))
+        if len(batch) >= batch_size:
+            yield "\n".join(batch) + "\n"
+            batch = []
+    if batch:
+        yield "\n".join(batch) + "\n"
+
+
+async def _csv_lines(rows: AsyncIterator[Any], schema: Type[BaseModel], batch_size: int) -> AsyncIterator[str]:
+    """Serialize rows into CSV lines with a header, yielding them in batches."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([field.alias for field in schema.__fields__.values()])
+
+    count = 0
+    async for row in rows:
+        writer.writerow(schema.from_orm(row).dict(by_alias=True).values())
+        count += 1
+        if count >= batch_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            count = 0
+    yield buffer.getvalue()
+
+
+def ndjson_streaming_response(
+    rows: AsyncIterator[Any],
+    schema: Type[BaseModel],
+    filename: Optional[str] = None,
+    batch_size: int = 500,
+) -> StreamingResponse:
+    """
+    Stream rows as newline delimited JSON.
+
+    Pair it with ``BaseRepository.stream`` to export tables of any size with flat memory.
+    """
+    return StreamingResponse(
+        _ndjson_lines(rows, schema, batch_size),
+        media_type="application/x-ndjson",
+        headers=_content_disposition(filename),
+    )
+
+
+def csv_streaming_response(
+    rows: AsyncIterator[Any],
+    schema: Type[BaseModel],
+    filename: Optional[str] = None,
+    batch_size: int = 500,
+) -> StreamingResponse:
+    """
+    Stream rows as CSV. Columns are the schema fields, named by their aliases.
+    """
+    return StreamingResponse(
+        _csv_lines(rows, schema, batch_size),
+        media_type="text/csv",
+        headers=_content_disposition(filename),
+    )
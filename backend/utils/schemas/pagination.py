@@ -1,13 +1,17 @@
 # -*- coding: utf-8 -*-
 """FastAPI pagination schemas."""
 from math import ceil
-from typing import List
+from typing import List, Optional, Union
 
 from fastapi import Query
 from fastapi_pagination import LimitOffsetParams, Params
 from fastapi_pagination.bases import AbstractParams
+from fastapi_pagination.cursor import CursorParams
 from pydantic import BaseModel
 
+from utils.repositories import BaseRepository
+from utils.services import BaseService
+
 
 class LimitOffsetPaginator(BaseModel):
     """Base paginator."""
@@ -15,6 +19,7 @@ class LimitOffsetPaginator(BaseModel):
     entries: List
     count: int
     total_count: int
+    total_count_exact: bool = True
     limit: int = Query(..., ge=1, description="Limit of transactions per page")
     offset: int = Query(..., ge=0, description="Limit of transactions per page")
 
@@ -25,15 +30,27 @@ class LimitOffsetPaginator(BaseModel):
         params: LimitOffsetParams,
         total_count: int,
     ) -> "LimitOffsetPaginator":
-        """Create paginator instance."""
+        """Create paginator instance. A ``TotalCount`` estimate sets ``total_count_exact`` to ``False``."""
         return cls(
             entries=entries,
             count=len(entries),
             total_count=total_count,
+            total_count_exact=getattr(total_count, "exact", True),
             limit=params.limit,
             offset=params.offset,
         )
 
+    @classmethod
+    async def paginate(
+        cls,
+        source: Union[BaseService, BaseRepository],
+        params: LimitOffsetParams,
+        **kwargs,
+    ) -> "LimitOffsetPaginator":
+        """Fetch the page and the total count with ``get_all_and_count`` and create paginator instance."""
+        entries, total_count = await source.get_all_and_count(limit=params.limit, offset=params.offset, **kwargs)
+        return cls.create(entries=entries, params=params, total_count=total_count)
+
 
 class PageNumberedPaginator(BaseModel):
     """Base paginator."""
@@ -41,6 +58,7 @@ class PageNumberedPaginator(BaseModel):
     entries: List
     count: int
     total_count: int
+    total_count_exact: bool = True
     size: int = Query(..., ge=1, description="Limit of transactions per page")
     page: int = Query(..., ge=1, description="Page number")
     pages: int = Query(..., ge=1, description="Total pages")
@@ -52,7 +70,7 @@ class PageNumberedPaginator(BaseModel):
         params: AbstractParams,
         total_count: int,
     ) -> "PageNumberedPaginator":
-        """Create paginator instance."""
+        """Create paginator instance. A ``TotalCount`` estimate sets ``total_count_exact`` to ``False``."""
         if not isinstance(params, Params):
             raise ValueError("Page should be used with Params")
 
@@ -62,7 +80,65 @@ class PageNumberedPaginator(BaseModel):
             entries=entries,
             count=len(entries),
             total_count=total_count,
+            total_count_exact=getattr(total_count, "exact", True),
             page=params.page,
             size=params.size,
             pages=pages,
         )
+
+    @classmethod
+    async def paginate(
+        cls,
+        source: Union[BaseService, BaseRepository],
+        params: Params,
+        **kwargs,
+    ) -> "PageNumberedPaginator":
+        """Fetch the page and the total count with ``get_all_and_count`` and create paginator instance."""
+        entries, total_count = await source.get_all_and_count(
+            limit=params.size,
+            offset=(params.page - 1) * params.size,
+            **kwargs,
+        )
+        return cls.create(entries=entries, params=params, total_count=total_count)
+
+
+class CursorPaginator(BaseModel):
+    """Keyset paginator. Cost of a page does not depend on its depth."""
+
+    entries: List
+    count: int
+    size: int = Query(..., ge=1, description="Limit of entries per page")
+    next_cursor: Optional[str] = Query(None, description="Cursor of the next page")
+    previous_cursor: Optional[str] = Query(None, description="Cursor of the previous page")
+
+    @classmethod
+    def create(
+        cls,
+        entries: List,
+        params: CursorParams,
+        next_cursor: Optional[str],
+        previous_cursor: Optional[str],
+    ) -> "CursorPaginator":
+        """Create paginator instance."""
+        return cls(
+            entries=entries,
+            count=len(entries),
+            size=params.size,
+            next_cursor=next_cursor,
+            previous_cursor=previous_cursor,
+        )
+
+    @classmethod
+    async def paginate(
+        cls,
+        source: Union[BaseService, BaseRepository],
+        params: CursorParams,
+        **kwargs,
+    ) -> "CursorPaginator":
+        """Fetch the page with ``get_all_by_cursor`` and create paginator instance."""
+        entries, next_cursor, previous_cursor = await source.get_all_by_cursor(
+            limit=params.size,
+            cursor=params.cursor,
+            **kwargs,
+        )
+        return cls.create(entries=entries, params=params, next_cursor=next_cursor, previous_cursor=previous_cursor)
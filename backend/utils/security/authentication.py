@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""Bearer token of a request, parsed and verified once."""
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi.security import HTTPAuthorizationCredentials
+from fastapi.security.utils import get_authorization_scheme_param
+from starlette.datastructures import Headers
+from starlette.requests import HTTPConnection
+from starlette.types import Scope
+
+# scope key read by ``request.auth``
+SCOPE_KEY = "auth"
+
+
+class RequestAuthentication:
+    """
+    Authorization of a request, set by ``AuthenticationMiddleware`` as ``request.auth``.
+
+    Nothing is parsed until a dependency asks for it, so routes without authentication do not pay for it.
+    The credentials are parsed and the token is verified at most once per request.
+    """
+
+    __slots__ = ("_scope", "_parsed", "scheme", "token", "_credentials", "_verified", "_payload")
+
+    def __init__(self, scope: Scope):
+        """Initialize request authentication."""
+        self._scope = scope
+        self._parsed = False
+        self.scheme: Optional[str] = None
+        self.token: Optional[str] = None
+        self._credentials: Optional[HTTPAuthorizationCredentials] = None
+        self._verified = False
+        self._payload: Any = None
+
+    def _parse(self) -> None:
+        """Parse the ``Authorization`` header."""
+        if self._parsed:
+            return
+        self._parsed = True
+
+        authorization = Headers(scope=self._scope).get("Authorization")
+        scheme, token = get_authorization_scheme_param(authorization)
+        if authorization and scheme and token:
+            self.scheme, self.token = scheme, token
+            if scheme.lower() == "bearer":
+                self._credentials = HTTPAuthorizationCredentials(scheme=scheme, credentials=token)
+
+    @property
+    def is_provided(self) -> bool:
+        """Check if the request has an ``Authorization`` header with a scheme and credentials."""
+        self._parse()
+        return self.scheme is not None
+
+    @property
+    def credentials(self) -> Optional[HTTPAuthorizationCredentials]:
+        """Bearer credentials, ``None`` without them or with another scheme."""
+        self._parse()
+        return self._credentials
+
+    async def get_payload(self, decode: Callable[[str], Awaitable[Any]]) -> Any:
+        """
+        Verify the bearer token with ``decode`` on first use, ``None`` without a valid token.
+
+        Every later call of the request gets the same payload without verifying again.
+        """
+        if not self._verified:
+            credentials = self.credentials
+            self._payload = await decode(credentials.credentials) if credentials else None
+            self._verified = True
+        return self._payload
+
+
+def get_request_authentication(connection: HTTPConnection) -> RequestAuthentication:
+    """Get the authentication of a request, created on first use if the middleware is not installed."""
+    authentication = connection.scope.get(SCOPE_KEY)
+    if not isinstance(authentication, RequestAuthentication):
+        authentication = connection.scope[SCOPE_KEY] = RequestAuthentication(connection.scope)
+    return authentication
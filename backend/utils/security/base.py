@@ -3,10 +3,10 @@
 from typing import Optional
 
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from fastapi.security.utils import get_authorization_scheme_param
 from starlette.requests import Request
 
 from utils.responses.http.auth import UnauthorizedException
+from utils.security.authentication import get_request_authentication
 
 
 class JwtHTTPBearer(HTTPBearer):
@@ -16,17 +16,16 @@ class JwtHTTPBearer(HTTPBearer):
         self,
         request: Request,
     ) -> Optional[HTTPAuthorizationCredentials]:
-        """Call method."""
-        authorization: str = request.headers.get("Authorization")
-        scheme, credentials = get_authorization_scheme_param(authorization)
-        if not (authorization and scheme and credentials):
+        """Call method. The credentials are parsed once per request, see ``RequestAuthentication``."""
+        authentication = get_request_authentication(request)
+        if not authentication.is_provided:
             if self.auto_error:
                 raise UnauthorizedException()
             else:
                 return None
-        if scheme.lower() != "bearer":
+        if authentication.credentials is None:
             if self.auto_error:
                 raise UnauthorizedException("Invalid authentication format")
             else:
                 return None
-        return HTTPAuthorizationCredentials(scheme=scheme, credentials=credentials)
+        return authentication.credentials
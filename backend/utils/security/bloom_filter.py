@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""Bloom filter."""
+import hashlib
+import math
+from typing import Iterator
+
+
+class BloomFilter:
+    """
+    Set of strings in a fixed amount of memory, with false positives but without false negatives.
+
+    Sized for ``capacity`` items at ``error_rate``, beyond that the false positive rate grows.
+    Items can not be removed, the filter is rebuilt instead.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        """Initialize filter."""
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / self.capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> Iterator[int]:
+        """Bit positions of an item, double hashing of one digest."""
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for index in range(self.hash_count):
+            yield (first + index * second) % self.size
+
+    def add(self, item: str) -> None:
+        """Add an item."""
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        """Check if an item may have been added, ``False`` is always right."""
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    @property
+    def is_full(self) -> bool:
+        """Check if the filter holds as many items as it was sized for."""
+        return self.count >= self.capacity
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""Password hashing off the event loop."""
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Callable, Optional, Tuple
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.hashers import (check_password, is_password_usable,
+                                         make_password)
+
+from utils.responses.http.auth import PasswordHasherBusyException
+
+
+def _init_worker() -> None:
+    """Set up Django in a spawned worker process, the hashers are configured by the settings."""
+    if not apps.ready:
+        django.setup()
+
+
+def _make_password(raw_password: str) -> str:
+    """Hash a password with the preferred hasher."""
+    return make_password(raw_password)
+
+
+def _check_password(raw_password: str, encoded: str) -> Tuple[bool, bool]:
+    """Verify a password, returns if it is valid and if its hash must be upgraded."""
+    must_update = []
+    # the setter is only called for a valid password with an outdated hash
+    valid = check_password(raw_password, encoded, setter=lambda raw: must_update.append(True))
+    return valid, bool(must_update)
+
+
+class PasswordHasher:
+    """
+    Hash and verify passwords in a pool of worker processes.
+
+    Hashing is slow on purpose, on the event loop every hash would stall all other requests of the worker.
+    The pool has ``PASSWORD_HASHER_WORKERS`` processes (the number of cores by default). At most
+    ``PASSWORD_HASHER_MAX_PENDING`` hashes wait or run at a time, beyond that callers get
+    ``PasswordHasherBusyException`` instead of queuing without bound.
+    With ``PASSWORD_HASHER_WORKERS = 0`` passwords are hashed on a thread of the default executor.
+    """
+
+    def __init__(self):
+        """Initialize hasher. Worker processes are started on first use."""
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    @property
+    def max_workers(self) -> int:
+        """Configured number of worker processes."""
+        workers = settings.PASSWORD_HASHER_WORKERS
+        return (os.cpu_count() or 1) if workers is None else workers
+
+    @property
+    def max_pending(self) -> int:
+        """Configured number of hashes waiting or running at a time."""
+        return settings.PASSWORD_HASHER_MAX_PENDING or 4 * max(self.max_workers, 1)
+
+    def _get_executor(self) -> Optional[Executor]:
+        """Get or create the process pool, ``None`` without worker processes."""
+        if not self.max_workers:
+            return None
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # forking a process with running threads (database executor, event loop) is unsafe
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_init_worker,
+                    )
+        return self._executor
+
+    async def _run(self, func: Callable, *args) -> Any:
+        """Run a hashing function in the pool."""
+        if self._pending >= self.max_pending:
+            raise PasswordHasherBusyException()
+
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self._pending -= 1
+
+    async def make_password(self, raw_password: str) -> str:
+        """Hash a password."""
+        return await self._run(_make_password, raw_password)
+
+    async def check_password(self, raw_password: str, encoded: str) -> Tuple[bool, bool]:
+        """Verify a password against a hash, returns if it is valid and if the hash must be upgraded."""
+        if raw_password is None or not is_password_usable(encoded):
+            return False, False
+        return await self._run(_check_password, raw_password, encoded)
+
+    def shutdown(self) -> None:
+        """Stop worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher()
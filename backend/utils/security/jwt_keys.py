@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""JWT signing and verification keys, parsed once."""
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from jwt.algorithms import has_crypto
+
+if has_crypto:
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+    from jwt.algorithms import ECAlgorithm, OKPAlgorithm
+
+HS256 = "HS256"
+ES256 = "ES256"
+EDDSA = "EdDSA"
+ALGORITHMS = (HS256, ES256, EDDSA)
+
+
+@dataclass(frozen=True)
+class JWTKey:
+    """A key of one algorithm, ``signing_key`` is only set where tokens are issued."""
+
+    kid: str
+    algorithm: str
+    verifying_key: Any
+    signing_key: Any = None
+
+    @property
+    def is_symmetric(self) -> bool:
+        """Check if the key is a shared secret, it must not be published."""
+        return self.algorithm == HS256
+
+    def to_jwk(self) -> Dict[str, str]:
+        """Get the public JWK of an asymmetric key."""
+        if self.is_symmetric:
+            raise ValueError("A shared secret can not be published")
+        to_jwk = ECAlgorithm.to_jwk if self.algorithm == ES256 else OKPAlgorithm.to_jwk
+        return {**json.loads(to_jwk(self.verifying_key)), "kid": self.kid, "alg": self.algorithm, "use": "sig"}
+
+
+class JWTKeySet:
+    """
+    The signing key and all verification keys, looked up by ``kid``.
+
+    Rotation: the public key of the next signing key is published as a verification key first, then it
+    becomes the signing key while the previous public key stays a verification key until its tokens have expired.
+    Verifiers without the signing key only need the public keys, e.g. from the JWKS document.
+    Tokens without ``kid`` are verified with ``default_key``.
+    """
+
+    def __init__(self, signing_key: Optional[JWTKey], verification_keys: List[JWTKey]):
+        """Initialize key set."""
+        self.signing_key = signing_key
+        self.keys: Dict[str, JWTKey] = {key.kid: key for key in verification_keys}
+        if signing_key is not None:
+            self.keys[signing_key.kid] = signing_key
+        self.default_key: Optional[JWTKey] = signing_key or (verification_keys[0] if len(self.keys) == 1 else None)
+        # built once, it only changes on deploy
+        self.jwks: Dict[str, List[Dict[str, str]]] = {
+            "keys": [key.to_jwk() for key in self.keys.values() if not key.is_symmetric]
+        }
+
+    def get(self, kid: Optional[str]) -> Optional[JWTKey]:
+        """Get the verification key of a token header ``kid``."""
+        if kid is None:
+            return self.default_key
+        return self.keys.get(kid)
+
+
+def get_key_id(public_key: Any) -> str:
+    """Derive a stable ``kid`` from a public key, a short digest of its DER encoding."""
+    der = public_key.public_bytes(serialization.Encoding.DER, serialization.PublicFormat.SubjectPublicKeyInfo)
+    return hashlib.sha256(der).hexdigest()[:16]
+
+
+def get_algorithm(key: Any) -> str:
+    """Get the JWT algorithm of a parsed asymmetric key."""
+    if isinstance(key, (ec.EllipticCurvePrivateKey, ec.EllipticCurvePublicKey)):
+        if not isinstance(key.curve, ec.SECP256R1):
+            raise ValueError(f"ES256 needs a P-256 key, got {key.curve.name}")
+        return ES256
+    if isinstance(key, (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey)):
+        return EDDSA
+    raise ValueError(f"Unsupported JWT key type {type(key).__name__}, use a P-256 (ES256) or Ed25519 (EdDSA) key")
+
+
+def load_private_key(pem: bytes, kid: Optional[str] = None) -> JWTKey:
+    """Parse a PEM private key into a signing key."""
+    private_key = serialization.load_pem_private_key(pem, password=None)
+    public_key = private_key.public_key()
+    return JWTKey(kid or get_key_id(public_key), get_algorithm(private_key), public_key, private_key)
+
+
+def load_public_key(pem: bytes, kid: Optional[str] = None) -> JWTKey:
+    """Parse a PEM public key into a verification key."""
+    public_key = serialization.load_pem_public_key(pem)
+    return JWTKey(kid or get_key_id(public_key), get_algorithm(public_key), public_key)
+
+
+def load_key_set(
+    algorithm: str,
+    secret_key: str,
+    private_key_file: Optional[str] = None,
+    key_id: Optional[str] = None,
+    public_key_files: Optional[Dict[str, str]] = None,
+) -> JWTKeySet:
+    """
+    Load the keys of the settings.
+
+    ``HS256`` signs and verifies with the shared ``secret_key``. ``ES256`` and ``EdDSA`` sign with the
+    private key of ``private_key_file`` (omitted on verify-only services) and verify with it and with the
+    public keys of ``public_key_files`` (``kid`` to file), the keys of earlier rotations.
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unsupported JWT algorithm {algorithm}, use one of {', '.join(ALGORITHMS)}")
+
+    if algorithm == HS256:
+        secret = secret_key.encode()
+        return JWTKeySet(JWTKey(key_id or HS256, HS256, secret, secret), [])
+
+    if not has_crypto:
+        raise ImportError(f"{algorithm} needs the cryptography package, install pyjwt[crypto]")
+
+    signing_key = load_private_key(Path(private_key_file).read_bytes(), key_id) if private_key_file else None
+    verification_keys = [
+        load_public_key(Path(path).read_bytes(), kid) for kid, path in (public_key_files or {}).items()
+    ]
+    for key in [signing_key, *verification_keys]:
+        if key is not None and key.algorithm != algorithm:
+            raise ValueError(f"JWT key {key.kid} is an {key.algorithm} key, expected {algorithm}")
+    if signing_key is None and not verification_keys:
+        raise ValueError(f"{algorithm} needs a private key file or public key files")
+
+    return JWTKeySet(signing_key, verification_keys)
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""In-process cache of verified tokens."""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of tokens whose signature was verified, keyed by a digest of the token.
+
+    An entry expires at the ``exp`` of its token, the least recently used entry is dropped beyond ``max_size``.
+    The cache only saves the verification, entries must be evicted when a token or a user is revoked.
+    It is local to the process, every worker verifies a token once.
+    """
+
+    def __init__(self, max_size: int = 10_000):
+        """Initialize cache."""
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[bytes, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of cached tokens, including expired ones not dropped yet."""
+        return len(self._entries)
+
+    @staticmethod
+    def get_key(token: str) -> bytes:
+        """Get the cache key of a token, the token itself is not kept in memory."""
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[Any]:
+        """Get the cached value of a token, ``None`` if it is not cached or expired."""
+        key = self.get_key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, token: str, value: Any, expires_at: float) -> None:
+        """Cache the value of a verified token until ``expires_at`` (unix time)."""
+        if self.max_size <= 0 or expires_at <= time.time():
+            return
+        key = self.get_key(token)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def evict(self, token: str) -> bool:
+        """Drop a token, returns if it was cached."""
+        with self._lock:
+            return self._entries.pop(self.get_key(token), None) is not None
+
+    def evict_where(self, predicate: Callable[[Any], bool]) -> int:
+        """Drop the tokens whose value matches, e.g. all tokens of a user. Returns the number of dropped tokens."""
+        with self._lock:
+            keys = [key for key, (_, value) in self._entries.items() if predicate(value)]
+            for key in keys:
+                del self._entries[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        """Drop all tokens."""
+        with self._lock:
+            self._entries.clear()
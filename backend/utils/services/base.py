@@ -1,11 +1,13 @@
 # -*- coding: utf-8 -*-
 """Base service for managing some model."""
 from abc import ABC
-from typing import List, Optional, Type, final
+from typing import AsyncContextManager, List, Optional, Type, final
 
+from django.db import DEFAULT_DB_ALIAS
 from django.db.models import Model
 
-from utils.repositories import BaseRepository
+from utils.db.unit_of_work import UnitOfWork, unit_of_work
+from utils.repositories import BaseRepository, CountStrategy
 
 
 class BaseService(ABC):
@@ -16,15 +18,58 @@ class BaseService(ABC):
     model: Type[Model]
     repository: BaseRepository
 
+    @final
+    def unit_of_work(self, using: str = DEFAULT_DB_ALIAS) -> AsyncContextManager[UnitOfWork]:
+        """
+        Commit the repository writes of an ``async with`` block in one transaction.
+
+        The writes of every repository are deferred to the end of the block and sent in one database call.
+        Reads inside the block do not see them.
+        """
+        return unit_of_work(using)
+
     @final
     async def get_all(self, *args, **kwargs):
         """Get all items."""
         return await self.repository.get_all(*args, **kwargs)
 
     @final
-    async def get_all_and_count(self, *args, **kwargs):
-        """Get all items and count."""
-        return await self.repository.get_all_and_count(*args, **kwargs)
+    def stream(self, *args, **kwargs):
+        """Iterate over items in chunks."""
+        return self.repository.stream(*args, **kwargs)
+
+    @final
+    async def get_all_by_cursor(self, *args, **kwargs):
+        """Get items page by cursor."""
+        return await self.repository.get_all_by_cursor(*args, **kwargs)
+
+    @final
+    async def get_all_and_count(
+        self,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        select_related: Optional[List[str]] = None,
+        prefetch_related: Optional[List[str]] = None,
+        order_by: Optional[List[str]] = None,
+        count_strategy: Optional[CountStrategy] = None,
+        only: Optional[List[str]] = None,
+        defer: Optional[List[str]] = None,
+        values: Optional[List[str]] = None,
+        **kwargs,
+    ):
+        """Get items page and total count."""
+        return await self.repository.get_all_and_count(
+            limit=limit,
+            offset=offset,
+            select_related=select_related,
+            prefetch_related=prefetch_related,
+            order_by=order_by,
+            count_strategy=count_strategy,
+            only=only,
+            defer=defer,
+            values=values,
+            **kwargs,
+        )
 
     @final
     async def get_one(
@@ -32,6 +77,10 @@ class BaseService(ABC):
         raise_not_found: bool = True,
         select_related: Optional[List[str]] = None,
         prefetch_related: Optional[List[str]] = None,
+        only: Optional[List[str]] = None,
+        defer: Optional[List[str]] = None,
+        values: Optional[List[str]] = None,
+        use_cache: bool = True,
         **kwargs,
     ):
         """Get one item."""
@@ -39,6 +88,10 @@ class BaseService(ABC):
             raise_not_found=raise_not_found,
             select_related=select_related,
             prefetch_related=prefetch_related,
+            only=only,
+            defer=defer,
+            values=values,
+            use_cache=use_cache,
             **kwargs,
         )
 
@@ -49,6 +102,10 @@ class BaseService(ABC):
         raise_not_found: bool = True,
         select_related: Optional[List[str]] = None,
         prefetch_related: Optional[List[str]] = None,
+        only: Optional[List[str]] = None,
+        defer: Optional[List[str]] = None,
+        values: Optional[List[str]] = None,
+        use_cache: bool = True,
         **kwargs,
     ):
         """Get one item by id."""
@@ -57,6 +114,10 @@ class BaseService(ABC):
             raise_not_found=raise_not_found,
             select_related=select_related,
             prefetch_related=prefetch_related,
+            only=only,
+            defer=defer,
+            values=values,
+            use_cache=use_cache,
             **kwargs,
         )
         return item
@@ -68,6 +129,9 @@ class BaseService(ABC):
         raise_not_found: bool = True,
         select_related: Optional[List[str]] = None,
         prefetch_related: Optional[List[str]] = None,
+        only: Optional[List[str]] = None,
+        defer: Optional[List[str]] = None,
+        values: Optional[List[str]] = None,
         **kwargs,
     ):
         """Get one item by slug."""
@@ -76,6 +140,9 @@ class BaseService(ABC):
             raise_not_found=raise_not_found,
             select_related=select_related,
             prefetch_related=prefetch_related,
+            only=only,
+            defer=defer,
+            values=values,
             **kwargs,
         )
 
@@ -108,3 +175,24 @@ class BaseService(ABC):
     async def delete_one_by_id(self, item_id: int, raise_not_found: bool = True, **kwargs):
         """Delete one item by id."""
         return await self.repository.delete_one_by_id(item_id, raise_not_found, **kwargs)
+
+    @final
+    async def bulk_upsert(
+        self,
+        objs: List[Model],
+        unique_fields: List[str],
+        update_fields: List[str],
+        batch_size: int = 1000,
+    ) -> List[Model]:
+        """Bulk insert or update items."""
+        return await self.repository.bulk_upsert(
+            objs,
+            unique_fields=unique_fields,
+            update_fields=update_fields,
+            batch_size=batch_size,
+        )
+
+    @final
+    async def bulk_update(self, objs: List[Model], fields: List[str], batch_size: int = 1000) -> int:
+        """Bulk update items."""
+        return await self.repository.bulk_update(objs, fields=fields, batch_size=batch_size)